@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import ContactMessage, Projects
+from .fill_economic_indicator import region_indicator
+from .models import ContactMessage, EnterpriseMean, Projects, RegionIndicator
 
 
 @admin.register(ContactMessage)
@@ -10,6 +11,25 @@ class ContactMessageAdmin(admin.ModelAdmin):
     ordering = ("-created_at",)
 
 class EconomicIndicatorAdmin(admin.ModelAdmin):
-    list_display = ('project_location','economic_indicator')
+    list_display = ('project_name', 'project_location', 'economic_indicator', 'indicator_value')
 
-admin.site.register(Projects)
\ No newline at end of file
+    @admin.display(description="Indicator value")
+    def indicator_value(self, obj):
+        location = Projects.dataset_location(obj.project_region, obj.project_city, obj.project_location_other)[0]
+        value = region_indicator(location)
+        return "-" if value is None else round(value, 3)
+
+admin.site.register(Projects, EconomicIndicatorAdmin)
+
+
+@admin.register(RegionIndicator)
+class RegionIndicatorAdmin(admin.ModelAdmin):
+    list_display = ("region", "economic_indicator", "updated_at")
+    search_fields = ("region",)
+
+
+@admin.register(EnterpriseMean)
+class EnterpriseMeanAdmin(admin.ModelAdmin):
+    list_display = ("scope", "sector", "region", "mean", "updated_at")
+    list_filter = ("scope",)
+    search_fields = ("sector", "region")
@@ -0,0 +1,151 @@
+"""
+Columnar binary cache of the reference dataset.
+
+build() parses the CSV once and writes one .npy per column: numeric
+columns in their parsed dtype, text columns as int32 codes into a string
+table of already stripped keys (str(value).strip(), what every loader
+compares on). read_dataset() memory-maps those columns when the cache
+matches the CSV and parses the CSV otherwise; both paths give the same
+values, text as categoricals.
+
+Layout: <cache dir>/manifest.json points to a <sha256> subdirectory with
+the columns; the manifest is replaced last, so readers never see a half
+written cache.
+"""
+import hashlib
+import json
+import os
+import shutil
+import threading
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+
+DATASET_PATH = os.path.join(settings.BASE_DIR, 'dataset', 'jadwa_ai_final_dataset.csv')
+CACHE_ROOT = os.getenv('JADWA_DATASET_CACHE_DIR', os.path.join(settings.BASE_DIR, 'dataset', 'cache'))
+
+_manifests = {}
+_lock = threading.Lock()
+
+
+def file_hash(path) -> str:
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def cache_dir(csv_path=DATASET_PATH) -> str:
+    name = os.path.splitext(os.path.basename(csv_path))[0]
+    return os.path.join(CACHE_ROOT, name)
+
+
+def _stamp(path) -> list:
+    st = os.stat(path)
+    return [st.st_mtime_ns, st.st_size]
+
+
+def _text_keys(column) -> pd.Series:
+    return column.astype(str).str.strip()
+
+
+def build(csv_path=DATASET_PATH, out_dir=None) -> dict:
+    """Parse the CSV and write its columnar cache; returns the manifest."""
+    out_dir = out_dir or cache_dir(csv_path)
+    stamp = _stamp(csv_path)
+    sha256 = file_hash(csv_path)
+    df = pd.read_csv(csv_path)
+
+    version_dir = os.path.join(out_dir, sha256)
+    tmp_dir = f"{version_dir}.tmp-{os.getpid()}"
+    os.makedirs(tmp_dir, exist_ok=True)
+
+    columns = []
+    for i, name in enumerate(df.columns):
+        column = df[name]
+        entry = {'name': name, 'file': f"{i}.npy"}
+        if pd.api.types.is_numeric_dtype(column):
+            entry['kind'] = 'numeric'
+            np.save(os.path.join(tmp_dir, entry['file']), column.to_numpy())
+        else:
+            codes, strings = pd.factorize(_text_keys(column))
+            entry['kind'] = 'text'
+            entry['strings'] = strings.tolist()
+            np.save(os.path.join(tmp_dir, entry['file']), codes.astype(np.int32))
+        columns.append(entry)
+
+    shutil.rmtree(version_dir, ignore_errors=True)
+    os.replace(tmp_dir, version_dir)
+
+    manifest = {
+        'source': os.path.abspath(csv_path),
+        'sha256': sha256,
+        'stamp': stamp,
+        'rows': len(df),
+        'columns': columns,
+    }
+    tmp = os.path.join(out_dir, f"manifest.json.tmp-{os.getpid()}")
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False)
+    os.replace(tmp, os.path.join(out_dir, 'manifest.json'))
+
+    # Older versions are no longer referenced
+    for entry in os.listdir(out_dir):
+        path = os.path.join(out_dir, entry)
+        if os.path.isdir(path) and entry != sha256 and '.tmp-' not in entry:
+            shutil.rmtree(path, ignore_errors=True)
+    return manifest
+
+
+def fresh_manifest(csv_path=DATASET_PATH, out_dir=None):
+    """The cache's manifest if it was built from the CSV as it is now, else None."""
+    out_dir = out_dir or cache_dir(csv_path)
+    try:
+        with open(os.path.join(out_dir, 'manifest.json'), encoding='utf-8') as f:
+            manifest = json.load(f)
+        stamp = _stamp(csv_path)
+    except (OSError, ValueError):
+        return None
+
+    if manifest.get('stamp') == stamp:
+        return manifest
+
+    # Touched or copied: same content is still fresh; hash once per stamp
+    with _lock:
+        key = (out_dir, tuple(stamp), manifest.get('sha256'))
+        if key not in _manifests:
+            _manifests[key] = manifest.get('stamp', [0, -1])[1] == stamp[1] and file_hash(csv_path) == manifest['sha256']
+        return manifest if _manifests[key] else None
+
+
+def load_columns(manifest, out_dir, columns=None) -> dict:
+    """name -> memory-mapped numeric array, or pd.Categorical of the stripped keys."""
+    version_dir = os.path.join(out_dir, manifest['sha256'])
+    data = {}
+    for entry in manifest['columns']:
+        if columns is not None and entry['name'] not in columns:
+            continue
+        values = np.load(os.path.join(version_dir, entry['file']), mmap_mode='r')
+        if entry['kind'] == 'text':
+            values = pd.Categorical.from_codes(values, entry['strings'])
+        data[entry['name']] = values
+    return data
+
+
+def read_dataset(csv_path=DATASET_PATH, columns=None) -> pd.DataFrame:
+    """
+    The dataset with text columns as stripped keys, from the cache when it
+    is fresh, else from the CSV.
+    """
+    out_dir = cache_dir(csv_path)
+    manifest = fresh_manifest(csv_path, out_dir)
+    if manifest is not None:
+        return pd.DataFrame(load_columns(manifest, out_dir, columns))
+
+    df = pd.read_csv(csv_path, usecols=columns)
+    for name in df.columns:
+        if not pd.api.types.is_numeric_dtype(df[name]):
+            df[name] = _text_keys(df[name]).astype('category')
+    return df
@@ -1,17 +1,21 @@
 import os
-import pandas as pd
+import threading
+
 from django.conf import settings
 
+DATASET_PATH = os.path.join(settings.BASE_DIR, 'dataset', 'jadwa_ai_final_dataset.csv')
+
+
+def calculate_update_economic_indicator(csv_path=DATASET_PATH):
+    import pandas as pd
 
-def calculate_update_economic_indicator():
-    # ✅ مسار ملف الداتا ست داخل المشروع
-    csv_path = os.path.join(settings.BASE_DIR, 'dataset', 'jadwa_ai_final_dataset.csv')
+    from .dataset_cache import read_dataset
 
     if not os.path.exists(csv_path):
         raise FileNotFoundError(f"Dataset not found at: {csv_path}")
 
-    # ✅ اقرأ من المسار الصحيح
-    df = pd.read_csv(csv_path)
+    # ✅ اقرأ من الكاش الثنائي إذا كان محدّثًا، وإلا من الـ CSV
+    df = read_dataset(csv_path)
 
     # ✅ تأكد الأعمدة المطلوبة موجودة
     required_cols = ['region_project', 'عدد المنشآت', 'عدد العاملين السعوديين', 'project_success']
@@ -46,3 +50,69 @@ def calculate_update_economic_indicator():
     region_avg = df.groupby('region_project', as_index=False)['economic_indicator'].mean()
 
     return region_avg
+
+
+# ✅ جدول المؤشر لكل منطقة محفوظ في الذاكرة، يُعاد حسابه فقط إذا تغيّر ملف الداتا
+_cache = {}
+_lock = threading.Lock()
+
+
+def region_indicators(csv_path=DATASET_PATH) -> dict:
+    """
+    {region_project: economic_indicator} computed from the dataset file.
+    A changed mtime/size re-hashes the file; the table is only recomputed
+    when the content changed.
+    """
+    st = os.stat(csv_path)
+    stamp = (st.st_mtime_ns, st.st_size)
+
+    cached = _cache.get(csv_path)
+    if cached and cached['stamp'] == stamp:
+        return cached['table']
+
+    with _lock:
+        cached = _cache.get(csv_path)
+        if cached and cached['stamp'] == stamp:
+            return cached['table']
+
+        from .dataset_cache import file_hash
+
+        sha256 = file_hash(csv_path)
+        if cached and cached['sha256'] == sha256:
+            table = cached['table']
+        else:
+            region_avg = calculate_update_economic_indicator(csv_path)
+            table = dict(zip(region_avg['region_project'], region_avg['economic_indicator'].astype(float)))
+        _cache[csv_path] = {'stamp': stamp, 'sha256': sha256, 'table': table}
+        return table
+
+
+def region_indicator(location, csv_path=DATASET_PATH):
+    """
+    Indicator of one dataset location ("المنطقة, المدينة"), None when
+    unknown; shared by Projects.save, the placement ranking and the admin.
+    Reads the RegionIndicator table (load_reference_data) when it is
+    loaded, else the dataset file.
+    """
+    location = str(location).strip()
+
+    if csv_path == DATASET_PATH:
+        from .models import RegionIndicator
+
+        value = RegionIndicator.objects.filter(region=location).values_list('economic_indicator', flat=True).first()
+        if value is not None or RegionIndicator.objects.exists():
+            return value
+
+    return region_indicators(csv_path).get(location)
+
+
+def region_indicator_table() -> dict:
+    """
+    {region_project: economic_indicator} in one query from RegionIndicator
+    when it is loaded, else from the dataset file; for callers looking up
+    many regions at once.
+    """
+    from .models import RegionIndicator
+
+    table = dict(RegionIndicator.objects.values_list('region', 'economic_indicator'))
+    return table or region_indicators()
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.10 on 2026-10-18 08:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('JADWA_AI', '0025_rename_about_text_sitecontent_how_desc_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RegionIndicator',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('region', models.CharField(max_length=255, unique=True)),
+                ('economic_indicator', models.FloatField()),
+                ('dataset_sha256', models.CharField(max_length=64)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='EnterpriseMean',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(choices=[('exact', 'Sector + region'), ('sector', 'Sector'), ('region', 'Region'), ('global', 'All')], max_length=10)),
+                ('sector', models.CharField(blank=True, default='', max_length=255)),
+                ('region', models.CharField(blank=True, default='', max_length=255)),
+                ('mean', models.FloatField()),
+                ('dataset_sha256', models.CharField(max_length=64)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('scope', 'sector', 'region'), name='enterprise_mean_key')],
+            },
+        ),
+    ]
@@ -3,7 +3,7 @@ from django.conf import settings
 from django.utils import timezone
 from django.contrib.auth.models import AbstractUser
 from django.utils.translation import gettext_lazy as _
-from .fill_economic_indicator import calculate_update_economic_indicator
+from .fill_economic_indicator import region_indicator
 from .num_similar_enterprises import get_similar_enterprises
 
 
@@ -198,43 +198,51 @@ class Projects(models.Model):
         "other": "Other",
     }
 
-    def save(self, *args, **kwargs):
-        region_df = calculate_update_economic_indicator()
-
-        if not self.project_region or not self.project_city or self.project_region == "other" or self.project_city == "other":
-            effective_loc = self.project_location_other.strip() if self.project_location_other else "Other"
-            self.project_location = "Other"
+    @classmethod
+    def dataset_location(cls, region, city, location_other=None):
+        """
+        (location to look up in the dataset, value stored in project_location)
+        for a region/city pair, as save() resolves them.
+        """
+        if not region or not city or region == "other" or city == "other":
+            effective_loc = location_other.strip() if location_other else "Other"
+            project_location = "Other"
         else:
-            mapped = self.REGION_CITY_TO_DATASET_LOC.get((self.project_region, self.project_city))
+            mapped = cls.REGION_CITY_TO_DATASET_LOC.get((region, city))
             if mapped:
                 effective_loc = mapped
-                self.project_location = mapped
+                project_location = mapped
             else:
                 effective_loc = "Other"
-                self.project_location = "Other"
+                project_location = "Other"
 
         effective_loc = ", ".join([p.strip() for p in str(effective_loc).split(",") if p.strip()])
-        
+
         raw = (effective_loc or "").strip()
-        norm = self.TEXT_LOC_NORMALIZE.get(raw.lower())
+        norm = cls.TEXT_LOC_NORMALIZE.get(raw.lower())
         if norm:
             effective_loc = norm
 
-        region_data = region_df[region_df["region_project"].astype(str).str.strip() == effective_loc]
-
-        value = None
-        if not region_data.empty:
-            value = float(region_data["economic_indicator"].values[0])
+        return effective_loc, project_location
 
+    @staticmethod
+    def economic_level(value):
+        """"Low"/"Medium"/"High" for a dataset indicator value, None when unknown."""
         if value is None:
-            self.economic_indicator = _("Unknown")
-        else:
-            if value <= 0.33:
-                self.economic_indicator = _("Low")
-            elif value <= 0.66:
-                self.economic_indicator = _("Medium")
-            else:
-               self.economic_indicator = _("High")
+            return None
+        if value <= 0.33:
+            return "Low"
+        if value <= 0.66:
+            return "Medium"
+        return "High"
+
+    def save(self, *args, **kwargs):
+        effective_loc, self.project_location = self.dataset_location(
+            self.project_region, self.project_city, self.project_location_other
+        )
+
+        level = self.economic_level(region_indicator(effective_loc))
+        self.economic_indicator = {"Low": _("Low"), "Medium": _("Medium"), "High": _("High")}.get(level, _("Unknown"))
 
         self.num_of_similar_enterprises = get_similar_enterprises(self.Project_type, self.project_location)
         super().save(*args, **kwargs)
@@ -281,3 +289,41 @@ class SiteContent(models.Model):
         return "Site Content"
 
 
+class RegionIndicator(models.Model):
+    """Per-region economic indicator of the dataset, loaded by load_reference_data."""
+    region = models.CharField(max_length=255, unique=True)
+    economic_indicator = models.FloatField()
+    dataset_sha256 = models.CharField(max_length=64)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.region}: {self.economic_indicator:.3f}"
+
+
+class EnterpriseMean(models.Model):
+    """
+    Mean establishment count of the dataset per (sector, region), sector,
+    region and overall ("" where a key does not apply), loaded by
+    load_reference_data for get_similar_enterprises.
+    """
+    SCOPE_CHOICES = [
+        ("exact", "Sector + region"),
+        ("sector", "Sector"),
+        ("region", "Region"),
+        ("global", "All"),
+    ]
+
+    scope = models.CharField(max_length=10, choices=SCOPE_CHOICES)
+    sector = models.CharField(max_length=255, blank=True, default="")
+    region = models.CharField(max_length=255, blank=True, default="")
+    mean = models.FloatField()
+    dataset_sha256 = models.CharField(max_length=64)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["scope", "sector", "region"], name="enterprise_mean_key"),
+        ]
+
+    def __str__(self):
+        return f"{self.scope} {self.sector} / {self.region}: {self.mean:.1f}"
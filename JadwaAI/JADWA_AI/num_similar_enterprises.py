@@ -1,12 +1,10 @@
 import os
-import pandas as pd
+from functools import lru_cache
+
 from django.conf import settings
 
 DATASET_PATH = os.path.join(settings.BASE_DIR, "dataset", "jadwa_ai_final_dataset.csv")
 
-# نقرأ الداتا مرة واحدة
-df = pd.read_csv(DATASET_PATH)
-
 SECTOR_COL = "sectors"
 REGION_COL = "region_project"
 COUNT_COL = "عدد المنشآت"
@@ -16,44 +14,121 @@ def _norm(x) -> str:
     return ("" if x is None else str(x)).strip().lower()
 
 
-def get_similar_enterprises(sector: str, region_loc: str) -> int:
+@lru_cache(maxsize=1)
+def _dataset():
+    from .dataset_cache import read_dataset
+
+    # نقرأ الداتا مرة واحدة (من الكاش الثنائي إذا كان محدّثًا)
+    return read_dataset(DATASET_PATH)
+
+
+def enterprise_means(df) -> dict:
     """
-    ترجع تقدير عدد المنشآت المشابهة من الداتا ست بناءً على:
-    - sectors + region_project
-    مع Fallbacks ذكية إذا القطاع غير مطابق للداتا.
+    متوسطات عدد المنشآت من الداتا:
+    (القطاع, المنطقة) / القطاع / المنطقة / المتوسط العام
     """
+    import pandas as pd
 
-    # تأكد الأعمدة موجودة
     required = [SECTOR_COL, REGION_COL, COUNT_COL]
     missing = [c for c in required if c not in df.columns]
     if missing:
         raise KeyError(f"Missing columns: {missing}. Found: {df.columns.tolist()}")
 
+    d = pd.DataFrame({
+        "sector": df[SECTOR_COL].map(_norm),
+        "region": df[REGION_COL].map(_norm),
+        "count": df[COUNT_COL],
+    })
+    return {
+        "exact": d.groupby(["sector", "region"], observed=True)["count"].mean().to_dict(),
+        "sector": d.groupby("sector", observed=True)["count"].mean().to_dict(),
+        "region": d.groupby("region", observed=True)["count"].mean().to_dict(),
+        "global": d["count"].mean(),
+    }
+
+
+@lru_cache(maxsize=1)
+def _index() -> dict:
+    return enterprise_means(_dataset())
+
+
+def _from_database(sector, region_loc):
+    """(exact, sector, region, global) means from EnterpriseMean; None if it was never loaded."""
+    from django.db.models import Q
+
+    from .models import EnterpriseMean
+
+    rows = dict(
+        EnterpriseMean.objects.filter(
+            Q(scope="exact", sector=sector, region=region_loc)
+            | Q(scope="sector", sector=sector, region="")
+            | Q(scope="region", sector="", region=region_loc)
+            | Q(scope="global", sector="", region="")
+        ).values_list("scope", "mean")
+    )
+    if "global" not in rows:
+        return None
+    return rows.get("exact"), rows.get("sector"), rows.get("region"), rows["global"]
+
+
+def _from_index(index, sector, region_loc):
+    return (
+        index["exact"].get((sector, region_loc)),
+        index["sector"].get(sector),
+        index["region"].get(region_loc),
+        index["global"],
+    )
+
+
+def enterprise_index() -> dict:
+    """
+    كل المتوسطات بشكل enterprise_means() باستعلام واحد من EnterpriseMean
+    (أو من الداتا إذا الجدول غير محمّل)، لمن يحتاج عمليات بحث كثيرة مرة وحدة.
+    """
+    from .models import EnterpriseMean
+
+    index = {"exact": {}, "sector": {}, "region": {}, "global": None}
+    for scope, sector, region, mean in EnterpriseMean.objects.values_list("scope", "sector", "region", "mean"):
+        if scope == "exact":
+            index["exact"][(sector, region)] = mean
+        elif scope == "sector":
+            index["sector"][sector] = mean
+        elif scope == "region":
+            index["region"][region] = mean
+        else:
+            index["global"] = mean
+    return index if index["global"] is not None else _index()
+
+
+def get_similar_enterprises(sector: str, region_loc: str, index=None) -> int:
+    """
+    ترجع تقدير عدد المنشآت المشابهة من الداتا ست بناءً على:
+    - sectors + region_project
+    مع Fallbacks ذكية إذا القطاع غير مطابق للداتا.
+    جدول EnterpriseMean (load_reference_data) إذا كان محمّلًا، وإلا الداتا نفسها.
+    index: نتيجة enterprise_index() لتفادي استعلام لكل عملية بحث.
+    """
     sector = _norm(sector)
     region_loc = _norm(region_loc)
 
-    d = df.copy()
-    d[SECTOR_COL] = d[SECTOR_COL].map(_norm)
-    d[REGION_COL] = d[REGION_COL].map(_norm)
+    if index is not None:
+        means = _from_index(index, sector, region_loc)
+    else:
+        means = _from_database(sector, region_loc) or _from_index(_index(), sector, region_loc)
+    exact, same_sector, same_region, overall = means
 
     # هل sector اللي جاي من النظام موجود أصلًا في الداتا؟
-    sector_exists = sector and (sector in set(d[SECTOR_COL].unique()))
-
-    # 1) نفس القطاع + نفس المنطقة (إذا القطاع فعلاً موجود بالداتا)
-    if sector_exists:
-        exact = d[(d[SECTOR_COL] == sector) & (d[REGION_COL] == region_loc)]
-        if not exact.empty:
-            return int(exact[COUNT_COL].mean())
+    if sector and same_sector is not None:
+        # 1) نفس القطاع + نفس المنطقة
+        if exact is not None:
+            return int(exact)
 
         # 2) نفس القطاع فقط
-        same_sector = d[d[SECTOR_COL] == sector]
-        if not same_sector.empty:
-            return int(same_sector[COUNT_COL].mean())
+        return int(same_sector)
 
     # 3) نفس المنطقة فقط (هذا مهم لأنه غالبًا Project_type عندك مو مطابق لـ sectors)
-    same_region = d[d[REGION_COL] == region_loc]
-    if not same_region.empty:
-        return int(same_region[COUNT_COL].mean())
+    if same_region is not None:
+        return int(same_region)
 
     # 4) متوسط عام
-    return int(d[COUNT_COL].mean())
+    return int(overall)
@@ -0,0 +1,169 @@
+"""
+Reference statistics of the dataset, folded chunk by chunk.
+
+calculate_update_economic_indicator normalizes every row by the global
+maxima, so it needs the whole frame. But a region's indicator is
+
+    mean(est / est_max + emp / emp_max + suc / suc_max) / 3
+      = (sum_est / est_max + sum_emp / emp_max + sum_suc / suc_max) / (3 * rows)
+
+so per-region sums and row counts plus three running maxima are enough,
+whatever order the rows arrive in. The same holds for the
+similar-enterprise means (sum and count per sector x region). Memory is
+bounded by the number of keys, not rows, and new rows are folded into
+saved aggregates without reading the old ones again.
+"""
+import json
+import os
+
+from django.conf import settings
+
+from .num_similar_enterprises import COUNT_COL, REGION_COL, SECTOR_COL, _norm
+
+EMPLOYEES_COL = 'عدد العاملين السعوديين'
+SUCCESS_COL = 'project_success'
+VALUE_COLS = [COUNT_COL, EMPLOYEES_COL, SUCCESS_COL]
+
+CHUNK_ROWS = int(os.getenv('JADWA_REFERENCE_CHUNK_ROWS', '100000'))
+STATE_PATH = os.getenv(
+    'JADWA_REFERENCE_STATE',
+    os.path.join(settings.BASE_DIR, 'dataset', 'cache', 'reference_aggregates.json'),
+)
+
+
+def empty() -> dict:
+    return {
+        'rows': 0,
+        'sources': [],
+        'max': {col: 0.0 for col in VALUE_COLS},
+        # region -> [rows, sum_est, sum_emp, sum_suc]
+        'regions': {},
+        # (sector, region) normalized -> [rows, non-missing counts, sum of counts]
+        'enterprises': {},
+    }
+
+
+def fold(aggregates, chunk) -> dict:
+    """Add one DataFrame chunk of dataset rows to `aggregates` (in place)."""
+    import pandas as pd
+
+    missing = [c for c in [SECTOR_COL, REGION_COL] + VALUE_COLS if c not in chunk.columns]
+    if missing:
+        raise ValueError(f"Missing columns in dataset: {missing}. Found columns: {list(chunk.columns)}")
+
+    raw_counts = pd.to_numeric(chunk[COUNT_COL], errors='coerce')
+    values = pd.DataFrame({col: pd.to_numeric(chunk[col], errors='coerce') for col in VALUE_COLS}).fillna(0)
+    values['region'] = chunk[REGION_COL].astype(str).str.strip()
+
+    for col in VALUE_COLS:
+        aggregates['max'][col] = max(aggregates['max'][col], float(values[col].max()))
+
+    by_region = values.groupby('region', observed=True)
+    sums = by_region[VALUE_COLS].sum()
+    for region, rows, *totals in zip(sums.index, by_region.size(), *(sums[col] for col in VALUE_COLS)):
+        current = aggregates['regions'].setdefault(region, [0, 0.0, 0.0, 0.0])
+        current[0] += int(rows)
+        for i, total in enumerate(totals, start=1):
+            current[i] += float(total)
+
+    keys = pd.DataFrame({
+        'sector': chunk[SECTOR_COL].map(_norm),
+        'region': chunk[REGION_COL].map(_norm),
+        'count': raw_counts,
+    })
+    cells = keys.groupby(['sector', 'region'], observed=True)['count'].agg(['size', 'count', 'sum'])
+    for key, rows, n, total in zip(cells.index, cells['size'], cells['count'], cells['sum']):
+        current = aggregates['enterprises'].setdefault(key, [0, 0, 0.0])
+        current[0] += int(rows)
+        current[1] += int(n)
+        current[2] += float(total)
+
+    aggregates['rows'] += len(chunk)
+    return aggregates
+
+
+class AlreadyIngested(ValueError):
+    pass
+
+
+def ingest(csv_path, aggregates=None, chunk_rows=CHUNK_ROWS) -> dict:
+    """
+    Fold a CSV into `aggregates` (new ones by default), `chunk_rows` rows at
+    a time. A file whose content was already folded in raises
+    AlreadyIngested, so a retried append cannot count its rows twice.
+    """
+    import pandas as pd
+
+    from .dataset_cache import file_hash
+
+    aggregates = aggregates or empty()
+    sha256 = file_hash(csv_path)
+    if sha256 in aggregates['sources']:
+        raise AlreadyIngested(f"{csv_path} (sha256 {sha256[:12]}) is already in the aggregates")
+
+    usecols = [SECTOR_COL, REGION_COL] + VALUE_COLS
+    for chunk in pd.read_csv(csv_path, usecols=usecols, chunksize=chunk_rows):
+        fold(aggregates, chunk)
+    aggregates['sources'].append(sha256)
+    return aggregates
+
+
+def fingerprint(aggregates) -> str:
+    """
+    Identifies the folded sources, in order: the file's sha256 for a single
+    file (the dataset_sha256 load_reference_data stores), else a hash of them.
+    """
+    import hashlib
+
+    if len(aggregates['sources']) == 1:
+        return aggregates['sources'][0]
+    return hashlib.sha256('\n'.join(aggregates['sources']).encode()).hexdigest()
+
+
+def region_indicators(aggregates) -> dict:
+    """{region_project: economic_indicator}, as calculate_update_economic_indicator computes it."""
+    maxima = [aggregates['max'][col] or 1 for col in VALUE_COLS]
+    return {
+        region: sum(total / peak for total, peak in zip(sums, maxima)) / (3 * rows)
+        for region, (rows, *sums) in aggregates['regions'].items()
+    }
+
+
+def enterprise_means(aggregates) -> dict:
+    """The same shape as num_similar_enterprises.enterprise_means."""
+    def mean(n, total):
+        return total / n if n else float('nan')
+
+    exact, sectors, regions = {}, {}, {}
+    for (sector, region), (_, n, total) in aggregates['enterprises'].items():
+        exact[(sector, region)] = mean(n, total)
+        for key, by in ((sector, sectors), (region, regions)):
+            acc = by.setdefault(key, [0, 0.0])
+            acc[0] += n
+            acc[1] += total
+
+    n = sum(acc[0] for acc in sectors.values())
+    total = sum(acc[1] for acc in sectors.values())
+    return {
+        'exact': exact,
+        'sector': {key: mean(*acc) for key, acc in sectors.items()},
+        'region': {key: mean(*acc) for key, acc in regions.items()},
+        'global': mean(n, total),
+    }
+
+
+def save(aggregates, path=STATE_PATH) -> str:
+    state = dict(aggregates, enterprises=[[s, r, *v] for (s, r), v in aggregates['enterprises'].items()])
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp-{os.getpid()}"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False)
+    os.replace(tmp, path)
+    return path
+
+
+def load(path=STATE_PATH) -> dict:
+    with open(path, encoding='utf-8') as f:
+        state = json.load(f)
+    state['enterprises'] = {(s, r): v for s, r, *v in state['enterprises']}
+    return state
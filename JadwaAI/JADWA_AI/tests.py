@@ -1,3 +1,5 @@
+from io import StringIO
+
 from django.test import TestCase
 from django.contrib.auth import get_user_model
 from django.urls import reverse
@@ -75,4 +77,223 @@ class SystemTest(TestCase):
 
         self.assertTrue(
             AnalysisResult.objects.filter(project_id=project.id).exists()
-        )
\ No newline at end of file
+        )
+
+class SimilarEnterprisesTest(TestCase):
+
+    def _scan(self, sector, region_loc):
+        # The former per-call DataFrame scan, kept as the reference
+        from .num_similar_enterprises import _dataset, _norm, SECTOR_COL, REGION_COL, COUNT_COL
+
+        df = _dataset()
+        sector, region_loc = _norm(sector), _norm(region_loc)
+        d = df.copy()
+        d[SECTOR_COL] = d[SECTOR_COL].map(_norm)
+        d[REGION_COL] = d[REGION_COL].map(_norm)
+
+        if sector and sector in set(d[SECTOR_COL].unique()):
+            exact = d[(d[SECTOR_COL] == sector) & (d[REGION_COL] == region_loc)]
+            if not exact.empty:
+                return int(exact[COUNT_COL].mean())
+            return int(d[d[SECTOR_COL] == sector][COUNT_COL].mean())
+
+        same_region = d[d[REGION_COL] == region_loc]
+        if not same_region.empty:
+            return int(same_region[COUNT_COL].mean())
+        return int(d[COUNT_COL].mean())
+
+    def test_index_matches_dataframe_scan(self):
+        from .num_similar_enterprises import _dataset, get_similar_enterprises, SECTOR_COL, REGION_COL
+
+        df = _dataset()
+        sectors = list(df[SECTOR_COL].unique()) + ["Service", "", None]
+        regions = list(df[REGION_COL].unique()) + ["Unknown, Nowhere", "", None]
+        for sector in sectors:
+            for region_loc in regions:
+                self.assertEqual(
+                    get_similar_enterprises(sector, region_loc), self._scan(sector, region_loc),
+                    (sector, region_loc),
+                )
+
+        # Lookups normalize case and surrounding spaces like the scan did
+        sector, region_loc = df[SECTOR_COL].iloc[0], df[REGION_COL].iloc[0]
+        self.assertEqual(
+            get_similar_enterprises(f"  {sector.upper()} ", f"{region_loc}  "),
+            self._scan(sector, region_loc),
+        )
+
+
+class EconomicIndicatorCacheTest(TestCase):
+
+    def test_table_matches_dataframe_and_follows_file_changes(self):
+        import os
+        import shutil
+        import tempfile
+
+        from .fill_economic_indicator import DATASET_PATH, calculate_update_economic_indicator, region_indicators
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "dataset.csv")
+            shutil.copy(DATASET_PATH, path)
+
+            table = region_indicators(path)
+            frame = calculate_update_economic_indicator(path)
+            self.assertEqual(table, dict(zip(frame["region_project"], frame["economic_indicator"])))
+            self.assertIs(region_indicators(path), table)
+
+            # Touched but unchanged: same table, no recompute
+            os.utime(path, ns=(0, 0))
+            self.assertIs(region_indicators(path), table)
+
+            # New content (half the rows): recomputed
+            with open(path, "rb") as f:
+                lines = f.read().splitlines(keepends=True)
+            with open(path, "wb") as f:
+                f.writelines(lines[:len(lines) // 2])
+            frame = calculate_update_economic_indicator(path)
+            self.assertEqual(region_indicators(path), dict(zip(frame["region_project"], frame["economic_indicator"])))
+            self.assertNotEqual(region_indicators(path), table)
+
+
+class DatasetCacheTest(TestCase):
+
+    def test_cache_matches_csv_until_the_file_changes(self):
+        import os
+        import shutil
+        import tempfile
+        from unittest import mock
+
+        import pandas as pd
+
+        from . import dataset_cache
+        from .fill_economic_indicator import calculate_update_economic_indicator
+
+        with tempfile.TemporaryDirectory() as tmp, mock.patch.object(dataset_cache, "CACHE_ROOT", tmp):
+            path = os.path.join(tmp, "dataset.csv")
+            shutil.copy(dataset_cache.DATASET_PATH, path)
+
+            from_csv = dataset_cache.read_dataset(path)
+            csv_indicators = calculate_update_economic_indicator(path)
+
+            manifest = dataset_cache.build(path)
+            self.assertEqual(dataset_cache.fresh_manifest(path)["sha256"], manifest["sha256"])
+            with mock.patch.object(pd, "read_csv", side_effect=AssertionError("CSV parsed")):
+                from_cache = dataset_cache.read_dataset(path)
+                cache_indicators = calculate_update_economic_indicator(path)
+
+            pd.testing.assert_frame_equal(from_cache, from_csv, check_categorical=False)
+            pd.testing.assert_frame_equal(cache_indicators, csv_indicators)
+
+            # Touched, same content: still fresh
+            os.utime(path, ns=(0, 0))
+            self.assertIsNotNone(dataset_cache.fresh_manifest(path))
+
+            # Edited: stale, read from the CSV again
+            with open(path, "a", encoding="utf-8") as f:
+                f.write('x, تجاري,"منطقة الرياض, الرياض",1,1,1,1,,1\n')
+            self.assertIsNone(dataset_cache.fresh_manifest(path))
+            self.assertEqual(len(dataset_cache.read_dataset(path)), len(from_csv) + 1)
+
+
+class ReferenceDataTest(TestCase):
+
+    def test_database_lookups_match_the_dataset(self):
+        from unittest import mock
+
+        from django.core.management import call_command
+
+        from . import fill_economic_indicator, num_similar_enterprises
+        from .models import EnterpriseMean, RegionIndicator
+
+        df = num_similar_enterprises._dataset()
+        sectors = list(df["sectors"].unique()) + ["Service", ""]
+        regions = list(df["region_project"].unique()) + ["Unknown, Nowhere", "Other"]
+        expected_enterprises = {
+            (s, r): num_similar_enterprises.get_similar_enterprises(s, r) for s in sectors for r in regions
+        }
+        expected_indicators = {r: fill_economic_indicator.region_indicator(r) for r in regions}
+
+        call_command("load_reference_data", stdout=StringIO())
+        counts = (RegionIndicator.objects.count(), EnterpriseMean.objects.count())
+        self.assertEqual(counts[0], len(fill_economic_indicator.region_indicators()))
+
+        # Loaded: the dataset is no longer touched
+        with mock.patch.object(num_similar_enterprises, "_index", side_effect=AssertionError("dataset read")), \
+                mock.patch.object(fill_economic_indicator, "region_indicators", side_effect=AssertionError("dataset read")):
+            for (s, r), value in expected_enterprises.items():
+                self.assertEqual(num_similar_enterprises.get_similar_enterprises(s, r), value, (s, r))
+            for r, value in expected_indicators.items():
+                self.assertEqual(fill_economic_indicator.region_indicator(r), value, r)
+
+        # Upserts: loading again keeps one row per key
+        call_command("load_reference_data", stdout=StringIO())
+        self.assertEqual((RegionIndicator.objects.count(), EnterpriseMean.objects.count()), counts)
+
+
+class ReferenceStreamTest(TestCase):
+
+    def _split(self, tmp, source):
+        import os
+
+        with open(source, encoding="utf-8") as f:
+            header, *rows = f.readlines()
+        paths = []
+        for i, part in enumerate((rows[:len(rows) // 2], rows[len(rows) // 2:])):
+            paths.append(os.path.join(tmp, f"part{i}.csv"))
+            with open(paths[-1], "w", encoding="utf-8") as f:
+                f.writelines([header] + part)
+        return paths
+
+    def test_chunked_aggregates_match_in_memory_values(self):
+        from . import num_similar_enterprises, reference_stream
+        from .fill_economic_indicator import DATASET_PATH, region_indicators
+
+        aggregates = reference_stream.ingest(DATASET_PATH, chunk_rows=97)
+        expected = region_indicators()
+        indicators = reference_stream.region_indicators(aggregates)
+        self.assertEqual(indicators.keys(), expected.keys())
+        for region, value in expected.items():
+            self.assertAlmostEqual(indicators[region], value, places=12)
+
+        means = reference_stream.enterprise_means(aggregates)
+        index = num_similar_enterprises._index()
+        self.assertEqual(int(means["global"]), int(index["global"]))
+        for scope in ("exact", "sector", "region"):
+            self.assertEqual(
+                {k: int(v) for k, v in means[scope].items()}, {k: int(v) for k, v in index[scope].items()}
+            )
+
+    def test_append_folds_new_rows_without_recomputing(self):
+        import os
+        import tempfile
+
+        from django.core.management import CommandError, call_command
+
+        from . import reference_stream
+        from .fill_economic_indicator import DATASET_PATH
+        from .models import RegionIndicator
+
+        full = reference_stream.ingest(DATASET_PATH)
+        with tempfile.TemporaryDirectory() as tmp:
+            first, second = self._split(tmp, DATASET_PATH)
+            state = os.path.join(tmp, "state.json")
+
+            call_command("load_reference_data", "--stream", "--dataset", first, "--state", state, stdout=StringIO())
+            call_command("load_reference_data", "--append", second, "--state", state, stdout=StringIO())
+
+            appended = reference_stream.load(state)
+            self.assertEqual(appended["rows"], full["rows"])
+            self.assertEqual(len(appended["sources"]), 2)
+
+            # A retried append is refused and leaves the saved state alone
+            with self.assertRaises(CommandError):
+                call_command("load_reference_data", "--append", second, "--state", state, stdout=StringIO())
+            self.assertEqual(reference_stream.load(state), appended)
+
+        expected = reference_stream.region_indicators(full)
+        stored = dict(RegionIndicator.objects.values_list("region", "economic_indicator"))
+        self.assertEqual(stored.keys(), expected.keys())
+        for region, value in expected.items():
+            self.assertAlmostEqual(stored[region], value, places=12)
+        self.assertEqual(set(RegionIndicator.objects.values_list("dataset_sha256", flat=True)),
+                         {reference_stream.fingerprint(appended)})
@@ -632,12 +632,28 @@ def Admin_Dashboard(request):
     projects_count = Projects.objects.count()
     contents = SiteContent.objects.all()
 
+    # Counters of the worker that serves this request
+    from ai.services.prediction_cache import cache as prediction_cache
+    from ai.services.recommendations import FEATURE_LABELS
+    from analysis.models import DriftReport
+
+    drift_report = DriftReport.objects.first()
+    labels = FEATURE_LABELS["ar" if (translation.get_language() or "").startswith("ar") else "en"]
+    status_labels = {"stable": _("Stable"), "moderate": _("Moderate"), "significant": _("Significant")}
+    drift_rows = [
+        dict(score, feature=feature, label=labels.get(feature, feature), status_label=status_labels[score["status"]])
+        for feature, score in sorted((drift_report.scores if drift_report else {}).items(), key=lambda s: -s[1]["psi"])
+    ]
+
     context = {
         'users': users,
         'contact_messages': contact_messages,
         'users_count': users_count,
         'projects_count': projects_count,
         'contents': contents,
+        'prediction_cache': prediction_cache.stats(),
+        'drift_report': drift_report,
+        'drift_rows': drift_rows,
     }
     return render(request, "pages/admin_dashboard/admin.html", context)
 
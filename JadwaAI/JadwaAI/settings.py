@@ -129,6 +129,21 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+#  Logging (model loads, swaps and fallbacks of the ai services)
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "ai": {
+            "handlers": ["console"],
+            "level": os.environ.get("JADWA_LOG_LEVEL", "INFO"),
+        },
+    },
+}
+
 #  Auth redirects 
 LOGIN_URL = "/accounts/login/"
 LOGIN_REDIRECT_URL = "/dashboard/"
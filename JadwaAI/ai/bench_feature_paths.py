@@ -0,0 +1,54 @@
+import time
+
+import numpy as np
+
+from ai.services import feasibility, prediction_cache
+
+project = {
+    "type_project": "Service",
+    "region_project": "riyadh, riyadh",
+    "budget_project": 250000.0,
+    "project_duration_days": 180,
+    "num_saudi_employees": 4,
+    "description": "Coffee shop",
+    "num_of_similar_enterprises": 40,
+    "economic_indicator": 2,
+}
+
+RUNS = 500
+
+
+def bench(feature_path):
+    timings = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        feasibility.predict_project(project, feature_path=feature_path)
+        timings.append((time.perf_counter() - start) * 1000)
+    return np.array(timings)
+
+
+def main():
+    # Measure inference, not cache lookups
+    prediction_cache.cache = prediction_cache.PredictionCache(maxsize=0)
+
+    for path in ("pandas", "numpy"):
+        bench(path)  # warm-up
+        t = bench(path)
+        print(f"{path:>6}: mean {t.mean():.3f} ms | p50 {np.percentile(t, 50):.3f} ms | p95 {np.percentile(t, 95):.3f} ms")
+
+    features_start = time.perf_counter()
+    for _ in range(RUNS):
+        feasibility._pandas_features([project], feasibility.get_feature_columns())
+    pandas_features = (time.perf_counter() - features_start) * 1000 / RUNS
+
+    mapper = feasibility.get_feature_mapper()
+    features_start = time.perf_counter()
+    for _ in range(RUNS):
+        mapper.transform(project)
+    numpy_features = (time.perf_counter() - features_start) * 1000 / RUNS
+
+    print(f"features only: pandas {pandas_features:.3f} ms | numpy {numpy_features:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,11 @@
 # ai/services/analyzer.py
-from ai.services.feasibility import predict_project
+from ai.services.inference_backend import predict_project
 from ai.services.recommendations import build_prompt
 from ai.services.generative_ai import generate_recommendations
 
 def analyze_project(project_dict: dict, include_recommendations: bool = True, lang: str = "en") -> dict:
-    ml_result = predict_project(project_dict)
+    ml_result = predict_project(project_dict, explain=True)
+    contributions = ml_result.pop("contributions", {})
 
     raw_label = ml_result.get("label")
     is_feasible = raw_label in (1, "1", True, "True")
@@ -18,11 +19,14 @@ def analyze_project(project_dict: dict, include_recommendations: bool = True, la
         "probability": ml_result.get("probability", 0.0),
         "threshold": ml_result.get("threshold", 0.5),
         "label": label_text,
+        "model_version": ml_result.get("model_version", ""),
+        "contributions": contributions,
+        "uncertainty": ml_result.get("uncertainty") or {},
         "recommendations": "",
     }
 
     if include_recommendations:
-        prompt = build_prompt(project_dict, ml_result, lang=lang)
+        prompt = build_prompt(project_dict, ml_result, lang=lang, contributions=contributions)
         output["recommendations"] = generate_recommendations(prompt)
 
     return output
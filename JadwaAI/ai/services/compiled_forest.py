@@ -0,0 +1,148 @@
+# ai/services/compiled_forest.py
+import json
+import os
+
+import numpy as np
+
+from ai.services.feature_mapper import FeatureMapper
+
+ARRAYS = ("feature", "threshold", "left", "right", "value", "roots")
+
+
+class CompiledForest:
+    """
+    A fitted random forest flattened into contiguous NumPy node arrays.
+
+    All trees share one set of arrays; `roots` holds the index of each
+    tree's root and leaves point to themselves. `value` is the class-1
+    probability of each node.
+
+    Only NumPy is needed to load and evaluate it, no scikit-learn.
+    """
+
+    def __init__(self, arrays, max_depth, mapper):
+        self.feature = arrays["feature"]
+        self.threshold = arrays["threshold"]
+        self.left = arrays["left"]
+        self.right = arrays["right"]
+        self.value = arrays["value"]
+        self.roots = arrays["roots"]
+        self.max_depth = int(max_depth)
+        self.mapper = mapper
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, name).nbytes for name in ARRAYS)
+
+    @classmethod
+    def from_pipeline(cls, pipeline, feature_columns):
+        """
+        Export a fitted Pipeline(preprocessing, RandomForestClassifier).
+        Raises NotImplementedError if the preprocessing can't be mapped.
+        """
+        mapper = FeatureMapper.from_pipeline(pipeline, feature_columns)
+        steps = getattr(pipeline, "steps", None)
+        forest = steps[-1][1] if steps else pipeline
+
+        if getattr(forest, "n_outputs_", 1) != 1 or len(forest.classes_) != 2:
+            raise NotImplementedError("Only single-output binary forests are supported.")
+
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            n = tree.node_count
+            ids = np.arange(n)
+            is_leaf = tree.children_left == -1
+
+            counts = tree.value[:, 0, :]
+            prob = counts[:, 1] / counts.sum(axis=1)
+
+            features.append(np.where(is_leaf, 0, tree.feature).astype(np.int32))
+            thresholds.append(np.where(is_leaf, 0.0, tree.threshold))
+            lefts.append((np.where(is_leaf, ids, tree.children_left) + offset).astype(np.int32))
+            rights.append((np.where(is_leaf, ids, tree.children_right) + offset).astype(np.int32))
+            values.append(prob.astype(np.float32))
+            roots.append(offset)
+
+            offset += n
+            max_depth = max(max_depth, tree.max_depth)
+
+        arrays = {
+            "feature": np.concatenate(features),
+            "threshold": _float32_floor(np.concatenate(thresholds)),
+            "left": np.concatenate(lefts),
+            "right": np.concatenate(rights),
+            "value": np.concatenate(values),
+            "roots": np.asarray(roots, dtype=np.int32),
+        }
+        return cls(arrays, max_depth, mapper)
+
+    def save(self, path):
+        os.makedirs(path, exist_ok=True)
+        for name in ARRAYS:
+            np.save(os.path.join(path, f"{name}.npy"), np.ascontiguousarray(getattr(self, name)))
+
+        meta = {"max_depth": self.max_depth, "mapper": self.mapper.to_dict()}
+        with open(os.path.join(path, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path, mmap_mode=None):
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+
+        arrays = {
+            name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode)
+            for name in ARRAYS
+        }
+        return cls(arrays, meta["max_depth"], FeatureMapper.from_dict(meta["mapper"]))
+
+    def apply(self, x) -> np.ndarray:
+        """Leaf index reached in every tree, shape (n_samples, n_trees)."""
+        x = np.ascontiguousarray(x, dtype=np.float32)
+        n_samples, n_features = x.shape
+        flat_x = x.ravel()
+
+        nodes = np.tile(self.roots, n_samples)
+        row_start = np.repeat(np.arange(n_samples) * n_features, self.n_trees)
+        active = np.arange(nodes.size)
+
+        # Walk all (sample, tree) pairs at once; pairs drop out as soon as
+        # they reach a leaf (a node whose children point back to itself)
+        for _ in range(self.max_depth):
+            current = nodes[active]
+            go_left = flat_x[row_start[active] + self.feature[current]] <= self.threshold[current]
+            current = np.where(go_left, self.left[current], self.right[current])
+            nodes[active] = current
+
+            still = self.left[current] != current
+            active = active[still]
+            if not active.size:
+                break
+
+        return nodes.reshape(n_samples, self.n_trees)
+
+    def tree_votes(self, x) -> np.ndarray:
+        """Class-1 probability of every tree, shape (n_samples, n_trees)."""
+        return self.value[self.apply(x)]
+
+    def predict_proba(self, x) -> np.ndarray:
+        positive = self.tree_votes(x).mean(axis=1, dtype=np.float64)
+        return np.column_stack([1.0 - positive, positive])
+
+
+def _float32_floor(values):
+    # scikit-learn compares float32 inputs against float64 thresholds. The
+    # largest float32 <= threshold gives the same decision for every float32
+    # input, which a plain round-to-nearest cast does not guarantee.
+    down = values.astype(np.float32)
+    above = down.astype(np.float64) > values
+    down[above] = np.nextafter(down[above], np.float32(-np.inf))
+    return down
@@ -0,0 +1,80 @@
+# ai/services/contributions.py
+import logging
+
+import numpy as np
+
+from ai.services.compiled_forest import CompiledForest
+
+logger = logging.getLogger(__name__)
+
+
+class ContributionTable:
+    """
+    Tree-path (Saabas) decomposition of a random forest, precomputed per node.
+
+    Walking from a tree's root to a leaf, every split moves the class-1
+    probability from the parent's value to the child's; that change is
+    credited to the split's input column. `node_contrib[n]` is the sum of
+    those credits from the root down to node n, with one-hot outputs
+    already folded back into their input column.
+
+    Explaining rows then costs one forest.apply() plus a gather:
+        prediction = bias + contributions.sum()
+    """
+
+    def __init__(self, forest, columns, node_contrib, bias):
+        self.forest = forest
+        self.columns = list(columns)
+        self.node_contrib = node_contrib
+        self.bias = float(bias)
+
+    @property
+    def nbytes(self) -> int:
+        return self.node_contrib.nbytes
+
+    @classmethod
+    def from_compiled(cls, forest):
+        output_columns = forest.mapper.output_columns()
+        columns = list(dict.fromkeys(c for c in output_columns if c is not None))
+        group = np.array([columns.index(c) for c in output_columns], dtype=np.int32)
+
+        value = forest.value.astype(np.float64)
+        contrib = np.zeros((len(value), len(columns)), dtype=np.float64)
+
+        # Top-down, one tree level at a time for all trees together
+        frontier = np.asarray(forest.roots, dtype=np.int64)
+        while frontier.size:
+            parents = frontier[forest.left[frontier] != frontier]
+            if not parents.size:
+                break
+            feature = group[forest.feature[parents]]
+
+            for children in (forest.left[parents], forest.right[parents]):
+                contrib[children] = contrib[parents]
+                contrib[children, feature] += value[children] - value[parents]
+
+            frontier = np.concatenate([forest.left[parents], forest.right[parents]])
+
+        bias = value[forest.roots].mean()
+        return cls(forest, columns, contrib.astype(np.float32), bias)
+
+    @classmethod
+    def from_model(cls, model, feature_columns):
+        """None when the model can't be flattened (e.g. unsupported preprocessing)."""
+        try:
+            forest = model if isinstance(model, CompiledForest) else CompiledForest.from_pipeline(model, feature_columns)
+        except (NotImplementedError, AttributeError, ValueError) as e:
+            logger.warning("Contributions unavailable: %s", e)
+            return None
+        return cls.from_compiled(forest)
+
+    def explain_matrix(self, x):
+        """
+        (raw class-1 probabilities, contributions of shape (n_rows, n_columns))
+        for rows already mapped by the forest's FeatureMapper.
+        """
+        nodes = self.forest.apply(x)
+        per_tree = self.node_contrib[nodes]
+        contributions = per_tree.mean(axis=1, dtype=np.float64)
+        raw = self.bias + contributions.sum(axis=1)
+        return raw, contributions
@@ -0,0 +1,162 @@
+# ai/services/counterfactual.py
+import numpy as np
+
+from ai.services import feasibility
+from ai.services.what_if import score_cells
+
+COARSE_BUDGET_POINTS = 400
+REFINE_POINTS = 64
+REFINE_ROUNDS = 4
+BUDGET_STEP = 100  # SAR; suggested budgets are rounded to this
+
+
+def _current(project_dict, feature) -> float:
+    return float(project_dict.get(feature) or 0)
+
+
+def _candidates(project_dict) -> dict:
+    """Values to try for each input, on both sides of the current value."""
+    budget = _current(project_dict, "budget_project")
+    employees = int(_current(project_dict, "num_saudi_employees"))
+
+    low, high = (budget / 50, budget * 50) if budget > 0 else (1000.0, 1e8)
+    return {
+        "budget_project": np.geomspace(max(low, 1000.0), max(high, 1e6), COARSE_BUDGET_POINTS),
+        # The form asks for whole months; build_project_data uses months * 30
+        "project_duration_days": np.arange(1, 121) * 30.0,
+        "num_saudi_employees": np.arange(0, max(100, 3 * employees) + 1, dtype=np.float64),
+    }
+
+
+def _score_blocks(loaded, project_dict, blocks):
+    """
+    Score several single-input sweeps in one forest call. `blocks` is
+    [(feature, values)]; in each block only that input differs from the project.
+    """
+    features = [feature for feature, _ in blocks]
+    sizes = [len(values) for _, values in blocks]
+
+    columns = {}
+    for feature in set(features):
+        parts = [
+            np.asarray(values, dtype=np.float64) if f == feature else np.full(size, _current(project_dict, feature))
+            for (f, values), size in zip(blocks, sizes)
+        ]
+        columns[feature] = np.concatenate(parts)
+
+    probabilities, thresholds = score_cells(loaded, project_dict, columns)
+    bounds = np.cumsum([0] + sizes)
+    return [
+        (probabilities[a:b], thresholds[a:b])
+        for a, b in zip(bounds[:-1], bounds[1:])
+    ]
+
+
+def _closest_passing(values, passed, current):
+    if not passed.any():
+        return None
+    hits = np.flatnonzero(passed)
+    return int(hits[np.argmin(np.abs(values[hits] - current))])
+
+
+def _refine_budget(loaded, project_dict, values, passed, best, current):
+    """
+    Narrow the gap between the closest passing budget and its failing
+    neighbour on the side of the current budget. The adjusted probability is
+    not monotonic in budget, so every round re-evaluates a dense batch of the
+    bracket instead of bisecting on a single probe.
+    """
+    step = -1 if values[best] > current else 1
+    neighbour = best + step
+    if not 0 <= neighbour < len(values) or passed[neighbour]:
+        return values[best], 0
+
+    fail_value, pass_value = values[neighbour], values[best]
+    evaluated = 0
+    for _ in range(REFINE_ROUNDS):
+        probe = np.linspace(fail_value, pass_value, REFINE_POINTS + 2)[1:-1]
+        (probabilities, thresholds), = _score_blocks(loaded, project_dict, [("budget_project", probe)])
+        evaluated += len(probe)
+
+        hit = _closest_passing(probe, probabilities >= thresholds, current)
+        if hit is None:
+            break
+
+        # `probe` runs from the failing side to the passing side
+        pass_value = probe[hit]
+        fail_value = probe[hit - 1] if hit > 0 else fail_value
+        if abs(pass_value - fail_value) < BUDGET_STEP:
+            break
+
+    return pass_value, evaluated
+
+
+def find_counterfactuals(project_dict) -> dict:
+    """
+    For a project below its threshold, the smallest change to budget,
+    duration or Saudi employees (one at a time) that makes predict_project
+    label it feasible. Inputs with no passing value in range are left out.
+    """
+    loaded = feasibility.get_loaded()
+    budget = _current(project_dict, "budget_project")
+
+    candidates = _candidates(project_dict)
+    blocks = [("budget_project", np.array([budget]))] + list(candidates.items())
+    scored = _score_blocks(loaded, project_dict, blocks)
+    evaluated = sum(len(values) for _, values in blocks)
+
+    (probability, threshold), scored = scored[0], scored[1:]
+    result = {
+        "model_version": loaded.version,
+        "probability": float(probability[0]),
+        "threshold": float(threshold[0]),
+        "feasible": bool(probability[0] >= threshold[0]),
+        "changes": [],
+    }
+    if result["feasible"]:
+        result["evaluated"] = evaluated
+        return result
+
+    suggestions = []
+    for (feature, values), (probabilities, thresholds) in zip(candidates.items(), scored):
+        current = _current(project_dict, feature)
+        passed = probabilities >= thresholds
+        best = _closest_passing(values, passed, current)
+        if best is None:
+            continue
+
+        value = values[best]
+        if feature == "budget_project":
+            value, extra = _refine_budget(loaded, project_dict, values, passed, best, current)
+            evaluated += extra
+
+            rounded = (np.ceil if value > current else np.floor)(value / BUDGET_STEP) * BUDGET_STEP
+            suggestions.append((feature, np.array([rounded, value])))
+        else:
+            suggestions.append((feature, np.array([value])))
+
+    # Score the final values once more, so the reported probability is exact
+    for (feature, values), (probabilities, thresholds) in zip(
+        suggestions, _score_blocks(loaded, project_dict, suggestions) if suggestions else []
+    ):
+        evaluated += len(values)
+        ok = np.flatnonzero(probabilities >= thresholds)
+        if not ok.size:
+            continue
+
+        i = int(ok[0])  # prefer the rounded budget when it still passes
+        current = _current(project_dict, feature)
+        value = float(values[i])
+        result["changes"].append({
+            "feature": feature,
+            "from": current,
+            "to": value,
+            "change": value - current,
+            "relative_change": (value - current) / current if current else None,
+            "probability": float(probabilities[i]),
+            "threshold": float(thresholds[i]),
+        })
+
+    result["changes"].sort(key=lambda c: abs(c["relative_change"]) if c["relative_change"] is not None else float("inf"))
+    result["evaluated"] = evaluated
+    return result
@@ -0,0 +1,252 @@
+# ai/services/drift.py
+"""
+Do analysed projects still look like the training data?
+
+run_analysis records each project's model inputs into an in-process
+buffer (a list append). Every FLUSH_SIZE projects, or when a timer fires
+FLUSH_SECONDS after the first buffered one, a background thread folds
+the buffer into the FeatureStats rows: histogram counts on the training
+data's bin edges plus count/mean/M2, so storage stays constant however
+many projects come in. compute_drift compares them with the dataset (PSI per input)
+and stores a DriftReport for the admin dashboard.
+
+Buffered projects of a worker that exits before its next flush are not
+counted; drift only needs a representative sample.
+"""
+import logging
+import os
+import threading
+from functools import lru_cache
+
+import numpy as np
+
+from ai.services.synthetic_projects import DATASET_PATH
+
+logger = logging.getLogger(__name__)
+
+# The numeric inputs build_project_data gives the model, minus two whose
+# reference is all zeros and would report drift forever: num_enterprises
+# (projects carry num_of_similar_enterprises instead, so the model column
+# is always 0) and economic_indicator (empty in the training CSV, while
+# live projects send 1-3).
+FEATURES = [
+    "budget_project",
+    "project_duration_days",
+    "num_saudi_employees",
+]
+
+ENABLED = os.getenv("JADWA_DRIFT_MONITORING", "1") != "0"
+FLUSH_SIZE = int(os.getenv("JADWA_DRIFT_FLUSH_SIZE", "50"))
+FLUSH_SECONDS = float(os.getenv("JADWA_DRIFT_FLUSH_SECONDS", "60"))
+
+BINS = 10
+# Usual PSI reading: below 0.1 stable, up to 0.25 moderate, above significant
+PSI_MODERATE = 0.1
+PSI_SIGNIFICANT = 0.25
+
+
+def feature_values(project_dict) -> list:
+    """The inputs as the model sees them: missing -> 0."""
+    values = []
+    for feature in FEATURES:
+        try:
+            value = float(project_dict.get(feature) or 0)
+        except (TypeError, ValueError):
+            value = 0.0
+        values.append(0.0 if np.isnan(value) else value)
+    return values
+
+
+def bin_counts(values, edges) -> np.ndarray:
+    """Counts per (lower, upper] bin; the first and last bins are open-ended."""
+    return np.bincount(np.searchsorted(edges, values, side="left"), minlength=len(edges) + 1)
+
+
+def summarize(values, edges) -> dict:
+    values = np.asarray(values, dtype=np.float64)
+    mean = float(values.mean())
+    return {
+        "counts": bin_counts(values, edges).tolist(),
+        "count": len(values),
+        "mean": mean,
+        "m2": float(((values - mean) ** 2).sum()),
+        "min_value": float(values.min()),
+        "max_value": float(values.max()),
+    }
+
+
+def merge(a, b) -> dict:
+    """Two summaries of disjoint samples -> summary of both (Chan et al.)."""
+    if not a["count"]:
+        return dict(b)
+    n = a["count"] + b["count"]
+    delta = b["mean"] - a["mean"]
+    return {
+        "counts": (np.asarray(a["counts"]) + np.asarray(b["counts"])).tolist(),
+        "count": n,
+        "mean": a["mean"] + delta * b["count"] / n,
+        "m2": a["m2"] + b["m2"] + delta ** 2 * a["count"] * b["count"] / n,
+        "min_value": min(a["min_value"], b["min_value"]),
+        "max_value": max(a["max_value"], b["max_value"]),
+    }
+
+
+@lru_cache(maxsize=2)
+def _reference(path, mtime):
+    import pandas as pd
+
+    from ai.services import training
+
+    frame, _ = training.clean_dataset(pd.read_csv(path))
+    frame["budget_project"] = np.expm1(frame["budget_project"])
+
+    reference = {}
+    for feature in FEATURES:
+        values = frame[feature].to_numpy(dtype=np.float64)
+        # Training deciles as edges; repeated values collapse into fewer bins
+        edges = np.unique(np.quantile(values, np.linspace(0, 1, BINS + 1)[1:-1]))
+        reference[feature] = dict(summarize(values, edges), edges=edges.tolist())
+    return reference
+
+
+def reference(path=DATASET_PATH) -> dict:
+    """Per-input summary of the training dataset, with its bin edges."""
+    return _reference(path, os.stat(path).st_mtime_ns)
+
+
+def psi(expected, actual, eps=1e-4) -> float:
+    expected = np.maximum(np.asarray(expected, dtype=np.float64) / max(sum(expected), 1), eps)
+    actual = np.maximum(np.asarray(actual, dtype=np.float64) / max(sum(actual), 1), eps)
+    return float(((actual - expected) * np.log(actual / expected)).sum())
+
+
+def status(score) -> str:
+    if score >= PSI_SIGNIFICANT:
+        return "significant"
+    if score >= PSI_MODERATE:
+        return "moderate"
+    return "stable"
+
+
+def drift_scores(live, ref) -> dict:
+    """`live` and `ref` map feature -> summary; features without live data are skipped."""
+    scores = {}
+    for feature, r in ref.items():
+        s = live.get(feature)
+        if not s or not s["count"] or s.get("edges") != r["edges"]:
+            continue
+        score = psi(r["counts"], s["counts"])
+        scores[feature] = {
+            "psi": round(score, 4),
+            "status": status(score),
+            "count": s["count"],
+            "mean": s["mean"],
+            "std": (s["m2"] / s["count"]) ** 0.5,
+            "reference_mean": r["mean"],
+            "reference_std": (r["m2"] / r["count"]) ** 0.5,
+        }
+    return scores
+
+
+def write(rows, dataset_path=DATASET_PATH):
+    """Fold buffered feature rows into FeatureStats in one transaction."""
+    from django.db import transaction
+    from django.utils import timezone
+
+    from analysis.models import FeatureStats
+
+    ref = reference(dataset_path)
+    matrix = np.asarray(rows, dtype=np.float64)
+
+    with transaction.atomic():
+        # Write first: SQLite takes its write lock here (select_for_update is
+        # a no-op there), so concurrent flushes never merge into stale rows
+        FeatureStats.objects.filter(feature__in=FEATURES).update(updated_at=timezone.now())
+
+        for i, feature in enumerate(FEATURES):
+            edges = ref[feature]["edges"]
+            batch = summarize(matrix[:, i], edges)
+
+            stats, _ = FeatureStats.objects.select_for_update().get_or_create(feature=feature)
+            current = {
+                "counts": stats.counts, "count": stats.count, "mean": stats.mean, "m2": stats.m2,
+                "min_value": stats.min_value, "max_value": stats.max_value,
+            }
+            if stats.edges != edges:
+                # New reference bins (dataset changed): start a new window
+                current["count"] = 0
+
+            for name, value in merge(current, batch).items():
+                setattr(stats, name, value)
+            stats.edges = edges
+            stats.save()
+
+
+class DriftBuffer:
+
+    def __init__(self, flush_size=FLUSH_SIZE, flush_seconds=FLUSH_SECONDS):
+        self.flush_size = flush_size
+        self.flush_seconds = flush_seconds
+        self._rows = []
+        self._timer = None
+        self._lock = threading.Lock()
+
+    def record(self, project_dict):
+        row = feature_values(project_dict)
+        with self._lock:
+            self._rows.append(row)
+            if len(self._rows) >= self.flush_size:
+                rows = self._take()
+            else:
+                rows = None
+                if self._timer is None:
+                    # Flushes a quiet worker's rows too, not only on the next request
+                    self._timer = threading.Timer(self.flush_seconds, self._flush_late)
+                    self._timer.name = "jadwa-drift-flush"
+                    self._timer.daemon = True
+                    self._timer.start()
+
+        if rows:
+            threading.Thread(target=self._write, args=(rows,), name="jadwa-drift-flush", daemon=True).start()
+
+    def flush(self):
+        """Write whatever is buffered now, in this thread."""
+        with self._lock:
+            rows = self._take()
+        if rows:
+            write(rows)
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._rows)
+
+    def _take(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        rows, self._rows = self._rows, []
+        return rows
+
+    def _flush_late(self):
+        with self._lock:
+            rows = self._take()
+        if rows:
+            self._write(rows)
+
+    def _write(self, rows):
+        from django.db import connection
+
+        try:
+            write(rows)
+        except Exception as e:
+            logger.warning("Drift stats flush failed, %d projects dropped: %s", len(rows), e)
+        finally:
+            connection.close()
+
+
+buffer = DriftBuffer()
+
+
+def record(project_dict):
+    if ENABLED:
+        buffer.record(project_dict)
@@ -1,7 +1,19 @@
+import logging
 import os
+import threading
+import time
+from collections import namedtuple
+
 import joblib
-import pandas as pd
 import numpy as np
+from joblib import Parallel, delayed, effective_n_jobs
+
+from ai.services import model_registry, prediction_cache
+from ai.services.compiled_forest import CompiledForest
+from ai.services.contributions import ContributionTable
+from ai.services.feature_mapper import FeatureMapper
+
+logger = logging.getLogger(__name__)
 
 # Paths
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -9,11 +21,46 @@ AI_DIR = os.path.dirname(BASE_DIR)
 
 MODEL_PATH = os.path.join(AI_DIR, "models", "rf_pipeline.pkl")
 FEATURES_PATH = os.path.join(AI_DIR, "models", "feature_columns.pkl")
+COMPILED_PATH = os.path.join(AI_DIR, "models", "rf_compiled")
+
+# "compiled" uses the exported array forest (no scikit-learn import),
+# "sklearn" the pickled pipeline, "auto" the compiled one when exported
+INFERENCE_ENGINE = os.getenv("JADWA_INFERENCE_ENGINE", "auto")
+
+# Memory-map large arrays so workers forked from a preloaded master
+# (gunicorn --preload) share the model pages instead of copying them
+MODEL_MMAP_MODE = os.getenv("JADWA_MODEL_MMAP_MODE", "r") or None
+
+# "numpy" maps project dicts straight to a float64 row (FeatureMapper),
+# "pandas" keeps the original DataFrame path
+FEATURE_PATH = os.getenv("JADWA_FEATURE_PATH", "numpy")
+
+# How often (seconds) a worker checks the registry's ACTIVE pointer
+RELOAD_INTERVAL = float(os.getenv("JADWA_MODEL_RELOAD_INTERVAL", "5"))
 
-# Load model & feature columns once
-model = joblib.load(MODEL_PATH)
-feature_columns = joblib.load(FEATURES_PATH)
+# Version reported when no registry exists and ai/models/ is used directly
+LEGACY_VERSION = "legacy"
 
+# Percentiles of the per-tree votes reported as a prediction's band
+SPREAD_QUANTILES = (10, 90)
+
+# Batches from this many rows vote on the sklearn path with one thread per
+# core (the forest's n_jobs); smaller ones aren't worth the thread start-up
+PARALLEL_MIN_ROWS = int(os.getenv("JADWA_PARALLEL_MIN_ROWS", "32"))
+
+# Below this share of trees agreeing with the decision, a result is
+# flagged low-confidence (and gets the more careful recommendation prompt)
+LOW_CONFIDENCE_AGREEMENT = float(os.getenv("JADWA_LOW_CONFIDENCE_AGREEMENT", "0.65"))
+
+# Everything a prediction needs, swapped as one object so a request never
+# mixes the model of one version with the features of another
+LoadedModel = namedtuple("LoadedModel", "version model feature_columns mapper explainer")
+
+# Loaded on first use (or by AnalysisConfig.ready), not at import time
+_loaded = None
+_seen_pointer = None
+_next_check = 0.0
+_load_lock = threading.Lock()
 
 # def dynamic_threshold(budget):
 #     if budget < 100000:
@@ -60,8 +107,154 @@ def dynamic_threshold(budget):
 #         "label": label
 #     }
 
-def predict_project(project_dict):
-    x = pd.DataFrame([project_dict])
+def make_loaded(model, feature_columns, version=LEGACY_VERSION):
+    if isinstance(model, CompiledForest):
+        mapper = model.mapper
+    else:
+        try:
+            mapper = FeatureMapper.from_pipeline(model, feature_columns)
+        except NotImplementedError as e:
+            logger.warning("FeatureMapper unavailable, using pandas path: %s", e)
+            mapper = None
+
+    # Per-node contributions are built here, once per model, so explaining
+    # a prediction later is a single forest pass
+    explainer = ContributionTable.from_model(model, feature_columns) if mapper is not None else None
+
+    return LoadedModel(version, model, list(feature_columns), mapper, explainer)
+
+
+def _use_compiled(compiled_path):
+    if INFERENCE_ENGINE == "compiled":
+        return True
+    return INFERENCE_ENGINE == "auto" and compiled_path is not None and os.path.isdir(compiled_path)
+
+
+def load_model(version=None):
+    """Load a registry version, or the files in ai/models/ when version is None."""
+    if version is None:
+        paths = {"features": FEATURES_PATH, "pipeline": MODEL_PATH, "compiled": COMPILED_PATH}
+    else:
+        model_registry.verify(version)
+        paths = model_registry.artifact_paths(version)
+
+    # A version can hold only a compiled forest (e.g. from compress_model)
+    if _use_compiled(paths["compiled"]) or not paths["pipeline"]:
+        model = CompiledForest.load(paths["compiled"], mmap_mode=MODEL_MMAP_MODE)
+    else:
+        # Only uncompressed joblib dumps can be memory-mapped; scikit-learn
+        # also copies tree nodes into its own buffers, so the compiled forest
+        # is the one that really shares pages between workers.
+        model = joblib.load(paths["pipeline"], mmap_mode=MODEL_MMAP_MODE)
+
+    return make_loaded(model, joblib.load(paths["features"]), version or LEGACY_VERSION)
+
+
+def _reload(current):
+    global _loaded, _seen_pointer
+
+    # Swaps happen in the background of normal traffic: if another thread is
+    # already loading, keep serving the current model instead of waiting.
+    if not _load_lock.acquire(blocking=current is None):
+        return current
+
+    try:
+        if _loaded is not current:
+            return _loaded
+
+        pointer = model_registry.active_version()
+        if current is not None and pointer == _seen_pointer:
+            return current
+
+        try:
+            loaded = load_model(pointer)
+        except Exception as e:
+            if current is None:
+                raise
+            logger.warning("Model reload to %s failed, keeping %s: %s", pointer, current.version, e)
+            _seen_pointer = pointer
+            return current
+
+        if current is not None:
+            logger.info("Model swapped: %s -> %s (pid %s)", current.version, loaded.version, os.getpid())
+            prediction_cache.cache.clear()
+
+        _loaded, _seen_pointer = loaded, pointer
+        return loaded
+    finally:
+        _load_lock.release()
+
+
+def get_loaded():
+    """
+    The model snapshot to use for one request. Callers should fetch it once
+    and use it for the whole request, so a swap never happens mid-request.
+    """
+    global _next_check
+
+    loaded = _loaded
+    if loaded is None:
+        return _reload(None)
+
+    now = time.monotonic()
+    if now < _next_check:
+        return loaded
+
+    _next_check = now + RELOAD_INTERVAL
+    if model_registry.active_version() == _seen_pointer:
+        return loaded
+    return _reload(loaded)
+
+
+def get_model():
+    return get_loaded().model
+
+
+def get_version():
+    return get_loaded().version
+
+
+def get_feature_columns():
+    return get_loaded().feature_columns
+
+
+def get_feature_mapper():
+    """
+    FeatureMapper for the loaded model, or None if the pipeline uses
+    preprocessing the mapper does not support.
+    """
+    return get_loaded().mapper
+
+
+def warm_up():
+    """Load the model ahead of the first request (see AnalysisConfig.ready)."""
+    start = time.perf_counter()
+    try:
+        from ai.services.memory import format_mb, rss_mb
+
+        before = rss_mb()
+        loaded = get_loaded()
+    except Exception as e:
+        logger.warning("Model warm-up skipped: %s", e)
+        return None
+
+    logger.info(
+        "Model warmed: %s (%s) in %.0f ms, pid %s RSS %s -> %s MB",
+        loaded.version, type(loaded.model).__name__, (time.perf_counter() - start) * 1000,
+        os.getpid(), format_mb(before), format_mb(rss_mb()),
+    )
+    return loaded
+
+
+def _final_estimator(model):
+    steps = getattr(model, "steps", None)
+    return steps[-1][1] if steps else model
+
+
+def _pandas_features(project_dicts, feature_columns):
+    import pandas as pd
+
+    x = pd.DataFrame(project_dicts)
 
     for col in feature_columns:
         if col not in x.columns:
@@ -73,8 +266,111 @@ def predict_project(project_dict):
     if "budget_project" in x.columns:
         x["budget_project"] = np.log1p(x["budget_project"])
 
+    return x
+
+
+def _predict_matrix(loaded, x):
+    """Class-1 probability for rows already mapped by loaded.mapper."""
+    return _final_estimator(loaded.model).predict_proba(x)[:, 1]
+
+
+def _forest_votes(forest, x, n_jobs=None):
+    """
+    Class-1 vote of every tree for preprocessed rows, shape (n_rows, n_trees).
+    The compiled forest is the fast path; on the sklearn path large batches
+    spread the trees over `n_jobs` threads (default: the forest's n_jobs).
+    """
+    if isinstance(forest, CompiledForest):
+        return forest.tree_votes(x)
+
+    if getattr(forest, "estimators_", None) is None:
+        # Not a forest: its probability is the only "vote"
+        return forest.predict_proba(x)[:, 1:2]
+
+    # The loop RandomForestClassifier.predict_proba runs, keeping every
+    # tree's vote instead of only their running sum
+    if hasattr(x, "toarray"):
+        x = x.toarray()
+    x = np.ascontiguousarray(x, dtype=np.float32)
+    trees = forest.estimators_
+    votes = np.empty((x.shape[0], len(trees)))
+
+    def fill(block):
+        for i in block:
+            votes[:, i] = trees[i].predict_proba(x, check_input=False)[:, 1]
+
+    # One block of trees per thread, as predict_proba splits them; tree
+    # prediction releases the GIL, so the threads really run in parallel
+    if n_jobs is None:
+        n_jobs = effective_n_jobs(forest.n_jobs) if x.shape[0] >= PARALLEL_MIN_ROWS else 1
+    blocks = np.array_split(np.arange(len(trees)), max(1, min(n_jobs, len(trees))))
+    if len(blocks) == 1:
+        fill(blocks[0])
+    else:
+        Parallel(n_jobs=len(blocks), prefer="threads")(delayed(fill)(block) for block in blocks)
+    return votes
+
+
+def _tree_votes(loaded, project_dicts, feature_path=None):
+    model = loaded.model
+
+    if isinstance(model, CompiledForest):
+        return model.tree_votes(model.mapper.transform_many(project_dicts))
+
+    if (feature_path or FEATURE_PATH) == "numpy" and loaded.mapper is not None:
+        x = loaded.mapper.transform_many(project_dicts)
+    else:
+        x = _pandas_features(project_dicts, loaded.feature_columns)
+        if getattr(model, "steps", None):
+            x = model[:-1].transform(x)
+
+    return _forest_votes(_final_estimator(model), x)
+
+
+def _raw_probabilities(loaded, project_dicts, feature_path=None):
+    return _tree_votes(loaded, project_dicts, feature_path).mean(axis=1)
+
+
+def uncertainties(votes, budgets, thresholds) -> list:
+    """
+    Spread of the per-tree votes behind each prediction. `low`/`high` are
+    the 10th/90th percentile votes and `agreement` the share of trees on the
+    side of the threshold the mean landed on, all after the budget rule.
+    """
+    votes = np.asarray(votes, dtype=np.float64)
+    budgets = np.asarray(budgets, dtype=float)
+    thresholds = np.asarray(thresholds, dtype=float)[:, None]
+
+    adjusted = adjust_probabilities(votes, np.broadcast_to(budgets[:, None], votes.shape))
+    decision = adjust_probabilities(votes.mean(axis=1), budgets)[:, None] >= thresholds
+    agreement = ((adjusted >= thresholds) == decision).mean(axis=1)
+    low, high = np.percentile(adjusted, SPREAD_QUANTILES, axis=1)
+    std = votes.std(axis=1)
+
+    return [
+        {
+            "std": round(float(sd), 5),
+            "low": round(float(lo), 5),
+            "high": round(float(hi), 5),
+            "agreement": round(float(a), 5),
+            "trees": int(votes.shape[1]),
+            "low_confidence": bool(a < LOW_CONFIDENCE_AGREEMENT),
+        }
+        for sd, lo, hi, a in zip(std, low, high, agreement)
+    ]
+
+
+def predict_project(project_dict, feature_path=None):
+    loaded = get_loaded()
+
+    key = prediction_cache.make_key(loaded.version, project_dict, loaded.feature_columns)
+    cached = prediction_cache.cache.get(key)
+    if cached is not None:
+        return cached
+
     # Predict
-    probability = float(model.predict_proba(x)[0][1])
+    votes = _tree_votes(loaded, [project_dict], feature_path)
+    probability = float(votes[0].mean())
 
     # Get budget
     budget = float(project_dict.get("budget_project", 0))
@@ -99,8 +395,124 @@ def predict_project(project_dict):
     # Decision
     label = int(probability >= threshold)
 
-    return {
+    result = {
         "probability": probability,
         "threshold": threshold,
-        "label": label
-    }
\ No newline at end of file
+        "label": label,
+        "model_version": loaded.version,
+        "uncertainty": uncertainties(votes, [budget], [threshold])[0],
+    }
+    prediction_cache.cache.set(key, result)
+    return result
+
+
+def dynamic_thresholds(budgets):
+    budgets = np.asarray(budgets, dtype=float)
+    return np.select(
+        [budgets < 100000, budgets < 500000],
+        [0.75, 0.80],
+        default=0.70,
+    )
+
+
+def adjust_probabilities(probabilities, budgets):
+    # Same budget adjustment as predict_project, applied to whole arrays
+    probabilities = np.array(probabilities, dtype=float)
+    budgets = np.asarray(budgets, dtype=float)
+
+    small = budgets < 100000
+    medium = ~small & (budgets < 500000)
+    large = ~small & ~medium
+
+    probabilities[small] *= 0.85 + (budgets[small] / 100000) * 0.10
+    probabilities[medium] *= 0.90 + (budgets[medium] / 500000) * 0.05
+    probabilities[large] += ((budgets[large] % 10000000) / 1000000000) * 0.3
+
+    return np.clip(probabilities, 0.0, 1.0)
+
+
+def predict_projects(project_dicts, feature_path=None, loaded=None):
+    """
+    Batch version of predict_project: one feature matrix and one
+    predict_proba call for the whole list. Returns one result dict per input, in order.
+    `loaded` scores with a specific load_model() snapshot instead of the active one.
+    """
+    project_dicts = list(project_dicts)
+    if not project_dicts:
+        return []
+
+    loaded = loaded or get_loaded()
+    keys = [prediction_cache.make_key(loaded.version, d, loaded.feature_columns) for d in project_dicts]
+    results = [prediction_cache.cache.get(key) for key in keys]
+
+    # Only the cache misses go through the model, still as one batch
+    missing = [i for i, r in enumerate(results) if r is None]
+    if not missing:
+        return results
+
+    todo = [project_dicts[i] for i in missing]
+    votes = _tree_votes(loaded, todo, feature_path)
+
+    budgets = [float(d.get("budget_project", 0)) for d in todo]
+    probabilities = adjust_probabilities(votes.mean(axis=1), budgets)
+    thresholds = dynamic_thresholds(budgets)
+    labels = probabilities >= thresholds
+    spreads = uncertainties(votes, budgets, thresholds)
+
+    for i, p, t, l, u in zip(missing, probabilities, thresholds, labels, spreads):
+        results[i] = {
+            "probability": float(p),
+            "threshold": float(t),
+            "label": int(l),
+            "model_version": loaded.version,
+            "uncertainty": u,
+        }
+        prediction_cache.cache.set(keys[i], results[i])
+
+    return results
+
+
+def explain_projects(project_dicts, loaded=None):
+    """
+    Per-input contributions to each project's probability. `values` plus
+    `bias` give the model's raw probability; `adjustment` is what the budget
+    rule in predict_project adds on top. Empty dicts when the loaded model
+    can't be decomposed.
+    """
+    project_dicts = list(project_dicts)
+    loaded = loaded or get_loaded()
+    if loaded.explainer is None or not project_dicts:
+        return [{} for _ in project_dicts]
+
+    raw, contributions = loaded.explainer.explain_matrix(loaded.mapper.transform_many(project_dicts))
+    budgets = [float(d.get("budget_project", 0)) for d in project_dicts]
+    probabilities = adjust_probabilities(raw, budgets)
+
+    return [
+        {
+            "model_version": loaded.version,
+            "bias": round(loaded.explainer.bias, 5),
+            "values": {col: round(float(c), 5) for col, c in zip(loaded.explainer.columns, row)},
+            "adjustment": round(float(p - r), 5),
+        }
+        for row, r, p in zip(contributions, raw, probabilities)
+    ]
+
+
+def explain_project(project_dict, loaded=None):
+    return explain_projects([project_dict], loaded)[0]
+
+
+def score_projects(project_dicts, explain=False, loaded=None):
+    """
+    predict_projects, optionally with explain_projects merged in under
+    "contributions". This is the unit of work inference backends run.
+    """
+    project_dicts = list(project_dicts)
+    loaded = loaded or get_loaded()
+    results = predict_projects(project_dicts, loaded=loaded)
+
+    if explain:
+        for result, contributions in zip(results, explain_projects(project_dicts, loaded)):
+            result["contributions"] = contributions
+    return results
@@ -0,0 +1,257 @@
+# ai/services/feature_mapper.py
+import warnings
+
+import numpy as np
+
+LOG_COLUMNS = ("budget_project",)
+
+
+def _is_missing(value) -> bool:
+    if value is None:
+        return True
+    try:
+        return bool(np.isnan(value))
+    except TypeError:
+        return False
+
+
+def _numeric_value(value, column) -> float:
+    # Same as fillna(0) followed by np.log1p on the budget column
+    value = 0.0 if _is_missing(value) else float(value)
+    if column in LOG_COLUMNS:
+        value = float(np.log1p(value))
+    return value
+
+
+def _categorical_value(value):
+    # fillna(0) turns a missing category into 0, which never matches a
+    # fitted category, so it behaves like an unknown value
+    return 0 if _is_missing(value) else value
+
+
+class FeatureMapper:
+    """
+    Turns a build_project_data dict straight into the float64 row that the
+    forest receives, without building a DataFrame.
+
+    It is compiled once from the fitted pipeline into a list of
+    (column, kind, output index, params) steps, where kind is one of
+    "numeric", "onehot" or "ordinal".
+    """
+
+    def __init__(self, feature_columns, steps, n_outputs):
+        self.feature_columns = list(feature_columns)
+        self.steps = steps
+        self.n_outputs = int(n_outputs)
+
+    @classmethod
+    def from_pipeline(cls, pipeline, feature_columns):
+        feature_columns = list(feature_columns)
+        preprocess = getattr(pipeline, "steps", [])[:-1]
+
+        if not preprocess:
+            steps = [
+                (col, "numeric", i, {"offset": 0.0, "divisor": 1.0})
+                for i, col in enumerate(feature_columns)
+            ]
+            return cls(feature_columns, steps, len(feature_columns))
+
+        if len(preprocess) != 1:
+            raise NotImplementedError("Only a single preprocessing step is supported.")
+
+        transformer = preprocess[0][1]
+        if transformer.__class__.__name__ != "ColumnTransformer":
+            raise NotImplementedError(f"Unsupported preprocessing: {transformer.__class__.__name__}")
+
+        with warnings.catch_warnings():
+            # sklearn warns that remainder columns will become names; both work
+            warnings.simplefilter("ignore", FutureWarning)
+            fitted = [
+                (trans, _resolve_columns(columns, feature_columns))
+                for _, trans, columns in transformer.transformers_
+            ]
+
+        steps = []
+        out = 0
+        for trans, columns in fitted:
+            if trans == "drop" or not columns:
+                continue
+
+            kind = trans if isinstance(trans, str) else trans.__class__.__name__
+            if kind == "FunctionTransformer" and trans.func is None:
+                # how a fitted ColumnTransformer stores "passthrough"
+                kind = "passthrough"
+
+            if kind == "passthrough":
+                for col in columns:
+                    steps.append((col, "numeric", out, {"offset": 0.0, "divisor": 1.0}))
+                    out += 1
+
+            elif kind in ("StandardScaler", "SimpleImputer", "Pipeline"):
+                for i, col in enumerate(columns):
+                    offset, divisor = _affine_params(trans, i)
+                    steps.append((col, "numeric", out, {"offset": offset, "divisor": divisor}))
+                    out += 1
+
+            elif kind == "OneHotEncoder":
+                if getattr(trans, "drop_idx_", None) is not None:
+                    raise NotImplementedError("OneHotEncoder(drop=...) is not supported.")
+                if getattr(trans, "_infrequent_enabled", False):
+                    raise NotImplementedError("Infrequent categories are not supported.")
+                for col, categories in zip(columns, trans.categories_):
+                    lookup = {_plain(c): out + j for j, c in enumerate(categories)}
+                    steps.append((col, "onehot", out, {
+                        "lookup": lookup,
+                        "ignore_unknown": trans.handle_unknown != "error",
+                    }))
+                    out += len(categories)
+
+            elif kind == "OrdinalEncoder":
+                for col, categories in zip(columns, trans.categories_):
+                    lookup = {_plain(c): float(j) for j, c in enumerate(categories)}
+                    unknown = trans.unknown_value if trans.handle_unknown == "use_encoded_value" else None
+                    steps.append((col, "ordinal", out, {
+                        "lookup": lookup,
+                        "unknown": None if unknown is None else float(unknown),
+                    }))
+                    out += 1
+
+            else:
+                raise NotImplementedError(f"Unsupported transformer: {kind}")
+
+        return cls(feature_columns, steps, out)
+
+    def to_dict(self) -> dict:
+        steps = []
+        for col, kind, index, params in self.steps:
+            params = dict(params)
+            if "lookup" in params:
+                # JSON object keys are always strings, so keep pairs
+                params["lookup"] = [[k, v] for k, v in params["lookup"].items()]
+            steps.append([col, kind, index, params])
+
+        return {
+            "feature_columns": self.feature_columns,
+            "steps": steps,
+            "n_outputs": self.n_outputs,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        steps = []
+        for col, kind, index, params in data["steps"]:
+            params = dict(params)
+            if "lookup" in params:
+                params["lookup"] = {k: v for k, v in params["lookup"]}
+            steps.append((col, kind, index, params))
+
+        return cls(data["feature_columns"], steps, data["n_outputs"])
+
+    def transform(self, project_dict) -> np.ndarray:
+        return self.transform_many([project_dict])[0]
+
+    def transform_many(self, project_dicts) -> np.ndarray:
+        project_dicts = list(project_dicts)
+        x = np.zeros((len(project_dicts), self.n_outputs), dtype=np.float64)
+
+        for row, project_dict in enumerate(project_dicts):
+            for col, kind, index, params in self.steps:
+                value = project_dict.get(col)
+
+                if kind == "numeric":
+                    x[row, index] = (_numeric_value(value, col) - params["offset"]) / params["divisor"]
+
+                elif kind == "onehot":
+                    hit = params["lookup"].get(_categorical_value(value))
+                    if hit is not None:
+                        x[row, hit] = 1.0
+                    elif not params["ignore_unknown"]:
+                        raise ValueError(f"Found unknown category {value!r} in column {col!r}")
+
+                else:
+                    hit = params["lookup"].get(_categorical_value(value))
+                    if hit is None:
+                        if params["unknown"] is None:
+                            raise ValueError(f"Found unknown category {value!r} in column {col!r}")
+                        hit = params["unknown"]
+                    x[row, index] = hit
+
+        return x
+
+    def output_columns(self) -> list:
+        """Input column behind each output position (one-hot columns repeat)."""
+        columns = [None] * self.n_outputs
+        for col, kind, index, params in self.steps:
+            if kind == "onehot":
+                for i in params["lookup"].values():
+                    columns[int(i)] = col
+            else:
+                columns[index] = col
+        return columns
+
+    def column_index(self, col) -> int:
+        """Output position of a numeric input column."""
+        for step_col, kind, index, _ in self.steps:
+            if step_col == col:
+                if kind != "numeric":
+                    raise ValueError(f"Column {col!r} is not numeric")
+                return index
+        raise KeyError(col)
+
+    def transform_column(self, col, values) -> np.ndarray:
+        """What transform_many would put in column_index(col) for each value."""
+        for step_col, kind, _, params in self.steps:
+            if step_col == col and kind == "numeric":
+                values = np.nan_to_num(np.asarray(values, dtype=np.float64), nan=0.0)
+                if col in LOG_COLUMNS:
+                    values = np.log1p(values)
+                return (values - params["offset"]) / params["divisor"]
+        raise KeyError(col)
+
+
+def _plain(value):
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def _resolve_columns(columns, feature_columns):
+    if isinstance(columns, str):
+        columns = [columns]
+    elif isinstance(columns, slice):
+        columns = feature_columns[columns]
+
+    resolved = []
+    for i, col in enumerate(list(columns)):
+        if isinstance(col, (bool, np.bool_)):
+            if col:
+                resolved.append(feature_columns[i])
+        elif isinstance(col, (int, np.integer)):
+            resolved.append(feature_columns[col])
+        else:
+            resolved.append(col)
+    return resolved
+
+
+def _affine_params(trans, i):
+    # Reduces scalers/imputers to x' = (x - offset) / divisor. Imputers are a
+    # no-op here because values are already filled with 0 like fillna(0).
+    kind = trans.__class__.__name__
+
+    if kind == "Pipeline":
+        offset, divisor = 0.0, 1.0
+        for _, step in trans.steps:
+            o, d = _affine_params(step, i)
+            offset = offset + o * divisor
+            divisor = divisor * d
+        return offset, divisor
+
+    if kind == "SimpleImputer":
+        if not _is_missing(trans.missing_values):
+            raise NotImplementedError("SimpleImputer only supported for NaN missing values.")
+        return 0.0, 1.0
+
+    if kind == "StandardScaler":
+        mean = float(trans.mean_[i]) if trans.with_mean else 0.0
+        scale = float(trans.scale_[i]) if trans.with_std else 1.0
+        return mean, scale
+
+    raise NotImplementedError(f"Unsupported transformer: {kind}")
@@ -0,0 +1,197 @@
+# ai/services/forest_compression.py
+"""
+Smaller variants of a CompiledForest: fewer trees, a depth cap and merged
+leaves. Every variant is a plain CompiledForest (same mapper, same
+evaluator), so it can be published to the registry like any export.
+"""
+import time
+
+import numpy as np
+
+from ai.services.compiled_forest import CompiledForest
+
+
+def node_depths(forest) -> np.ndarray:
+    depth = np.zeros(len(forest.value), dtype=np.int32)
+    frontier = np.asarray(forest.roots, dtype=np.int64)
+    level = 0
+    while frontier.size:
+        depth[frontier] = level
+        parents = frontier[forest.left[frontier] != frontier]
+        frontier = np.concatenate([forest.left[parents], forest.right[parents]])
+        level += 1
+    return depth
+
+
+def _rebuild(forest, roots, left, right):
+    """
+    Keep only the nodes reachable from `roots` (in ascending order) under
+    the given child arrays. Trees occupy consecutive index ranges with the
+    root first, so keeping the original order keeps that layout.
+    """
+    frontier = np.asarray(roots, dtype=np.int64)
+    reachable = np.zeros(len(forest.value), dtype=bool)
+    while frontier.size:
+        reachable[frontier] = True
+        parents = frontier[left[frontier] != frontier]
+        frontier = np.concatenate([left[parents], right[parents]])
+
+    order = np.flatnonzero(reachable)
+    new_id = np.full(len(forest.value), -1, dtype=np.int64)
+    new_id[order] = np.arange(len(order))
+
+    arrays = {
+        "feature": forest.feature[order].copy(),
+        "threshold": forest.threshold[order].copy(),
+        "left": new_id[left[order]].astype(np.int32),
+        "right": new_id[right[order]].astype(np.int32),
+        "value": forest.value[order].copy(),
+        "roots": new_id[np.asarray(roots)].astype(np.int32),
+    }
+    leaf = arrays["left"] == np.arange(len(order))
+    arrays["feature"][leaf] = 0
+    arrays["threshold"][leaf] = 0.0
+
+    compact = CompiledForest(arrays, 0, forest.mapper)
+    compact.max_depth = int(node_depths(compact).max())
+    return compact
+
+
+def select_trees(forest, n_trees, x=None) -> CompiledForest:
+    """
+    Keep `n_trees` trees. With sample rows `x`, trees are added greedily so
+    the kept trees' mean vote tracks the full forest's on those rows (a
+    distillation onto a subset); without, the first `n_trees` are kept.
+    """
+    if n_trees >= forest.n_trees:
+        return forest
+    roots = np.asarray(forest.roots)
+
+    if x is None:
+        keep = np.arange(n_trees)
+    else:
+        votes = forest.tree_votes(x).astype(np.float64)
+        target = votes.mean(axis=1)
+        total = np.zeros(len(x))
+        chosen = np.zeros(forest.n_trees, dtype=bool)
+        keep = []
+        for k in range(1, n_trees + 1):
+            error = np.abs((total[:, None] + votes) / k - target[:, None]).mean(axis=0)
+            error[chosen] = np.inf
+            best = int(np.argmin(error))
+            chosen[best] = True
+            keep.append(best)
+            total += votes[:, best]
+        keep = np.sort(keep)
+
+    return _rebuild(forest, roots[keep], forest.left, forest.right)
+
+
+def cap_depth(forest, max_depth) -> CompiledForest:
+    """
+    Turn every node at `max_depth` into a leaf. Internal nodes already carry
+    the class-1 share of their training samples, so that is the leaf value.
+    """
+    if max_depth >= forest.max_depth:
+        return forest
+    left = np.array(forest.left, dtype=np.int64)
+    right = np.array(forest.right, dtype=np.int64)
+    cut = np.flatnonzero(node_depths(forest) >= max_depth)
+    left[cut] = cut
+    right[cut] = cut
+    return _rebuild(forest, forest.roots, left, right)
+
+
+def merge_leaves(forest, tolerance=0.0) -> CompiledForest:
+    """
+    Collapse splits whose two children are leaves with values within
+    `tolerance`, bottom-up until none are left. With 0 only splits that
+    cannot change any prediction are removed.
+    """
+    left = np.array(forest.left, dtype=np.int64)
+    right = np.array(forest.right, dtype=np.int64)
+    value = forest.value
+    ids = np.arange(len(value))
+
+    while True:
+        is_leaf = left == ids
+        internal = ~is_leaf
+        both = internal & is_leaf[left] & is_leaf[right]
+        merge = both & (np.abs(value[left] - value[right]) <= tolerance)
+        if not merge.any():
+            break
+        nodes = np.flatnonzero(merge)
+        left[nodes] = nodes
+        right[nodes] = nodes
+
+    return _rebuild(forest, forest.roots, left, right)
+
+
+def compress(forest, n_trees=None, max_depth=None, merge_tolerance=None, x=None) -> CompiledForest:
+    variant = forest
+    if n_trees:
+        variant = select_trees(variant, n_trees, x)
+    if max_depth:
+        variant = cap_depth(variant, max_depth)
+    if merge_tolerance is not None:
+        variant = merge_leaves(variant, merge_tolerance)
+    return variant
+
+
+def evaluate(variant, reference, x, y, budgets, latency_rows=200) -> dict:
+    """
+    Quality against the labels, agreement with `reference` on the final
+    feasible/not decision (after the budget adjustment and threshold), and
+    speed and size of `variant`. `x` holds mapped rows.
+    """
+    from sklearn.metrics import roc_auc_score
+
+    from ai.services import feasibility
+
+    def decide(forest):
+        raw = forest.predict_proba(x)[:, 1]
+        probabilities = feasibility.adjust_probabilities(raw, budgets)
+        return raw, probabilities, probabilities >= feasibility.dynamic_thresholds(budgets)
+
+    raw, probabilities, decisions = decide(variant)
+    _, ref_probabilities, ref_decisions = decide(reference)
+
+    rows = x[:latency_rows]
+    timings = []
+    for i in range(len(rows)):
+        t0 = time.perf_counter()
+        variant.predict_proba(rows[i:i + 1])
+        timings.append((time.perf_counter() - t0) * 1000)
+
+    t0 = time.perf_counter()
+    variant.predict_proba(x)
+    batch_ms = (time.perf_counter() - t0) * 1000
+
+    columns = len({c for c in variant.mapper.output_columns() if c is not None})
+    return {
+        "trees": variant.n_trees,
+        "nodes": int(len(variant.value)),
+        "max_depth": variant.max_depth,
+        "accuracy": float(((raw >= 0.5) == np.asarray(y).astype(bool)).mean()),
+        "auc": float(roc_auc_score(y, raw)),
+        "agreement": float((decisions == ref_decisions).mean()),
+        "max_abs_diff": float(np.abs(probabilities - ref_probabilities).max()),
+        "single_p50_ms": float(np.percentile(timings, 50)),
+        "batch_ms": batch_ms,
+        "batch_rows": int(len(x)),
+        "forest_kb": variant.nbytes / 1024,
+        # The per-node explanation table is built for every loaded model
+        "contributions_kb": len(variant.value) * columns * 4 / 1024,
+    }
+
+
+def best_variant(results, min_agreement):
+    """
+    The fastest variant that agrees with the reference often enough;
+    latencies within 0.1 ms count as equal and the smaller forest wins.
+    """
+    passing = [r for r in results if r["metrics"]["agreement"] >= min_agreement]
+    if not passing:
+        return None
+    return min(passing, key=lambda r: (round(r["metrics"]["single_p50_ms"], 1), r["metrics"]["nodes"]))
+
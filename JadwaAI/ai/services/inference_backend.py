@@ -0,0 +1,336 @@
+# ai/services/inference_backend.py
+"""
+Where predictions run. analyze_project only calls predict_project() here,
+and the result page's panels (counterfactuals, what-if, Monte Carlo,
+placements, partial dependence) only call(); JADWA_INFERENCE_BACKEND
+picks the backend:
+
+    inprocess     (default) score in the calling thread
+    process-pool  N long-lived worker processes, fed micro-batches
+    socket        a `manage.py inference_server` on JADWA_INFERENCE_SOCKET;
+                  this process never loads the model or imports
+                  scikit-learn (drift monitoring still folds its buffer
+                  here with numpy and pandas)
+"""
+import importlib
+import json
+import multiprocessing
+import os
+import queue
+import socket
+import threading
+import time
+from concurrent.futures import Future
+
+from ai.services import inference_protocol as proto
+
+BACKEND = os.getenv("JADWA_INFERENCE_BACKEND", "inprocess")
+WORKERS = int(os.getenv("JADWA_INFERENCE_WORKERS", "2"))
+BATCH_WINDOW_MS = float(os.getenv("JADWA_INFERENCE_BATCH_WINDOW_MS", "2"))
+MAX_BATCH = int(os.getenv("JADWA_INFERENCE_MAX_BATCH", "256"))
+TIMEOUT = float(os.getenv("JADWA_INFERENCE_TIMEOUT", "30"))
+# spawn is safe from threaded web workers; fork shares a preloaded model
+START_METHOD = os.getenv("JADWA_INFERENCE_START_METHOD", "spawn")
+SOCKET_PATH = os.getenv("JADWA_INFERENCE_SOCKET", "/tmp/jadwa-inference.sock")
+
+# Services call() runs next to the model: JSON kwargs in, JSON result out
+SERVICES = {
+    "model_version": "ai.services.feasibility:get_version",
+    "counterfactuals": "ai.services.counterfactual:find_counterfactuals",
+    "what_if": "ai.services.what_if:sweep",
+    "monte_carlo": "ai.services.monte_carlo:simulate_bounds",
+    "placements": "ai.services.placement:rank_placements",
+    "partial_dependence": "ai.services.partial_dependence:serving_curves",
+}
+
+# Errors in the caller's input keep their type across processes, so views
+# can still answer them with a 400
+CLIENT_ERRORS = {"ValueError": ValueError, "KeyError": KeyError}
+
+
+def run_service(name, kwargs=None):
+    if name not in SERVICES:
+        raise ValueError(f"Unknown service: {name}")
+    module, function = SERVICES[name].split(":")
+    return getattr(importlib.import_module(module), function)(**(kwargs or {}))
+
+
+class MicroBatcher:
+    """
+    Collects submit() calls that arrive within `window_ms` of each other
+    (up to `max_batch` projects) and hands them to `run_batch` as one list.
+
+    run_batch(project_dicts, explain, on_done, on_error) may finish
+    asynchronously; it must eventually call exactly one of the callbacks.
+    With `slots`, at most that many batches are in flight: while every slot
+    is busy, new requests queue up and leave together in the next batch.
+    """
+
+    def __init__(self, run_batch, window_ms=BATCH_WINDOW_MS, max_batch=MAX_BATCH, slots=None):
+        self.run_batch = run_batch
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self._slots = threading.BoundedSemaphore(slots) if slots else None
+        self.batches = 0
+        self.items = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._loop, name="jadwa-micro-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, project_dicts, explain=False) -> Future:
+        future = Future()
+        self._queue.put((list(project_dicts), explain, future))
+        return future
+
+    def _collect(self):
+        pending = [self._queue.get()]
+        size = len(pending[0][0])
+        deadline = time.monotonic() + self.window
+
+        while size < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            pending.append(item)
+            size += len(item[0])
+
+        return pending
+
+    def _loop(self):
+        while True:
+            if self._slots is not None:
+                self._slots.acquire()
+            pending = self._collect()
+            project_dicts = [d for dicts, _, _ in pending for d in dicts]
+            explain = any(e for _, e, _ in pending)
+            self.batches += 1
+            self.items += len(project_dicts)
+
+            def on_done(results, pending=pending):
+                self._release()
+                start = 0
+                for dicts, wants_explain, future in pending:
+                    chunk = results[start:start + len(dicts)]
+                    start += len(dicts)
+                    if not wants_explain:
+                        for r in chunk:
+                            r.pop("contributions", None)
+                    future.set_result(chunk)
+
+            def on_error(error, pending=pending):
+                self._release()
+                for _, _, future in pending:
+                    future.set_exception(error)
+
+            try:
+                self.run_batch(project_dicts, explain, on_done, on_error)
+            except Exception as e:
+                on_error(e)
+
+    def _release(self):
+        if self._slots is not None:
+            self._slots.release()
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch": self.items / self.batches if self.batches else 0.0,
+            "queued": self._queue.qsize(),
+        }
+
+
+class InProcessBackend:
+    name = "inprocess"
+
+    def predict_projects(self, project_dicts, explain=False):
+        from ai.services import feasibility
+        return feasibility.score_projects(project_dicts, explain=explain)
+
+    def call(self, service, **kwargs):
+        return run_service(service, kwargs)
+
+    def stats(self) -> dict:
+        return {"backend": self.name}
+
+
+def _worker_init():
+    import warnings
+
+    import django
+
+    # Spawned workers start without Django; placements read the reference tables
+    django.setup()
+
+    from ai.services import feasibility
+
+    # Pool workers are daemonic, so a forest fitted with n_jobs != 1 falls
+    # back to one thread here and would warn on every call
+    warnings.filterwarnings("ignore", message="Loky-backed parallel loops")
+    feasibility.warm_up()
+
+
+def _worker_score(project_dicts, explain):
+    from ai.services import feasibility
+    return feasibility.score_projects(project_dicts, explain=explain)
+
+
+class ProcessPoolBackend:
+    """
+    Long-lived worker processes that load the model once. Requests from all
+    threads of this web worker are micro-batched and sent to the pool over
+    its pipes, so the forest never runs in a request thread.
+    """
+
+    name = "process-pool"
+
+    def __init__(self, workers=WORKERS, start_method=START_METHOD):
+        context = multiprocessing.get_context(start_method)
+        self.workers = workers
+        self.pool = context.Pool(workers, initializer=_worker_init)
+        self.batcher = MicroBatcher(self._run_batch, slots=workers)
+
+    def _run_batch(self, project_dicts, explain, on_done, on_error):
+        self.pool.apply_async(
+            _worker_score,
+            (project_dicts, explain),
+            callback=on_done,
+            error_callback=on_error,
+        )
+
+    def predict_projects(self, project_dicts, explain=False):
+        project_dicts = list(project_dicts)
+        if not project_dicts:
+            return []
+        return self.batcher.submit(project_dicts, explain).result(timeout=TIMEOUT)
+
+    def call(self, service, **kwargs):
+        return self.pool.apply_async(run_service, (service, kwargs)).get(timeout=TIMEOUT)
+
+    def stats(self) -> dict:
+        return {"backend": self.name, "workers": self.workers, **self.batcher.stats()}
+
+    def close(self):
+        self.pool.terminate()
+
+
+class SocketBackend:
+    """
+    Thin client of the inference server. Each thread keeps one connection
+    open; the server micro-batches requests across all its clients.
+    """
+
+    name = "socket"
+
+    def __init__(self, path=SOCKET_PATH, timeout=TIMEOUT):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.path)
+        self._local.sock = sock
+        return sock
+
+    def _disconnect(self):
+        sock = getattr(self._local, "sock", None)
+        self._local.sock = None
+        if sock is not None:
+            sock.close()
+
+    def _call(self, op, payload=b"", flags=0, count=0):
+        frame = proto.pack_frame(op, payload, flags=flags, count=count)
+        # Requests are idempotent, so a connection the server dropped while
+        # idle is retried once on a fresh one
+        for attempt in (0, 1):
+            sock = getattr(self._local, "sock", None) or self._connect()
+            try:
+                sock.sendall(frame)
+                response = proto.read_frame(sock)
+                if response is None:
+                    raise ConnectionError("Inference server closed the connection")
+                break
+            except (ConnectionError, OSError):
+                self._disconnect()
+                if attempt:
+                    raise
+
+        _, flags, count, payload = response
+        if flags & proto.FLAG_ERROR:
+            error = json.loads(payload)
+            if error.get("type") in CLIENT_ERRORS:
+                raise CLIENT_ERRORS[error["type"]](error["message"])
+            raise RuntimeError(f"Inference server error: {error['error']}")
+        return flags, count, payload
+
+    def predict_projects(self, project_dicts, explain=False):
+        project_dicts = list(project_dicts)
+        flags = proto.FLAG_EXPLAIN if explain else 0
+        results = []
+        for start in range(0, len(project_dicts), proto.MAX_COUNT):
+            chunk = project_dicts[start:start + proto.MAX_COUNT]
+            _, count, payload = self._call(proto.OP_PREDICT, proto.pack_projects(chunk), flags, len(chunk))
+            results.extend(proto.unpack_results(payload, count, explain))
+        return results
+
+    def call(self, service, **kwargs):
+        request = proto.pack_json({"service": service, "kwargs": kwargs})
+        return json.loads(self._call(proto.OP_CALL, request)[2])
+
+    def health(self) -> dict:
+        return json.loads(self._call(proto.OP_HEALTH)[2])
+
+    def metrics(self) -> dict:
+        return json.loads(self._call(proto.OP_METRICS)[2])
+
+    def stats(self) -> dict:
+        return {"backend": self.name, "socket": self.path}
+
+    def close(self):
+        self._disconnect()
+
+
+BACKENDS = {
+    InProcessBackend.name: InProcessBackend,
+    ProcessPoolBackend.name: ProcessPoolBackend,
+    SocketBackend.name: SocketBackend,
+}
+
+_backend = None
+_backend_pid = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    """The backend of this process, created on first use (after any fork)."""
+    global _backend, _backend_pid
+
+    if _backend is not None and _backend_pid == os.getpid():
+        return _backend
+
+    with _backend_lock:
+        if _backend is None or _backend_pid != os.getpid():
+            if BACKEND not in BACKENDS:
+                raise ValueError(f"Unknown JADWA_INFERENCE_BACKEND: {BACKEND}")
+            _backend = BACKENDS[BACKEND]()
+            _backend_pid = os.getpid()
+    return _backend
+
+
+def predict_projects(project_dicts, explain=False):
+    return get_backend().predict_projects(project_dicts, explain=explain)
+
+
+def predict_project(project_dict, explain=False):
+    return predict_projects([project_dict], explain=explain)[0]
+
+
+def call(service, **kwargs):
+    """Run one of SERVICES where this process's backend runs the model."""
+    return get_backend().call(service, **kwargs)
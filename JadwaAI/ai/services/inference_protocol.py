@@ -0,0 +1,198 @@
+# ai/services/inference_protocol.py
+"""
+Binary frames between the inference server and its clients. Standard
+library only, so web workers can use it without numpy or scikit-learn.
+
+Every frame is a 12-byte header followed by `length` payload bytes:
+
+    magic  4s   b"JDW1"
+    op     B    OP_PREDICT / OP_HEALTH / OP_METRICS / OP_CALL (responses echo it)
+    flags  B    FLAG_EXPLAIN on requests, FLAG_ERROR on responses
+    count  H    number of projects / results
+    length I    payload size
+
+Predict request payload, per project:
+    H + utf-8   type_project
+    H + utf-8   region_project
+    5 x d       budget, duration days, Saudi employees, similar enterprises,
+                economic indicator (NaN = missing)
+
+Predict response payload:
+    B + utf-8   model version
+    per result: d probability, d threshold, B label,
+                d std, d low, d high, d agreement, H trees, B low_confidence
+    I + JSON    contributions list, only with FLAG_EXPLAIN
+
+Call request payload: UTF-8 JSON {"service": name, "kwargs": {...}}, one
+of inference_backend.SERVICES; the response is the service's JSON result.
+
+Health/metrics responses carry a UTF-8 JSON payload, errors
+{"error", "type", "message"}.
+"""
+import json
+import math
+import struct
+
+MAGIC = b"JDW1"
+HEADER = struct.Struct("!4sBBHI")
+
+OP_PREDICT = 1
+OP_HEALTH = 2
+OP_METRICS = 3
+OP_CALL = 4
+
+FLAG_EXPLAIN = 1
+FLAG_ERROR = 2
+
+MAX_COUNT = 0xFFFF
+
+NUMERIC_FIELDS = (
+    "budget_project",
+    "project_duration_days",
+    "num_saudi_employees",
+    "num_of_similar_enterprises",
+    "economic_indicator",
+)
+_NUMBERS = struct.Struct("!5d")
+_RESULT = struct.Struct("!ddBddddHB")
+_SHORT = struct.Struct("!H")
+_LONG = struct.Struct("!I")
+
+
+class ProtocolError(Exception):
+    pass
+
+
+def pack_frame(op, payload=b"", flags=0, count=0) -> bytes:
+    return HEADER.pack(MAGIC, op, flags, count, len(payload)) + payload
+
+
+def unpack_header(data):
+    magic, op, flags, count, length = HEADER.unpack(data)
+    if magic != MAGIC:
+        raise ProtocolError("Bad magic")
+    return op, flags, count, length
+
+
+def read_exact(sock, size) -> bytes:
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            raise ConnectionError("Connection closed")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def read_frame(sock):
+    """(op, flags, count, payload), or None when the peer closed cleanly."""
+    first = sock.recv(HEADER.size)
+    if not first:
+        return None
+    header = first + (read_exact(sock, HEADER.size - len(first)) if len(first) < HEADER.size else b"")
+    op, flags, count, length = unpack_header(header)
+    return op, flags, count, read_exact(sock, length) if length else b""
+
+
+def _pack_text(value) -> bytes:
+    raw = ("" if value is None else str(value)).encode("utf-8")
+    return _SHORT.pack(len(raw)) + raw
+
+
+def _number(value) -> float:
+    if value is None:
+        return math.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def pack_projects(project_dicts) -> bytes:
+    parts = []
+    for d in project_dicts:
+        parts.append(_pack_text(d.get("type_project")))
+        parts.append(_pack_text(d.get("region_project")))
+        parts.append(_NUMBERS.pack(*(_number(d.get(f)) for f in NUMERIC_FIELDS)))
+    return b"".join(parts)
+
+
+def unpack_projects(payload, count) -> list:
+    projects = []
+    offset = 0
+
+    def text():
+        nonlocal offset
+        (size,) = _SHORT.unpack_from(payload, offset)
+        offset += _SHORT.size
+        value = payload[offset:offset + size].decode("utf-8")
+        offset += size
+        return value
+
+    for _ in range(count):
+        project = {"type_project": text(), "region_project": text()}
+        numbers = _NUMBERS.unpack_from(payload, offset)
+        offset += _NUMBERS.size
+        for field, value in zip(NUMERIC_FIELDS, numbers):
+            # Missing stays missing, exactly as in a build_project_data dict
+            if not math.isnan(value):
+                project[field] = value
+        projects.append(project)
+
+    if offset != len(payload):
+        raise ProtocolError("Trailing bytes in predict request")
+    return projects
+
+
+def pack_results(results, explain=False) -> bytes:
+    version = (results[0].get("model_version", "") if results else "").encode("utf-8")
+    parts = [struct.pack("!B", len(version)), version]
+    for r in results:
+        u = r.get("uncertainty") or {}
+        parts.append(_RESULT.pack(
+            r["probability"], r["threshold"], r["label"],
+            u.get("std", 0.0), u.get("low", 0.0), u.get("high", 0.0), u.get("agreement", 1.0),
+            u.get("trees", 0), u.get("low_confidence", False),
+        ))
+
+    if explain:
+        blob = json.dumps([r.get("contributions", {}) for r in results], separators=(",", ":")).encode("utf-8")
+        parts.append(_LONG.pack(len(blob)) + blob)
+    return b"".join(parts)
+
+
+def unpack_results(payload, count, explain=False) -> list:
+    size = payload[0]
+    version = payload[1:1 + size].decode("utf-8")
+    offset = 1 + size
+
+    results = []
+    for _ in range(count):
+        probability, threshold, label, std, low, high, agreement, trees, low_confidence = _RESULT.unpack_from(payload, offset)
+        offset += _RESULT.size
+        results.append({
+            "probability": probability,
+            "threshold": threshold,
+            "label": label,
+            "model_version": version,
+            "uncertainty": {
+                "std": std,
+                "low": low,
+                "high": high,
+                "agreement": agreement,
+                "trees": trees,
+                "low_confidence": bool(low_confidence),
+            },
+        })
+
+    if explain:
+        (size,) = _LONG.unpack_from(payload, offset)
+        offset += _LONG.size
+        for result, contributions in zip(results, json.loads(payload[offset:offset + size])):
+            result["contributions"] = contributions
+    return results
+
+
+def pack_json(data) -> bytes:
+    return json.dumps(data, ensure_ascii=False).encode("utf-8")
@@ -0,0 +1,147 @@
+# ai/services/inference_server.py
+import json
+import os
+import socket
+import socketserver
+import threading
+import time
+from collections import deque
+
+from ai.services import feasibility, inference_protocol as proto, prediction_cache
+from ai.services.inference_backend import BATCH_WINDOW_MS, MAX_BATCH, TIMEOUT, MicroBatcher, run_service
+from ai.services.memory import rss_mb
+
+LATENCY_SAMPLES = 1000
+
+
+def _percentile(values, q) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+
+class InferenceService:
+    """
+    Answers protocol frames. Predict requests from all connections go
+    through one MicroBatcher, whose thread runs score_projects itself, so
+    requests arriving while a batch is scored leave together in the next.
+    """
+
+    def __init__(self, window_ms=BATCH_WINDOW_MS, max_batch=MAX_BATCH):
+        self.started = time.time()
+        self.batcher = MicroBatcher(self._run_batch, window_ms=window_ms, max_batch=max_batch)
+        self.requests = 0
+        self.rows = 0
+        self.errors = 0
+        self.calls = 0
+        self.latencies_ms = deque(maxlen=LATENCY_SAMPLES)
+        self._lock = threading.Lock()
+
+    def _run_batch(self, project_dicts, explain, on_done, on_error):
+        on_done(feasibility.score_projects(project_dicts, explain=explain))
+
+    def handle(self, op, flags, count, payload) -> bytes:
+        t0 = time.perf_counter()
+        try:
+            if op == proto.OP_PREDICT:
+                response = self.predict(flags, count, payload)
+            elif op == proto.OP_HEALTH:
+                response = proto.pack_frame(op, proto.pack_json(self.health()))
+            elif op == proto.OP_METRICS:
+                response = proto.pack_frame(op, proto.pack_json(self.metrics()))
+            elif op == proto.OP_CALL:
+                response = self.call(payload)
+            else:
+                raise proto.ProtocolError(f"Unknown op: {op}")
+        except Exception as e:
+            with self._lock:
+                self.errors += 1
+            error = {"error": f"{type(e).__name__}: {e}", "type": type(e).__name__, "message": str(e)}
+            return proto.pack_frame(op, proto.pack_json(error), flags=proto.FLAG_ERROR)
+
+        if op == proto.OP_PREDICT:
+            with self._lock:
+                self.requests += 1
+                self.rows += count
+                self.latencies_ms.append((time.perf_counter() - t0) * 1000)
+        elif op == proto.OP_CALL:
+            with self._lock:
+                self.calls += 1
+        return response
+
+    def predict(self, flags, count, payload) -> bytes:
+        explain = bool(flags & proto.FLAG_EXPLAIN)
+        projects = proto.unpack_projects(payload, count)
+        results = self.batcher.submit(projects, explain).result(timeout=TIMEOUT) if projects else []
+        return proto.pack_frame(proto.OP_PREDICT, proto.pack_results(results, explain), flags=flags, count=len(results))
+
+    def call(self, payload) -> bytes:
+        """A feature service; it runs in this connection's thread, not the batcher."""
+        request = json.loads(payload)
+        result = run_service(request["service"], request.get("kwargs"))
+        return proto.pack_frame(proto.OP_CALL, proto.pack_json(result))
+
+    def health(self) -> dict:
+        health = {"pid": os.getpid(), "uptime_s": round(time.time() - self.started, 1)}
+        try:
+            loaded = feasibility.get_loaded()
+        except Exception as e:
+            return {"status": "no-model", "model_version": None, "error": str(e), **health}
+        return {"status": "ok", "model_version": loaded.version, **health}
+
+    def metrics(self) -> dict:
+        with self._lock:
+            latencies = list(self.latencies_ms)
+            counters = {"requests": self.requests, "rows": self.rows, "calls": self.calls, "errors": self.errors}
+        return {
+            **counters,
+            "latency_p50_ms": _percentile(latencies, 50),
+            "latency_p95_ms": _percentile(latencies, 95),
+            "batcher": self.batcher.stats(),
+            "prediction_cache": prediction_cache.cache.stats(),
+            "rss_mb": rss_mb(),
+        }
+
+
+class _Handler(socketserver.BaseRequestHandler):
+
+    def handle(self):
+        # One connection carries any number of request/response pairs
+        while True:
+            try:
+                frame = proto.read_frame(self.request)
+            except (ConnectionError, proto.ProtocolError, OSError):
+                return
+            if frame is None:
+                return
+            self.request.sendall(self.server.service.handle(*frame))
+
+
+class InferenceSocketServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    # Every web thread holds a connection; the default backlog of 5 refuses
+    # bursts of new ones
+    request_queue_size = 128
+
+    def __init__(self, path, service):
+        self.service = service
+        if os.path.exists(path):
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(path)
+            except OSError:
+                # Left behind by a server that crashed; it would block the bind
+                os.unlink(path)
+            else:
+                raise OSError(f"Another inference server is listening on {path}")
+            finally:
+                probe.close()
+        super().__init__(path, _Handler)
+
+    def server_close(self):
+        super().server_close()
+        try:
+            os.unlink(self.server_address)
+        except OSError:
+            pass
@@ -0,0 +1,64 @@
+# ai/services/memory.py
+import os
+import platform
+
+
+def _status_kb(field):
+    try:
+        with open(f"/proc/{os.getpid()}/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return float(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def rss_mb():
+    """Current resident set size of this process in MB, None if unknown."""
+    kb = _status_kb("VmRSS")
+    if kb is None:
+        # Not Linux: fall back to the peak, which is all getrusage offers
+        return peak_rss_mb()
+    return kb / 1024
+
+
+def _maxrss_mb(who):
+    try:
+        import resource
+    except ImportError:
+        # Windows has no getrusage
+        return None
+    peak = resource.getrusage(getattr(resource, who)).ru_maxrss
+    # ru_maxrss is in KB on Linux and bytes on macOS
+    return peak / (1024 * 1024) if platform.system() == "Darwin" else peak / 1024
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, None if unknown."""
+    return _maxrss_mb("RUSAGE_SELF")
+
+
+def children_peak_rss_mb():
+    """Largest peak RSS among this process's finished children in MB, None if unknown."""
+    return _maxrss_mb("RUSAGE_CHILDREN")
+
+
+def format_mb(value) -> str:
+    return "n/a" if value is None else f"{value:.1f}"
+
+
+def pss_mb():
+    """
+    Proportional set size in MB: shared pages are split between the
+    processes sharing them, so summing it over workers gives real usage.
+    None when /proc/<pid>/smaps_rollup is unavailable.
+    """
+    try:
+        with open(f"/proc/{os.getpid()}/smaps_rollup") as f:
+            for line in f:
+                if line.startswith("Pss:"):
+                    return float(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
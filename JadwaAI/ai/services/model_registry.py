@@ -0,0 +1,161 @@
+# ai/services/model_registry.py
+"""
+A directory of versioned model artifacts with an "active" pointer:
+
+    registry/
+        ACTIVE                  <- name of the active version
+        2026-05-01/
+            manifest.json       <- sha256 of every file + metadata
+            feature_columns.pkl
+            rf_pipeline.pkl     <- and/or
+            rf_compiled/        <- exported CompiledForest
+"""
+import hashlib
+import json
+import os
+import shutil
+import time
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+AI_DIR = os.path.dirname(BASE_DIR)
+
+REGISTRY_DIR = os.getenv("JADWA_MODEL_REGISTRY", os.path.join(AI_DIR, "models", "registry"))
+
+MANIFEST = "manifest.json"
+POINTER = "ACTIVE"
+PIPELINE_FILE = "rf_pipeline.pkl"
+FEATURES_FILE = "feature_columns.pkl"
+COMPILED_DIR = "rf_compiled"
+
+
+class RegistryError(Exception):
+    pass
+
+
+def _sha256(path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _files(root):
+    for dirpath, _, filenames in os.walk(root):
+        for name in sorted(filenames):
+            path = os.path.join(dirpath, name)
+            rel = os.path.relpath(path, root).replace(os.sep, "/")
+            if rel != MANIFEST:
+                yield rel, path
+
+
+def version_dir(version, registry_dir=None) -> str:
+    return os.path.join(registry_dir or REGISTRY_DIR, version)
+
+
+def active_version(registry_dir=None):
+    """Name of the active version, or None if there is no registry yet."""
+    try:
+        with open(os.path.join(registry_dir or REGISTRY_DIR, POINTER), encoding="utf-8") as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def read_manifest(version, registry_dir=None) -> dict:
+    path = os.path.join(version_dir(version, registry_dir), MANIFEST)
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        raise RegistryError(f"Unknown model version: {version}")
+
+
+def versions(registry_dir=None) -> list:
+    root = registry_dir or REGISTRY_DIR
+    if not os.path.isdir(root):
+        return []
+
+    out = []
+    for name in sorted(os.listdir(root)):
+        if os.path.isfile(os.path.join(root, name, MANIFEST)):
+            out.append(read_manifest(name, root))
+    return out
+
+
+def verify(version, registry_dir=None) -> dict:
+    """Recompute checksums; raises RegistryError on any mismatch."""
+    manifest = read_manifest(version, registry_dir)
+    root = version_dir(version, registry_dir)
+
+    actual = {rel: _sha256(path) for rel, path in _files(root)}
+    if actual != manifest["files"]:
+        changed = sorted(set(actual.items()) ^ set(manifest["files"].items()))
+        raise RegistryError(f"Checksum mismatch in {version}: {[rel for rel, _ in changed]}")
+    return manifest
+
+
+def publish(version, features_path, pipeline_path=None, compiled=None, metadata=None, registry_dir=None) -> dict:
+    """
+    Copy artifacts into a new version directory. `compiled` is a
+    CompiledForest to store next to (or instead of) the pickled pipeline.
+    The directory only appears under its final name once complete.
+    """
+    if not pipeline_path and compiled is None:
+        raise RegistryError("Nothing to publish: pass a pipeline and/or a compiled forest.")
+
+    root = registry_dir or REGISTRY_DIR
+    target = version_dir(version, root)
+    if os.path.exists(target):
+        raise RegistryError(f"Version already exists: {version}")
+
+    staging = f"{target}.tmp-{os.getpid()}"
+    os.makedirs(staging)
+    try:
+        shutil.copy2(features_path, os.path.join(staging, FEATURES_FILE))
+        if pipeline_path:
+            shutil.copy2(pipeline_path, os.path.join(staging, PIPELINE_FILE))
+        if compiled is not None:
+            compiled.save(os.path.join(staging, COMPILED_DIR))
+
+        manifest = {
+            "version": version,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "files": {rel: _sha256(path) for rel, path in _files(staging)},
+            "metadata": metadata or {},
+        }
+        with open(os.path.join(staging, MANIFEST), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+        os.rename(staging, target)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    return manifest
+
+
+def activate(version, registry_dir=None) -> dict:
+    """Point ACTIVE at `version`. Workers pick it up on their next check."""
+    root = registry_dir or REGISTRY_DIR
+    manifest = verify(version, root)
+
+    tmp = os.path.join(root, f"{POINTER}.tmp-{os.getpid()}")
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(version)
+    os.replace(tmp, os.path.join(root, POINTER))
+    return manifest
+
+
+def artifact_paths(version, registry_dir=None) -> dict:
+    root = version_dir(version, registry_dir)
+    paths = {
+        "features": os.path.join(root, FEATURES_FILE),
+        "pipeline": os.path.join(root, PIPELINE_FILE),
+        "compiled": os.path.join(root, COMPILED_DIR),
+    }
+    return {
+        "features": paths["features"],
+        "pipeline": paths["pipeline"] if os.path.isfile(paths["pipeline"]) else None,
+        "compiled": paths["compiled"] if os.path.isdir(paths["compiled"]) else None,
+    }
@@ -0,0 +1,152 @@
+# ai/services/monte_carlo.py
+"""
+How sure is a prediction when the inputs themselves are estimates?
+
+Budget, duration and employees are drawn from user-given ranges
+(triangular, peaking at the entered value), every sample is scored with
+the same budget adjustment and dynamic_threshold as predict_project, and
+the spread of the resulting probabilities is reported.
+"""
+import os
+import time
+
+import numpy as np
+
+from ai.services import feasibility, prediction_cache
+from ai.services.what_if import score_cells
+
+# Inputs that can be given a range; the form asks for whole months and
+# employees, so those samples are rounded the same way
+SAMPLED = {
+    "budget_project": "float",
+    "project_duration_days": "months",
+    "num_saudi_employees": "int",
+}
+
+DEFAULT_SAMPLES = 1000
+MAX_SAMPLES = 20000
+CHUNK_SIZE = 250
+HISTOGRAM_BINS = 20
+PERCENTILES = (5, 25, 50, 75, 95)
+
+# Scoring stops after this many ms; the result says how many samples made it
+TIME_BUDGET_MS = float(os.getenv("JADWA_MONTE_CARLO_BUDGET_MS", "500"))
+
+cache = prediction_cache.PredictionCache(maxsize=int(os.getenv("JADWA_MONTE_CARLO_CACHE_SIZE", "256")))
+
+
+def default_ranges(project_dict) -> dict:
+    """±20% on the budget and ±25% on the duration around the entered values."""
+    budget = float(project_dict.get("budget_project") or 0)
+    months = max(int(float(project_dict.get("project_duration_days") or 0) // 30), 1)
+    return {
+        "budget_project": (budget * 0.8, budget * 1.2),
+        "project_duration_days": (max(round(months * 0.75), 1) * 30.0, max(round(months * 1.25), 1) * 30.0),
+    }
+
+
+def check_ranges(ranges) -> dict:
+    checked = {}
+    for feature, (lo, hi) in ranges.items():
+        if feature not in SAMPLED:
+            raise ValueError(f"Unsupported input: {feature}")
+        lo, hi = float(lo), float(hi)
+        if not 0 <= lo <= hi:
+            raise ValueError(f"Invalid range for {feature}: {lo}..{hi}")
+        checked[feature] = (lo, hi)
+    if not checked:
+        raise ValueError("Give at least one input range")
+    return checked
+
+
+def sample_inputs(project_dict, ranges, n, seed=0) -> dict:
+    """feature -> n samples, triangular between lo and hi with the entered value as the mode."""
+    rng = np.random.RandomState(seed)
+    columns = {}
+    for feature, (lo, hi) in sorted(ranges.items()):
+        if lo == hi:
+            values = np.full(n, lo)
+        else:
+            mode = min(max(float(project_dict.get(feature) or 0), lo), hi)
+            values = rng.triangular(lo, mode, hi, n)
+
+        if SAMPLED[feature] == "months":
+            values = np.maximum(np.round(values / 30), 1) * 30
+        elif SAMPLED[feature] == "int":
+            values = np.round(values)
+        columns[feature] = values.astype(np.float64)
+    return columns
+
+
+def summarize(probabilities, thresholds) -> dict:
+    counts, edges = np.histogram(probabilities, bins=HISTOGRAM_BINS, range=(0.0, 1.0))
+    return {
+        "mean": float(probabilities.mean()),
+        "std": float(probabilities.std()),
+        "percentiles": {f"p{q}": float(v) for q, v in zip(PERCENTILES, np.percentile(probabilities, PERCENTILES))},
+        "pass_rate": float((probabilities >= thresholds).mean()),
+        "histogram": {"edges": edges.tolist(), "counts": counts.tolist()},
+    }
+
+
+def simulate(project_dict, ranges, n=DEFAULT_SAMPLES, seed=0, time_budget_ms=None) -> dict:
+    """
+    Score `n` perturbations of `project_dict` in chunks of CHUNK_SIZE rows
+    until they are done or the time budget runs out (the first chunk is
+    always scored). Results are cached by model version, the inputs the
+    model sees, the ranges, `n` and `seed`.
+    """
+    ranges = check_ranges(ranges)
+    if not 1 <= n <= MAX_SAMPLES:
+        raise ValueError(f"Samples must be between 1 and {MAX_SAMPLES}")
+
+    loaded = feasibility.get_loaded()
+    key = prediction_cache.make_key(loaded.version, project_dict, loaded.feature_columns) + (
+        tuple(sorted(ranges.items())), int(n), int(seed),
+    )
+    cached = cache.get(key)
+    if cached is not None:
+        cached["cached"] = True
+        return cached
+
+    start = time.perf_counter()
+    deadline = start + (TIME_BUDGET_MS if time_budget_ms is None else time_budget_ms) / 1000
+    columns = sample_inputs(project_dict, ranges, n, seed)
+
+    probabilities, thresholds = [], []
+    for i in range(0, n, CHUNK_SIZE):
+        if i and time.perf_counter() > deadline:
+            break
+        chunk = {feature: values[i:i + CHUNK_SIZE] for feature, values in columns.items()}
+        p, t = score_cells(loaded, project_dict, chunk)
+        probabilities.append(p)
+        thresholds.append(t)
+
+    probabilities = np.concatenate(probabilities)
+    result = {
+        "model_version": loaded.version,
+        "ranges": {feature: list(bounds) for feature, bounds in ranges.items()},
+        "requested": int(n),
+        "samples": len(probabilities),
+        "truncated": len(probabilities) < n,
+        "elapsed_ms": (time.perf_counter() - start) * 1000,
+        **summarize(probabilities, np.concatenate(thresholds)),
+    }
+
+    cache.set(key, result)
+    result["cached"] = False
+    return result
+
+
+def simulate_bounds(project_dict, bounds=None, n=DEFAULT_SAMPLES, seed=0) -> dict:
+    """
+    simulate() with ranges as the result page sends them: feature ->
+    [lo, hi], either end None for the entered value. Inputs that can't be
+    sampled are ignored; without any range, default_ranges().
+    """
+    ranges = {}
+    for feature, (lo, hi) in (bounds or {}).items():
+        if feature in SAMPLED and (lo is not None or hi is not None):
+            current = float(project_dict.get(feature) or 0)
+            ranges[feature] = (current if lo is None else lo, current if hi is None else hi)
+    return simulate(project_dict, ranges or default_ranges(project_dict), n=n, seed=seed)
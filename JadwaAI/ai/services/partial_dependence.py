@@ -0,0 +1,168 @@
+# ai/services/partial_dependence.py
+"""
+Partial-dependence curves of a model version over the dataset.
+
+For each numeric input, every background row of the dataset is scored
+with that input set to each grid value; the curve is the mean adjusted
+probability per grid value, with the 10th/90th percentile of the rows as
+a band. Curves are computed offline (compute_partial_dependence command),
+saved as one float32 .npz per model version and read back through a
+small cache, so requests never score the dataset.
+"""
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import numpy as np
+
+from ai.services import feasibility
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+AI_DIR = os.path.dirname(BASE_DIR)
+
+# Not inside the registry: verify() checksums every file of a version
+CURVES_DIR = os.getenv("JADWA_PARTIAL_DEPENDENCE_DIR", os.path.join(AI_DIR, "models", "partial_dependence"))
+
+# The numeric inputs build_project_data gives the model. num_enterprises is
+# left out: production inputs never set it (the model column is always 0),
+# so its curve says nothing about a project.
+FEATURES = [
+    "budget_project",
+    "project_duration_days",
+    "num_saudi_employees",
+    "economic_indicator",
+]
+BAND = (10, 90)
+
+
+def curves_path(version) -> str:
+    return os.path.join(CURVES_DIR, f"{version}.npz")
+
+
+def background_rows(dataset_path, n_rows=500, seed=0) -> list:
+    """Project dicts (raw budgets) for a random sample of dataset rows."""
+    import pandas as pd
+
+    from ai.services import training
+
+    frame, _ = training.clean_dataset(pd.read_csv(dataset_path))
+    frame["budget_project"] = np.expm1(frame["budget_project"])
+    if len(frame) > n_rows:
+        frame = frame.sample(n_rows, random_state=seed)
+    return frame.to_dict("records")
+
+
+def grid_values(feature, rows, n=40) -> np.ndarray:
+    """Grid over the 1st-99th percentile of the background rows."""
+    if feature == "economic_indicator":
+        # The form only produces 1-3 (Low/Medium/High)
+        return np.array([1.0, 2.0, 3.0])
+
+    column = np.array([float(r.get(feature) or 0) for r in rows])
+    lo, hi = np.percentile(column, [1, 99])
+    if feature == "budget_project":
+        return np.geomspace(max(lo, 1000.0), max(hi, 2000.0), n)
+    if feature == "project_duration_days":
+        return np.linspace(max(lo, 30.0), max(hi, 60.0), n)
+    return np.unique(np.round(np.linspace(lo, max(hi, lo + 1), n)))
+
+
+def curve(loaded, rows, feature, values) -> dict:
+    """Every row x every grid value in one forest call."""
+    n, g = len(rows), len(values)
+
+    if loaded.mapper is not None:
+        x = loaded.mapper.transform_many(rows)
+        x = np.tile(x, (g, 1))
+        x[:, loaded.mapper.column_index(feature)] = np.repeat(loaded.mapper.transform_column(feature, values), n)
+        raw = feasibility._predict_matrix(loaded, x)
+    else:
+        cells = [dict(row, **{feature: float(v)}) for v in values for row in rows]
+        raw = loaded.model.predict_proba(feasibility._pandas_features(cells, loaded.feature_columns))[:, 1]
+
+    if feature == "budget_project":
+        budgets = np.repeat(values, n)
+    else:
+        budgets = np.tile([float(r.get("budget_project") or 0) for r in rows], g)
+
+    probabilities = feasibility.adjust_probabilities(raw, budgets).reshape(g, n)
+    low, high = np.percentile(probabilities, BAND, axis=1)
+    return {
+        "values": np.asarray(values, dtype=np.float32),
+        "mean": probabilities.mean(axis=1).astype(np.float32),
+        "low": low.astype(np.float32),
+        "high": high.astype(np.float32),
+    }
+
+
+_worker_loaded = None
+
+
+def _worker_init(version):
+    global _worker_loaded
+    _worker_loaded = feasibility.load_model(None if version == feasibility.LEGACY_VERSION else version)
+
+
+def _worker_curve(rows, feature, values, loaded=None):
+    return feature, curve(loaded or _worker_loaded, rows, feature, values)
+
+
+def compute(loaded, rows, grid_points=40, workers=0, features=None) -> dict:
+    """feature -> curve arrays; `workers` > 0 computes features in parallel processes."""
+    features = [f for f in (features or FEATURES) if f in loaded.feature_columns]
+    tasks = [(rows, f, grid_values(f, rows, grid_points)) for f in features]
+
+    if workers <= 0:
+        return dict(_worker_curve(*task, loaded=loaded) for task in tasks)
+
+    with ProcessPoolExecutor(workers, initializer=_worker_init, initargs=(loaded.version,)) as pool:
+        return dict(pool.map(_worker_curve, *zip(*tasks)))
+
+
+def save(version, curves, metadata=None) -> str:
+    os.makedirs(CURVES_DIR, exist_ok=True)
+    arrays = {f"{feature}.{name}": a for feature, c in curves.items() for name, a in c.items()}
+    meta = dict(metadata or {}, version=version, features=list(curves))
+    arrays["meta"] = np.frombuffer(json.dumps(meta).encode("utf-8"), dtype=np.uint8)
+
+    path = curves_path(version)
+    tmp = f"{path}.tmp-{os.getpid()}.npz"
+    np.savez_compressed(tmp, **arrays)
+    os.replace(tmp, path)
+    return path
+
+
+@lru_cache(maxsize=8)
+def _read(path, mtime):
+    with np.load(path) as data:
+        meta = json.loads(data["meta"].tobytes().decode("utf-8"))
+        curves = {
+            feature: {name: data[f"{feature}.{name}"].tolist() for name in ("values", "mean", "low", "high")}
+            for feature in meta["features"]
+        }
+    return {"meta": meta, "curves": curves}
+
+
+def load_curves(version):
+    """Curves of `version` as lists, or None if they were never computed."""
+    path = curves_path(version)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    return _read(path, mtime)
+
+
+def serving_curves() -> dict:
+    """
+    {"model_version", "curves"} for the loaded model; curves is None when
+    they were never computed. Curves saved before a feature was dropped
+    from FEATURES are left out.
+    """
+    version = feasibility.get_version()
+    stored = load_curves(version)
+    curves = None
+    if stored is not None:
+        curves = {feature: c for feature, c in stored["curves"].items() if feature in FEATURES}
+    return {"model_version": version, "curves": curves}
@@ -0,0 +1,90 @@
+# ai/services/placement.py
+"""
+The same project scored in every region x project type of the project form.
+
+Each cell gets the economic indicator and similar-enterprise count a
+project saved there would get (same lookups as Projects.save, with the
+reference tables read once per ranking), then all cells are scored in one
+forest call with the project's budget rule and dynamic_threshold.
+"""
+import numpy as np
+
+from ai.services import feasibility
+
+# build_project_data's mapping of Projects.economic_indicator; unknown -> 2
+ECONOMIC_LEVELS = {"Low": 1, "Medium": 2, "High": 3}
+
+
+def placement_cells(city=None) -> list:
+    """
+    [(region, city, type)] for every region and type on the form. The
+    project's own city is kept in its region; other regions use their
+    first listed city.
+    """
+    from JADWA_AI.models import Projects
+
+    cities = {}
+    for region_key, city_key in Projects.REGION_CITY_TO_DATASET_LOC:
+        cities.setdefault(region_key, city_key)
+        if city_key == city:
+            cities[region_key] = city_key
+
+    regions = [key for key, _ in Projects.REGION_CHOICES if key in cities]
+    types = [key for key, _ in Projects.PROJECT_TYPE_CHOICES]
+    return [(region, cities[region], project_type) for region in regions for project_type in types]
+
+
+def reference_tables() -> tuple:
+    """(region indicators, similar-enterprise index), two queries at most."""
+    from JADWA_AI.fill_economic_indicator import region_indicator_table
+    from JADWA_AI.num_similar_enterprises import enterprise_index
+
+    return region_indicator_table(), enterprise_index()
+
+
+def cell_inputs(project_dict, region, city, project_type, tables=None) -> dict:
+    from JADWA_AI.models import Projects
+    from JADWA_AI.num_similar_enterprises import get_similar_enterprises
+
+    indicators, enterprises = tables or reference_tables()
+    location, project_location = Projects.dataset_location(region, city)
+    level = Projects.economic_level(indicators.get(location))
+    return dict(
+        project_dict,
+        type_project=project_type,
+        region_project=f"{region}, {city}",
+        economic_indicator=ECONOMIC_LEVELS.get(level, 2),
+        num_of_similar_enterprises=get_similar_enterprises(project_type, project_location, enterprises),
+    )
+
+
+def rank_placements(project_dict, city=None, loaded=None) -> dict:
+    """Every placement of `project_dict`, best probability first."""
+    loaded = loaded or feasibility.get_loaded()
+    cells = placement_cells(city)
+    tables = reference_tables()
+    rows = [cell_inputs(project_dict, *cell, tables=tables) for cell in cells]
+
+    budgets = np.full(len(rows), float(project_dict.get("budget_project") or 0))
+    probabilities = feasibility.adjust_probabilities(feasibility._raw_probabilities(loaded, rows), budgets)
+    thresholds = feasibility.dynamic_thresholds(budgets)
+
+    placements = [
+        {
+            "region": region,
+            "city": city_key,
+            "type": project_type,
+            "probability": float(p),
+            "threshold": float(t),
+            "label": int(p >= t),
+            "economic_indicator": row["economic_indicator"],
+            "num_of_similar_enterprises": row["num_of_similar_enterprises"],
+        }
+        for (region, city_key, project_type), row, p, t in zip(cells, rows, probabilities, thresholds)
+    ]
+    # Stable sort keeps the form's order between equal probabilities
+    placements.sort(key=lambda c: -c["probability"])
+    for rank, cell in enumerate(placements, start=1):
+        cell["rank"] = rank
+
+    return {"model_version": loaded.version, "placements": placements}
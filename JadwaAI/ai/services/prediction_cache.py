@@ -0,0 +1,94 @@
+# ai/services/prediction_cache.py
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+CACHE_SIZE = int(os.getenv("JADWA_PREDICTION_CACHE_SIZE", "2048"))
+# Seconds; 0 means entries only leave the cache when it is full
+CACHE_TTL = float(os.getenv("JADWA_PREDICTION_CACHE_TTL", "0"))
+
+
+def _canonical(value):
+    # Mirrors the inference preprocessing: missing -> 0 and numbers compared
+    # as floats, so 250000 and 250000.0 share one entry
+    if value is None:
+        return 0.0
+    if isinstance(value, str):
+        return value
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return str(value)
+    return 0.0 if np.isnan(value) else value
+
+
+def make_key(version, project_dict, feature_columns) -> tuple:
+    """Model version + the feature values the model actually sees."""
+    return (version,) + tuple(_canonical(project_dict.get(col)) for col in feature_columns)
+
+
+class PredictionCache:
+    """
+    Bounded LRU of predict_project results, with an optional TTL.
+
+    Keys carry the model version, so a registry swap never serves a stale
+    result; clear() is also called on swap to release the old entries.
+    """
+
+    def __init__(self, maxsize=CACHE_SIZE, ttl=CACHE_TTL):
+        self.maxsize = int(maxsize)
+        self.ttl = float(ttl)
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        if self.maxsize <= 0:
+            return None
+
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and self.ttl and time.monotonic() - entry[0] > self.ttl:
+                del self._data[key]
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return dict(entry[1])
+
+    def set(self, key, result):
+        if self.maxsize <= 0:
+            return
+
+        with self._lock:
+            self._data[key] = (time.monotonic(), dict(result))
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+            }
+
+
+cache = PredictionCache()
@@ -35,7 +35,90 @@ from pathlib import Path
 PROMPT_AR = Path(__file__).resolve().parents[1] / "prompts" / "prompt_ar.md"
 PROMPT_EN = Path(__file__).resolve().parents[1] / "prompts" / "prompt_en.md"
 
-def build_prompt(project_dict: dict, ml_result: dict, lang: str = "en") -> str:
+FEATURE_LABELS = {
+    "en": {
+        "type_project": "Project type",
+        "region_project": "Region",
+        "budget_project": "Budget",
+        "project_duration_days": "Project duration",
+        "num_enterprises": "Market activity indicator",
+        "num_saudi_employees": "Number of Saudi employees",
+        "economic_indicator": "Economic indicator",
+        "adjustment": "Budget size rule",
+    },
+    "ar": {
+        "type_project": "نوع المشروع",
+        "region_project": "المنطقة",
+        "budget_project": "الميزانية",
+        "project_duration_days": "مدة المشروع",
+        "num_enterprises": "مؤشر نشاط السوق",
+        "num_saudi_employees": "عدد الموظفين السعوديين",
+        "economic_indicator": "المؤشر الاقتصادي",
+        "adjustment": "قاعدة حجم الميزانية",
+    },
+}
+
+
+def top_drivers(contributions: dict, limit: int = 5, min_points: float = 0.1) -> list:
+    """[(feature, percentage points)] sorted by size, largest first."""
+    values = dict((contributions or {}).get("values") or {})
+    if contributions and contributions.get("adjustment"):
+        values["adjustment"] = contributions["adjustment"]
+
+    points = [(feature, value * 100) for feature, value in values.items()]
+    points = [p for p in points if abs(p[1]) >= min_points]
+    return sorted(points, key=lambda p: abs(p[1]), reverse=True)[:limit]
+
+
+def format_drivers(contributions: dict, lang: str = "en") -> str:
+    is_ar = str(lang).startswith("ar")
+    labels = FEATURE_LABELS["ar" if is_ar else "en"]
+
+    drivers = top_drivers(contributions)
+    if not drivers:
+        return "غير متوفر" if is_ar else "Not available"
+
+    lines = []
+    for feature, points in drivers:
+        if is_ar:
+            direction = "يرفع الاحتمالية" if points > 0 else "يخفض الاحتمالية"
+            lines.append(f"- {labels.get(feature, feature)}: {points:+.1f} نقطة ({direction})")
+        else:
+            direction = "raises the probability" if points > 0 else "lowers the probability"
+            lines.append(f"- {labels.get(feature, feature)}: {points:+.1f} points ({direction})")
+    return "\n".join(lines)
+
+
+def format_confidence(uncertainty: dict, lang: str = "en") -> str:
+    """Tree agreement for the prompt; borderline results ask for a more careful answer."""
+    is_ar = str(lang).startswith("ar")
+    if not uncertainty or not uncertainty.get("trees"):
+        return "غير متوفر" if is_ar else "Not available"
+
+    agreement = uncertainty["agreement"] * 100
+    low, high = uncertainty["low"] * 100, uncertainty["high"] * 100
+    trees = uncertainty["trees"]
+
+    if is_ar:
+        text = f"{agreement:.0f}% من {trees} شجرة قرار تتفق مع القرار النهائي، وتتراوح تقديراتها بين {low:.0f}% و{high:.0f}%."
+        if uncertainty.get("low_confidence"):
+            text += (
+                "\nالنتيجة حدّية: تعامل مع القرار بحذر، واذكر في الملخص أنه قريب من الحد، "
+                "وناقش ما يلزم للنجاح وما قد يؤدي للتعثر، وحدد المعلومات أو الخطوات التي تحسم القرار."
+            )
+        return text
+
+    text = f"{agreement:.0f}% of {trees} decision trees agree with the final decision; their estimates range from {low:.0f}% to {high:.0f}%."
+    if uncertainty.get("low_confidence"):
+        text += (
+            "\nThis is a borderline result: treat the decision with caution, say in the Summary that it is close "
+            "to the threshold, discuss what it takes to succeed and what could make it fail, and name the "
+            "information or steps that would settle the decision."
+        )
+    return text
+
+
+def build_prompt(project_dict: dict, ml_result: dict, lang: str = "en", contributions: dict = None) -> str:
     print("دخلنا build_prompt")
 
     template_path = PROMPT_AR if str(lang).startswith("ar") else PROMPT_EN
@@ -61,6 +144,8 @@ def build_prompt(project_dict: dict, ml_result: dict, lang: str = "en") -> str:
         "probability": ml_result.get("probability", 0),
         "threshold": ml_result.get("threshold", 0.6),
         "label": ml_result.get("label", 0),
+        "drivers": format_drivers(contributions, lang),
+        "confidence": format_confidence(ml_result.get("uncertainty"), lang),
     }
 
     # طباعة للتأكد
@@ -0,0 +1,69 @@
+# ai/services/synthetic_projects.py
+import os
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(os.path.dirname(BASE_DIR))
+
+DATASET_PATH = os.path.join(PROJECT_ROOT, "dataset", "jadwa_ai_final_dataset.csv")
+
+PROJECT_TYPES = ["Service", "Product", "Hybrid"]
+
+# Used when a column has no usable values in the dataset
+FALLBACK_BUDGETS = [20000.0, 80000.0, 250000.0, 900000.0, 5000000.0]
+FALLBACK_DURATIONS = [90.0, 180.0, 365.0, 720.0]
+
+
+def _observed(frame, column, fallback):
+    if column not in frame:
+        return np.asarray(fallback, dtype=float)
+
+    values = pd.to_numeric(frame[column], errors="coerce").dropna()
+    values = values[values > 0]
+    return values.to_numpy() if len(values) else np.asarray(fallback, dtype=float)
+
+
+def load_distributions(path=DATASET_PATH) -> dict:
+    """Empirical values of the inputs the model sees, taken from the training CSV."""
+    frame = pd.read_csv(path)
+
+    regions = frame["region_project"].dropna().astype(str).str.strip()
+    regions = regions[regions != ""]
+    region_freq = regions.value_counts(normalize=True)
+
+    return {
+        "regions": region_freq.index.to_list(),
+        "region_weights": region_freq.to_numpy(),
+        "budgets": _observed(frame, "budget_project", FALLBACK_BUDGETS),
+        "durations": _observed(frame, "project_duration_days", FALLBACK_DURATIONS),
+    }
+
+
+def synthetic_projects(n, seed=0, distributions=None) -> list:
+    """
+    `n` build_project_data-shaped dicts. Regions, budgets and durations
+    are resampled from the dataset (budgets with log-normal jitter); the
+    fields the dataset doesn't describe per project use small uniform ranges.
+    """
+    dist = distributions or load_distributions()
+    rng = np.random.RandomState(seed)
+
+    regions = rng.choice(len(dist["regions"]), size=n, p=dist["region_weights"])
+    budgets = rng.choice(dist["budgets"], size=n) * np.exp(rng.normal(0, 0.3, n))
+    durations = rng.choice(dist["durations"], size=n)
+
+    return [
+        {
+            "type_project": PROJECT_TYPES[rng.randint(len(PROJECT_TYPES))],
+            "region_project": dist["regions"][regions[i]],
+            "budget_project": float(round(budgets[i], 2)),
+            "project_duration_days": int(durations[i]),
+            "num_saudi_employees": int(rng.randint(0, 50)),
+            "num_of_similar_enterprises": int(rng.randint(0, 500)),
+            "economic_indicator": int(rng.randint(1, 4)),
+            "description": "synthetic benchmark project",
+        }
+        for i in range(n)
+    ]
@@ -0,0 +1,192 @@
+# ai/services/training.py
+"""
+Rebuilds rf_pipeline.pkl from dataset/jadwa_ai_final_dataset.csv.
+
+The dataset is cleaned into the model's feature_columns, then one-hot
+encoded once; that matrix is cached under ai/models/training_cache/ keyed
+by the CSV's sha256, so repeated searches skip straight to fitting. The
+grid search runs folds x candidates in parallel on the cached matrix and
+the result is the same Pipeline(preprocess, model) the app always loaded.
+
+scikit-learn is imported by the functions that fit, not at module level:
+drift and partial dependence reuse clean_dataset in web workers.
+"""
+import hashlib
+import os
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from ai.services.synthetic_projects import DATASET_PATH
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+AI_DIR = os.path.dirname(BASE_DIR)
+
+CACHE_DIR = os.getenv("JADWA_TRAINING_CACHE_DIR", os.path.join(AI_DIR, "models", "training_cache"))
+
+# Bump when clean_dataset/encode change, so old cache entries are not reused
+PREPROCESS_VERSION = 1
+
+FEATURE_COLUMNS = [
+    "type_project",
+    "region_project",
+    "budget_project",
+    "project_duration_days",
+    "num_enterprises",
+    "num_saudi_employees",
+    "economic_indicator",
+]
+CATEGORICAL = ["type_project", "region_project"]
+TARGET = "project_success"
+
+PARAM_GRID = {
+    "n_estimators": [100, 300],
+    "max_depth": [None, 12],
+    "min_samples_leaf": [1, 3],
+}
+SCORING = {"roc_auc": "roc_auc", "accuracy": "accuracy", "f1": "f1"}
+
+
+def dataset_hash(path=DATASET_PATH) -> str:
+    h = hashlib.sha256(f"preprocess-v{PREPROCESS_VERSION}".encode())
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def clean_dataset(frame):
+    """
+    CSV columns -> feature_columns, prepared like _pandas_features does at
+    inference: missing numbers are 0 and the budget is log1p'd.
+    economic_indicator is empty in the current CSV, so it trains as 0.
+    """
+    x = pd.DataFrame({
+        "type_project": frame["sectors"].astype(str).str.strip(),
+        "region_project": frame["region_project"].astype(str).str.strip(),
+        "budget_project": pd.to_numeric(frame["budget_project"], errors="coerce"),
+        "project_duration_days": pd.to_numeric(frame["project_duration_days"], errors="coerce"),
+        "num_enterprises": pd.to_numeric(frame["عدد المنشآت"], errors="coerce"),
+        "num_saudi_employees": pd.to_numeric(frame["عدد العاملين السعوديين"], errors="coerce"),
+        "economic_indicator": pd.to_numeric(frame.get("economic_indicator"), errors="coerce"),
+    })[FEATURE_COLUMNS]
+
+    numeric = [c for c in FEATURE_COLUMNS if c not in CATEGORICAL]
+    x[numeric] = x[numeric].fillna(0)
+    x["budget_project"] = np.log1p(x["budget_project"].clip(lower=0))
+
+    y = pd.to_numeric(frame[TARGET], errors="coerce")
+    keep = y.notna().to_numpy()
+    return x[keep].reset_index(drop=True), y[keep].astype(int).to_numpy()
+
+
+def make_preprocessor():
+    from sklearn.compose import ColumnTransformer
+    from sklearn.preprocessing import OneHotEncoder
+
+    return ColumnTransformer(
+        [("cat", OneHotEncoder(handle_unknown="ignore"), CATEGORICAL)],
+        remainder="passthrough",
+    )
+
+
+def load_training_data(path=DATASET_PATH, use_cache=True) -> dict:
+    """
+    {"x": encoded matrix, "y", "preprocess": fitted ColumnTransformer,
+    "rows", "hash", "cached"}. The encoder only learns the category
+    vocabulary (no labels), so fitting it once outside the CV folds does
+    not leak the target.
+    """
+    key = dataset_hash(path)
+    cache_path = os.path.join(CACHE_DIR, f"{key}.joblib")
+
+    if use_cache and os.path.exists(cache_path):
+        data = joblib.load(cache_path)
+        data["cached"] = True
+        return data
+
+    x, y = clean_dataset(pd.read_csv(path))
+    preprocess = make_preprocessor()
+    matrix = preprocess.fit_transform(x)
+    if hasattr(matrix, "toarray"):
+        matrix = matrix.toarray()
+
+    data = {
+        "x": np.ascontiguousarray(matrix, dtype=np.float32),
+        "y": y,
+        "preprocess": preprocess,
+        "rows": len(y),
+        "hash": key,
+    }
+    if use_cache:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp = f"{cache_path}.tmp-{os.getpid()}"
+        joblib.dump(data, tmp)
+        os.replace(tmp, cache_path)
+
+    data["cached"] = False
+    return data
+
+
+def search(data, param_grid=None, cv=5, n_jobs=-1, seed=0):
+    """GridSearchCV of the forest on the cached matrix, refit on every row."""
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.model_selection import GridSearchCV, StratifiedKFold
+
+    folds = StratifiedKFold(n_splits=cv, shuffle=True, random_state=seed)
+    grid = GridSearchCV(
+        # One thread per fit; the search spreads the fits over the cores
+        RandomForestClassifier(random_state=seed, n_jobs=1),
+        param_grid or PARAM_GRID,
+        scoring=SCORING,
+        refit="roc_auc",
+        cv=folds,
+        n_jobs=n_jobs,
+    )
+    start = time.perf_counter()
+    grid.fit(data["x"], data["y"])
+    return grid, time.perf_counter() - start
+
+
+def build_pipeline(data, estimator):
+    from sklearn.pipeline import Pipeline
+
+    return Pipeline([("preprocess", data["preprocess"]), ("model", estimator)])
+
+
+def inference_latency(pipeline, n=200) -> dict:
+    """Single-project and batch timings through the path predict_project uses."""
+    from ai.services import feasibility
+    from ai.services.synthetic_projects import synthetic_projects
+
+    loaded = feasibility.make_loaded(pipeline, FEATURE_COLUMNS, "candidate")
+    projects = synthetic_projects(n, seed=0)
+
+    timings = []
+    for project in projects:
+        t0 = time.perf_counter()
+        feasibility._raw_probabilities(loaded, [project])
+        timings.append((time.perf_counter() - t0) * 1000)
+
+    t0 = time.perf_counter()
+    feasibility._raw_probabilities(loaded, projects)
+    batch_ms = (time.perf_counter() - t0) * 1000
+
+    return {
+        "single_p50_ms": float(np.percentile(timings, 50)),
+        "single_p95_ms": float(np.percentile(timings, 95)),
+        "batch_rows": n,
+        "batch_ms": batch_ms,
+    }
+
+
+def cv_metrics(grid) -> dict:
+    best = grid.best_index_
+    results = grid.cv_results_
+    metrics = {}
+    for name in SCORING:
+        metrics[f"cv_{name}"] = float(results[f"mean_test_{name}"][best])
+        metrics[f"cv_{name}_std"] = float(results[f"std_test_{name}"][best])
+    return metrics
@@ -0,0 +1,114 @@
+# ai/services/what_if.py
+import numpy as np
+
+from ai.services import feasibility
+
+# Inputs a user can change on the project form, with their default sweep
+# range as (min, max, spacing). Budget ranges are relative to the project.
+AXES = {
+    "budget_project": (None, None, "log"),
+    "project_duration_days": (30, 1800, "linear"),
+    "num_saudi_employees": (0, 50, "int"),
+    "economic_indicator": (1, 3, "int"),
+}
+
+MAX_POINTS_PER_AXIS = 100
+
+
+def axis_values(feature, project_dict, n=50, lo=None, hi=None) -> np.ndarray:
+    if feature not in AXES:
+        raise ValueError(f"Unsupported axis: {feature}")
+    if not 2 <= n <= MAX_POINTS_PER_AXIS:
+        raise ValueError(f"Points per axis must be between 2 and {MAX_POINTS_PER_AXIS}")
+
+    default_lo, default_hi, spacing = AXES[feature]
+
+    if feature == "budget_project":
+        budget = float(project_dict.get("budget_project") or 0) or 100000.0
+        default_lo, default_hi = budget / 10, budget * 10
+    elif feature == "num_saudi_employees":
+        default_hi = max(default_hi, 2 * int(project_dict.get("num_saudi_employees") or 0))
+
+    lo = float(default_lo if lo is None else lo)
+    hi = float(default_hi if hi is None else hi)
+    if not lo < hi or lo < 0:
+        raise ValueError(f"Invalid range for {feature}: {lo}..{hi}")
+
+    if spacing == "log":
+        return np.geomspace(max(lo, 1.0), hi, n)
+    if spacing == "int":
+        return np.unique(np.round(np.linspace(lo, hi, n)))
+    return np.linspace(lo, hi, n)
+
+
+def score_cells(loaded, project_dict, columns):
+    """
+    Adjusted probability and threshold of `project_dict` with some inputs
+    replaced: `columns` maps feature -> 1-d array, all the same length, one
+    entry per cell. Every cell is scored in one forest call.
+    """
+    n = len(next(iter(columns.values())))
+
+    if loaded.mapper is not None:
+        # One mapped row, tiled; only the given columns differ per cell
+        x = np.tile(loaded.mapper.transform(project_dict), (n, 1))
+        for feature, cells in columns.items():
+            x[:, loaded.mapper.column_index(feature)] = loaded.mapper.transform_column(feature, cells)
+        raw = feasibility._predict_matrix(loaded, x)
+    else:
+        rows = [dict(project_dict) for _ in range(n)]
+        for feature, cells in columns.items():
+            for row, value in zip(rows, np.asarray(cells).tolist()):
+                row[feature] = value
+        raw = loaded.model.predict_proba(feasibility._pandas_features(rows, loaded.feature_columns))[:, 1]
+
+    budgets = columns.get("budget_project")
+    if budgets is None:
+        budgets = np.full(n, float(project_dict.get("budget_project", 0)))
+
+    return feasibility.adjust_probabilities(raw, budgets), feasibility.dynamic_thresholds(budgets)
+
+
+def what_if_grid(project_dict, axes) -> dict:
+    """
+    Probability of `project_dict` with one or two inputs swept over a grid.
+
+    `axes` is [(feature, values)] or [(feature, values), (feature, values)];
+    the result arrays have shape (len(values_0), len(values_1)). All cells
+    are scored in one forest call, then get the same budget adjustment and
+    dynamic_threshold as predict_project.
+    """
+    if not 1 <= len(axes) <= 2:
+        raise ValueError("Pass one or two axes")
+    if len(axes) == 2 and axes[0][0] == axes[1][0]:
+        raise ValueError("Axes must be different features")
+
+    loaded = feasibility.get_loaded()
+    values = [np.asarray(v, dtype=np.float64) for _, v in axes]
+    shape = tuple(len(v) for v in values)
+    mesh = np.meshgrid(*values, indexing="ij")
+    columns = {feature: m.ravel() for (feature, _), m in zip(axes, mesh)}
+
+    probabilities, thresholds = score_cells(loaded, project_dict, columns)
+
+    return {
+        "model_version": loaded.version,
+        "axes": [{"feature": feature, "values": v.tolist()} for (feature, _), v in zip(axes, values)],
+        "probability": probabilities.reshape(shape).tolist(),
+        "threshold": thresholds.reshape(shape).tolist(),
+        "label": (probabilities >= thresholds).astype(int).reshape(shape).tolist(),
+    }
+
+
+def sweep(project_dict, axes) -> dict:
+    """
+    what_if_grid with the axes given as [{"feature", "n", "lo", "hi"}]
+    (n/lo/hi optional) and their values from axis_values.
+    """
+    return what_if_grid(project_dict, [
+        (
+            axis["feature"],
+            axis_values(axis["feature"], project_dict, n=axis.get("n", 50), lo=axis.get("lo"), hi=axis.get("hi")),
+        )
+        for axis in axes
+    ])
@@ -0,0 +1,1079 @@
+import time
+from unittest import mock
+
+import joblib
+import numpy as np
+import pandas as pd
+from django.test import SimpleTestCase, TestCase
+from sklearn.compose import ColumnTransformer
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder
+
+FEATURE_COLUMNS = [
+    "type_project",
+    "region_project",
+    "budget_project",
+    "project_duration_days",
+    "num_enterprises",
+    "num_saudi_employees",
+    "economic_indicator",
+]
+
+TYPES = ["Service", "Product", "Hybrid"]
+REGIONS = ["riyadh, riyadh", "qassim, unaizah", "eastern, dammam", "makkah, jeddah"]
+
+
+def make_training_frame(n=400, seed=0):
+    rng = np.random.RandomState(seed)
+    budget = rng.choice([20000, 80000, 150000, 400000, 900000, 5000000], n) * rng.uniform(0.5, 1.5, n)
+    x = pd.DataFrame({
+        "type_project": rng.choice(TYPES, n),
+        "region_project": rng.choice(REGIONS, n),
+        "budget_project": np.log1p(budget),
+        "project_duration_days": rng.randint(30, 720, n),
+        "num_enterprises": rng.randint(0, 100, n),
+        "num_saudi_employees": rng.randint(0, 20, n),
+        "economic_indicator": rng.randint(1, 4, n),
+    })
+    y = ((x["budget_project"] > 11.5) & (x["num_saudi_employees"] > 3)) | (x["economic_indicator"] == 3)
+    flip = rng.uniform(size=n) < 0.1
+    return x, (y ^ flip).astype(int)
+
+
+def make_pipeline(n_estimators=25, seed=0):
+    x, y = make_training_frame(seed=seed)
+    pre = ColumnTransformer(
+        [("cat", OneHotEncoder(handle_unknown="ignore"), ["type_project", "region_project"])],
+        remainder="passthrough",
+    )
+    pipeline = Pipeline([
+        ("preprocess", pre),
+        ("model", RandomForestClassifier(n_estimators=n_estimators, max_depth=8, random_state=seed)),
+    ])
+    pipeline.fit(x, y)
+    return pipeline
+
+
+def make_projects(n=60, seed=1):
+    rng = np.random.RandomState(seed)
+    projects = []
+    for i in range(n):
+        project = {
+            "type_project": TYPES[i % len(TYPES)],
+            "region_project": REGIONS[i % len(REGIONS)],
+            "budget_project": float(rng.choice([0, 5000, 99999, 100000, 250000, 499999, 500000, 2500000, 12000000])),
+            "project_duration_days": int(rng.randint(1, 24)) * 30,
+            "num_saudi_employees": int(rng.randint(0, 15)),
+            "num_of_similar_enterprises": int(rng.randint(0, 80)),
+            "economic_indicator": int(rng.randint(1, 4)),
+            "description": "test",
+        }
+        if i % 7 == 0:
+            project.pop("economic_indicator")
+        if i % 11 == 0:
+            project["region_project"] = "unknown region"
+        projects.append(project)
+    return projects
+
+
+PIPELINE = make_pipeline()
+
+
+def import_feasibility():
+    from ai.services import feasibility
+    return feasibility
+
+
+def using_model(model, version="test"):
+    feasibility = import_feasibility()
+    return mock.patch.object(feasibility, "_loaded", feasibility.make_loaded(model, FEATURE_COLUMNS, version))
+
+
+def using_cache(maxsize=0, ttl=0):
+    # maxsize=0 disables caching, so parity tests really run both paths
+    from ai.services import prediction_cache
+    return mock.patch.object(prediction_cache, "cache", prediction_cache.PredictionCache(maxsize, ttl))
+
+
+class BatchPredictTest(SimpleTestCase):
+
+    def setUp(self):
+        self.feasibility = import_feasibility()
+        for patcher in (using_model(PIPELINE), using_cache()):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_predict_projects_matches_predict_project(self):
+        projects = make_projects()
+
+        batch = self.feasibility.predict_projects(projects)
+        single = [self.feasibility.predict_project(p) for p in projects]
+
+        self.assertEqual(batch, single)
+
+    def test_predict_projects_empty(self):
+        self.assertEqual(self.feasibility.predict_projects([]), [])
+
+    def test_dynamic_thresholds_matches_scalar(self):
+        budgets = [0, 99999, 100000, 499999, 500000, 10 ** 9]
+        self.assertEqual(
+            list(self.feasibility.dynamic_thresholds(budgets)),
+            [self.feasibility.dynamic_threshold(b) for b in budgets],
+        )
+
+
+class FeatureMapperTest(SimpleTestCase):
+
+    def setUp(self):
+        self.feasibility = import_feasibility()
+        for patcher in (using_model(PIPELINE), using_cache()):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_mapper_row_matches_pipeline_preprocessing(self):
+        from ai.services.feature_mapper import FeatureMapper
+
+        projects = make_projects()
+        mapper = FeatureMapper.from_pipeline(PIPELINE, FEATURE_COLUMNS)
+
+        expected = PIPELINE[:-1].transform(self.feasibility._pandas_features(projects, FEATURE_COLUMNS))
+        if hasattr(expected, "toarray"):
+            expected = expected.toarray()
+
+        np.testing.assert_array_equal(mapper.transform_many(projects), expected)
+
+    def test_numpy_and_pandas_paths_agree(self):
+        projects = make_projects()
+
+        numpy_path = [self.feasibility.predict_project(p, feature_path="numpy") for p in projects]
+        pandas_path = [self.feasibility.predict_project(p, feature_path="pandas") for p in projects]
+
+        self.assertEqual(numpy_path, pandas_path)
+        self.assertEqual(self.feasibility.predict_projects(projects, feature_path="numpy"), pandas_path)
+
+    def test_unsupported_preprocessing_falls_back_to_pandas(self):
+        from sklearn.preprocessing import FunctionTransformer
+
+        pipeline = Pipeline([("preprocess", FunctionTransformer()), ("model", PIPELINE[-1])])
+        with using_model(pipeline):
+            self.assertIsNone(self.feasibility.get_feature_mapper())
+
+
+class CompiledForestTest(SimpleTestCase):
+
+    def setUp(self):
+        from ai.services.compiled_forest import CompiledForest
+
+        self.compiled = CompiledForest.from_pipeline(PIPELINE, FEATURE_COLUMNS)
+        self.feasibility = import_feasibility()
+
+    def test_parity_with_sklearn_pipeline(self):
+        projects = make_projects(n=200)
+        frame = self.feasibility._pandas_features(projects, FEATURE_COLUMNS)
+
+        expected = PIPELINE.predict_proba(frame)
+        got = self.compiled.predict_proba(self.compiled.mapper.transform_many(projects))
+
+        np.testing.assert_allclose(got, expected, rtol=0, atol=1e-6)
+
+    def test_parity_on_random_inputs(self):
+        x = np.random.RandomState(3).normal(size=(300, self.compiled.mapper.n_outputs)) * 10
+        expected = PIPELINE[-1].predict_proba(x)
+
+        np.testing.assert_allclose(self.compiled.predict_proba(x), expected, rtol=0, atol=1e-6)
+        np.testing.assert_allclose(
+            self.compiled.tree_votes(x),
+            np.stack([tree.predict_proba(x)[:, 1] for tree in PIPELINE[-1].estimators_], axis=1),
+            rtol=0,
+            atol=1e-6,
+        )
+
+    def test_save_and_load_round_trip(self):
+        import tempfile
+        from ai.services.compiled_forest import CompiledForest
+
+        projects = make_projects()
+        x = self.compiled.mapper.transform_many(projects)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            self.compiled.save(tmp)
+            loaded = CompiledForest.load(tmp, mmap_mode="r")
+
+            np.testing.assert_array_equal(loaded.mapper.transform_many(projects), x)
+            np.testing.assert_array_equal(loaded.predict_proba(x), self.compiled.predict_proba(x))
+
+    def test_predict_project_with_compiled_model(self):
+        projects = make_projects()
+
+        with using_cache(), using_model(PIPELINE):
+            expected = self.feasibility.predict_projects(projects)
+        with using_cache(), using_model(self.compiled):
+            got = self.feasibility.predict_projects(projects)
+
+        for e, g in zip(expected, got):
+            self.assertAlmostEqual(e["probability"], g["probability"], places=6)
+            self.assertEqual(e["threshold"], g["threshold"])
+
+
+class LazyModelLoadingTest(SimpleTestCase):
+
+    def test_model_is_loaded_once_on_first_use(self):
+        feasibility = import_feasibility()
+
+        loaded = feasibility.make_loaded(PIPELINE, FEATURE_COLUMNS)
+        with mock.patch.object(feasibility, "_loaded", None), \
+                mock.patch.object(feasibility, "load_model", return_value=loaded) as load_model:
+            self.assertIs(feasibility.get_model(), PIPELINE)
+            self.assertIs(feasibility.get_model(), PIPELINE)
+
+        load_model.assert_called_once_with(None)
+
+    def test_warm_up_survives_missing_model(self):
+        feasibility = import_feasibility()
+
+        with mock.patch.object(feasibility, "_loaded", None), \
+                mock.patch.object(feasibility, "load_model", side_effect=FileNotFoundError("rf_pipeline.pkl")), \
+                self.assertLogs("ai.services.feasibility", "WARNING") as logs:
+            self.assertIsNone(feasibility.warm_up())
+        self.assertIn("rf_pipeline.pkl", logs.output[0])
+
+    def test_memory_stats_without_resource_module(self):
+        import sys
+
+        from ai.services import memory
+
+        # Windows: no resource module and no /proc
+        with mock.patch.dict(sys.modules, {"resource": None}), \
+                mock.patch.object(memory, "_status_kb", return_value=None):
+            self.assertIsNone(memory.peak_rss_mb())
+            self.assertIsNone(memory.children_peak_rss_mb())
+            self.assertIsNone(memory.rss_mb())
+            self.assertEqual(memory.format_mb(memory.rss_mb()), "n/a")
+
+            feasibility = import_feasibility()
+            loaded = feasibility.make_loaded(PIPELINE, FEATURE_COLUMNS)
+            with mock.patch.object(feasibility, "_loaded", loaded):
+                self.assertIs(feasibility.warm_up(), loaded)
+
+
+class ModelRegistryTest(SimpleTestCase):
+
+    def setUp(self):
+        import os
+        import tempfile
+
+        self.feasibility = import_feasibility()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.registry = os.path.join(tmp.name, "registry")
+
+        self.pipelines = {}
+        for version, seed in (("v1", 0), ("v2", 5)):
+            pipeline = make_pipeline(n_estimators=5, seed=seed)
+            path = os.path.join(tmp.name, f"{version}.pkl")
+            joblib.dump(pipeline, path)
+            self.pipelines[version] = path
+
+    def publish(self, version, **kwargs):
+        from ai.services import model_registry
+
+        return model_registry.publish(
+            version,
+            features_path=self.feasibility.FEATURES_PATH,
+            pipeline_path=self.pipelines[version],
+            registry_dir=self.registry,
+            **kwargs,
+        )
+
+    def test_publish_and_activate(self):
+        from ai.services import model_registry
+
+        manifest = self.publish("v1", metadata={"auc": 0.8})
+        self.assertIn("rf_pipeline.pkl", manifest["files"])
+        self.assertIsNone(model_registry.active_version(self.registry))
+
+        model_registry.activate("v1", self.registry)
+        self.assertEqual(model_registry.active_version(self.registry), "v1")
+        self.assertEqual([m["version"] for m in model_registry.versions(self.registry)], ["v1"])
+
+    def test_tampered_artifact_cannot_be_activated(self):
+        import os
+        from ai.services import model_registry
+
+        self.publish("v1")
+        with open(os.path.join(self.registry, "v1", "rf_pipeline.pkl"), "ab") as f:
+            f.write(b"x")
+
+        with self.assertRaises(model_registry.RegistryError):
+            model_registry.activate("v1", self.registry)
+
+    def test_workers_swap_to_new_active_version(self):
+        from ai.services import model_registry
+
+        self.publish("v1")
+        self.publish("v2")
+        model_registry.activate("v1", self.registry)
+
+        project = make_projects(n=1)[0]
+        with using_cache(maxsize=16), \
+                mock.patch.object(model_registry, "REGISTRY_DIR", self.registry), \
+                mock.patch.object(self.feasibility, "RELOAD_INTERVAL", 0), \
+                mock.patch.object(self.feasibility, "_next_check", 0.0), \
+                mock.patch.object(self.feasibility, "_loaded", None), \
+                mock.patch.object(self.feasibility, "_seen_pointer", None):
+            self.assertEqual(self.feasibility.predict_project(project)["model_version"], "v1")
+
+            model_registry.activate("v2", self.registry)
+
+            self.assertEqual(self.feasibility.predict_project(project)["model_version"], "v2")
+            self.assertEqual(self.feasibility.predict_projects([project])[0]["model_version"], "v2")
+
+
+class PredictionCacheTest(SimpleTestCase):
+
+    def setUp(self):
+        from ai.services import prediction_cache
+
+        self.feasibility = import_feasibility()
+        self.prediction_cache = prediction_cache
+        for patcher in (using_model(PIPELINE), using_cache(maxsize=4)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_rerun_is_served_from_cache(self):
+        project = make_projects(n=1)[0]
+        first = self.feasibility.predict_project(project)
+
+        with mock.patch.object(self.feasibility, "_tree_votes") as raw:
+            again = self.feasibility.predict_project(dict(project, description="edited"))
+            batch = self.feasibility.predict_projects([project])
+        raw.assert_not_called()
+
+        self.assertEqual(again, first)
+        self.assertEqual(batch, [first])
+        self.assertEqual(self.prediction_cache.cache.stats()["hits"], 2)
+
+    def test_equal_numbers_share_a_key(self):
+        a = {"budget_project": 250000, "num_saudi_employees": 3, "economic_indicator": None}
+        b = {"budget_project": 250000.0, "num_saudi_employees": 3.0}
+        self.assertEqual(
+            self.prediction_cache.make_key("v1", a, FEATURE_COLUMNS),
+            self.prediction_cache.make_key("v1", b, FEATURE_COLUMNS),
+        )
+        self.assertNotEqual(
+            self.prediction_cache.make_key("v1", a, FEATURE_COLUMNS),
+            self.prediction_cache.make_key("v2", a, FEATURE_COLUMNS),
+        )
+
+    def test_lru_eviction_and_ttl(self):
+        cache = self.prediction_cache.PredictionCache(maxsize=2, ttl=10)
+        cache.set("a", {"p": 1})
+        cache.set("b", {"p": 2})
+        cache.get("a")
+        cache.set("c", {"p": 3})
+
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), {"p": 1})
+
+        with mock.patch("ai.services.prediction_cache.time.monotonic", return_value=time.monotonic() + 11):
+            self.assertIsNone(cache.get("a"))
+
+
+class SyntheticProjectsTest(SimpleTestCase):
+
+    def test_projects_are_reproducible_and_scorable(self):
+        from ai.services.synthetic_projects import synthetic_projects
+
+        projects = synthetic_projects(50, seed=7)
+        self.assertEqual(projects, synthetic_projects(50, seed=7))
+        self.assertTrue(all(p["budget_project"] > 0 for p in projects))
+
+        with using_cache(), using_model(PIPELINE):
+            self.assertEqual(len(import_feasibility().predict_projects(projects)), 50)
+
+
+class WhatIfTest(SimpleTestCase):
+
+    def setUp(self):
+        from ai.services import what_if
+
+        self.feasibility = import_feasibility()
+        self.what_if = what_if
+        self.project = make_projects(n=3)[1]
+        for patcher in (using_model(PIPELINE), using_cache()):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def expected_grid(self, axes):
+        (fx, xs), (fy, ys) = axes
+        rows = [dict(self.project, **{fx: x, fy: y}) for x in xs for y in ys]
+        return self.feasibility.predict_projects(rows)
+
+    def test_grid_matches_predict_projects(self):
+        axes = [
+            ("budget_project", self.what_if.axis_values("budget_project", self.project, n=12)),
+            ("num_saudi_employees", self.what_if.axis_values("num_saudi_employees", self.project, n=8)),
+        ]
+        grid = self.what_if.what_if_grid(self.project, axes)
+        expected = self.expected_grid(axes)
+
+        probabilities = np.ravel(grid["probability"])
+        np.testing.assert_allclose(probabilities, [e["probability"] for e in expected], rtol=0, atol=1e-12)
+        self.assertEqual(np.ravel(grid["threshold"]).tolist(), [e["threshold"] for e in expected])
+        self.assertEqual(np.ravel(grid["label"]).tolist(), [e["label"] for e in expected])
+
+    def test_pandas_fallback_matches_mapper(self):
+        from sklearn.preprocessing import FunctionTransformer
+
+        axes = [("project_duration_days", [30, 365, 900]), ("economic_indicator", [1, 2, 3])]
+        expected = self.what_if.what_if_grid(self.project, axes)
+
+        identity = Pipeline([("preprocess", FunctionTransformer()), ("model", PIPELINE)])
+        with using_model(identity):
+            grid = self.what_if.what_if_grid(self.project, axes)
+
+        np.testing.assert_allclose(grid["probability"], expected["probability"], rtol=0, atol=1e-12)
+
+    def test_2500_points_in_one_call(self):
+        axes = [
+            ("budget_project", self.what_if.axis_values("budget_project", self.project, n=50)),
+            ("project_duration_days", self.what_if.axis_values("project_duration_days", self.project, n=50)),
+        ]
+        start = time.perf_counter()
+        grid = self.what_if.what_if_grid(self.project, axes)
+
+        self.assertLess(time.perf_counter() - start, 1.0)
+        self.assertEqual(np.shape(grid["probability"]), (50, 50))
+
+    def test_rejects_unknown_axis(self):
+        with self.assertRaises(ValueError):
+            self.what_if.axis_values("description", self.project)
+
+
+class MonteCarloTest(SimpleTestCase):
+
+    def setUp(self):
+        from ai.services import monte_carlo, prediction_cache
+
+        self.feasibility = import_feasibility()
+        self.monte_carlo = monte_carlo
+        self.project = make_projects(n=3)[1]
+        self.ranges = {"budget_project": (50000, 400000), "project_duration_days": (90, 720)}
+        for patcher in (
+            using_model(PIPELINE),
+            using_cache(),
+            mock.patch.object(monte_carlo, "cache", prediction_cache.PredictionCache(16)),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_summary_matches_predict_projects(self):
+        summary = self.monte_carlo.simulate(self.project, self.ranges, n=300, seed=3, time_budget_ms=60000)
+        columns = self.monte_carlo.sample_inputs(self.project, self.ranges, 300, seed=3)
+
+        rows = [dict(self.project, budget_project=b, project_duration_days=d)
+                for b, d in zip(columns["budget_project"], columns["project_duration_days"])]
+        expected = self.feasibility.predict_projects(rows)
+        probabilities = np.array([e["probability"] for e in expected])
+
+        self.assertEqual(summary["samples"], 300)
+        self.assertFalse(summary["truncated"])
+        self.assertTrue(np.all(columns["project_duration_days"] % 30 == 0))
+        self.assertTrue(np.all((columns["budget_project"] >= 50000) & (columns["budget_project"] <= 400000)))
+        self.assertAlmostEqual(summary["mean"], probabilities.mean(), places=4)
+        self.assertAlmostEqual(summary["pass_rate"], np.mean([e["label"] for e in expected]))
+        self.assertEqual(sum(summary["histogram"]["counts"]), 300)
+
+    def test_cached_by_inputs_ranges_and_version(self):
+        first = self.monte_carlo.simulate(self.project, self.ranges, n=200)
+        again = self.monte_carlo.simulate(dict(self.project), self.ranges, n=200)
+        self.assertFalse(first["cached"])
+        self.assertTrue(again["cached"])
+        self.assertEqual(again["mean"], first["mean"])
+
+        wider = dict(self.ranges, num_saudi_employees=(0, 20))
+        self.assertFalse(self.monte_carlo.simulate(self.project, wider, n=200)["cached"])
+        with using_model(PIPELINE, version="v2"):
+            self.assertFalse(self.monte_carlo.simulate(self.project, self.ranges, n=200)["cached"])
+
+    def test_time_budget_stops_after_the_first_chunk(self):
+        summary = self.monte_carlo.simulate(self.project, self.ranges, n=2000, time_budget_ms=0)
+
+        self.assertTrue(summary["truncated"])
+        self.assertEqual(summary["samples"], self.monte_carlo.CHUNK_SIZE)
+        self.assertEqual(summary["requested"], 2000)
+
+    def test_rejects_bad_ranges(self):
+        with self.assertRaises(ValueError):
+            self.monte_carlo.simulate(self.project, {"budget_project": (500, 100)})
+        with self.assertRaises(ValueError):
+            self.monte_carlo.simulate(self.project, {"region_project": (0, 1)})
+
+
+class PlacementTest(TestCase):
+
+    def setUp(self):
+        from ai.services import placement
+
+        self.feasibility = import_feasibility()
+        self.placement = placement
+        self.project = make_projects(n=3)[1]
+
+    def test_ranking_matches_predict_projects(self):
+        from JADWA_AI.models import Projects
+
+        with using_cache(), using_model(PIPELINE):
+            # The reference tables are read once, not per cell
+            with self.assertNumQueries(2):
+                ranked = self.placement.rank_placements(self.project, city="jeddah")
+            cells = self.placement.placement_cells("jeddah")
+            expected = self.feasibility.predict_projects(
+                [self.placement.cell_inputs(self.project, *cell) for cell in cells]
+            )
+
+        placements = ranked["placements"]
+        regions = [key for key, _ in Projects.REGION_CHOICES if key not in ("", "other")]
+        self.assertEqual(len(placements), len(regions) * len(Projects.PROJECT_TYPE_CHOICES))
+        self.assertIn(("makkah", "jeddah", "Service"), cells)
+
+        by_cell = {(c["region"], c["type"]): c for c in placements}
+        for (region, _, project_type), e in zip(cells, expected):
+            self.assertAlmostEqual(by_cell[(region, project_type)]["probability"], e["probability"], places=12)
+            self.assertEqual(by_cell[(region, project_type)]["label"], e["label"])
+
+        probabilities = [c["probability"] for c in placements]
+        self.assertEqual(probabilities, sorted(probabilities, reverse=True))
+        self.assertEqual([c["rank"] for c in placements], list(range(1, len(placements) + 1)))
+
+    def test_loaded_reference_tables_match_per_cell_lookups(self):
+        from io import StringIO
+
+        from django.core.management import call_command
+
+        from JADWA_AI.fill_economic_indicator import region_indicator
+        from JADWA_AI.models import Projects
+        from JADWA_AI.num_similar_enterprises import get_similar_enterprises
+
+        call_command("load_reference_data", stdout=StringIO())
+        with using_cache(), using_model(PIPELINE), self.assertNumQueries(2):
+            ranked = self.placement.rank_placements(self.project, city="jeddah")
+
+        for cell in ranked["placements"]:
+            location, project_location = Projects.dataset_location(cell["region"], cell["city"])
+            level = Projects.economic_level(region_indicator(location))
+            self.assertEqual(cell["economic_indicator"], self.placement.ECONOMIC_LEVELS.get(level, 2))
+            self.assertEqual(cell["num_of_similar_enterprises"], get_similar_enterprises(cell["type"], project_location))
+
+
+class PartialDependenceTest(SimpleTestCase):
+
+    def setUp(self):
+        from ai.services import partial_dependence
+
+        self.feasibility = import_feasibility()
+        self.pd = partial_dependence
+        self.rows = make_projects(n=40)
+        self.loaded = self.feasibility.make_loaded(PIPELINE, FEATURE_COLUMNS, "test")
+
+    def test_curve_is_the_mean_over_rows(self):
+        from sklearn.preprocessing import FunctionTransformer
+
+        values = [30.0, 180.0, 720.0]
+        c = self.pd.curve(self.loaded, self.rows, "project_duration_days", values)
+
+        with using_cache(), using_model(PIPELINE):
+            for i, v in enumerate(values):
+                predicted = self.feasibility.predict_projects([dict(r, project_duration_days=v) for r in self.rows])
+                self.assertAlmostEqual(c["mean"][i], np.mean([p["probability"] for p in predicted]), places=5)
+
+        identity = Pipeline([("preprocess", FunctionTransformer()), ("model", PIPELINE)])
+        fallback = self.feasibility.make_loaded(identity, FEATURE_COLUMNS, "test")
+        budget_values = self.pd.grid_values("budget_project", self.rows, n=5)
+        np.testing.assert_allclose(
+            self.pd.curve(fallback, self.rows, "budget_project", budget_values)["mean"],
+            self.pd.curve(self.loaded, self.rows, "budget_project", budget_values)["mean"],
+            rtol=0, atol=1e-6,
+        )
+
+    def test_saved_curves_are_served_per_version(self):
+        import tempfile
+
+        with tempfile.TemporaryDirectory() as tmp, mock.patch.object(self.pd, "CURVES_DIR", tmp):
+            self.assertIsNone(self.pd.load_curves("test"))
+
+            curves = self.pd.compute(self.loaded, self.rows, grid_points=10)
+            self.pd.save("test", curves, {"rows": len(self.rows)})
+            stored = self.pd.load_curves("test")
+
+            self.assertEqual(set(stored["curves"]), set(self.pd.FEATURES))
+            self.assertEqual(stored["meta"]["rows"], len(self.rows))
+            self.assertEqual(stored["curves"]["economic_indicator"]["values"], [1.0, 2.0, 3.0])
+            np.testing.assert_allclose(stored["curves"]["budget_project"]["mean"], curves["budget_project"]["mean"])
+            self.assertIs(self.pd.load_curves("test"), stored)
+            self.assertIsNone(self.pd.load_curves("other"))
+
+
+class DriftStatsTest(SimpleTestCase):
+
+    def test_merged_batches_equal_one_pass(self):
+        from ai.services import drift
+
+        rng = np.random.RandomState(0)
+        values = rng.lognormal(12, 1, 500)
+        edges = np.quantile(values, [0.2, 0.4, 0.6, 0.8]).tolist()
+
+        merged = {"count": 0}
+        for batch in np.array_split(values, 7):
+            merged = drift.merge(merged, drift.summarize(batch, edges))
+        whole = drift.summarize(values, edges)
+
+        self.assertEqual(merged["counts"], whole["counts"])
+        self.assertEqual(merged["count"], 500)
+        self.assertAlmostEqual(merged["mean"], whole["mean"], places=6)
+        self.assertAlmostEqual(merged["m2"] / whole["m2"], 1.0, places=9)
+        self.assertEqual((merged["min_value"], merged["max_value"]), (whole["min_value"], whole["max_value"]))
+
+        self.assertLess(drift.psi(whole["counts"], whole["counts"]), 1e-9)
+        self.assertEqual(drift.status(drift.psi([100, 100, 100], [10, 10, 280])), "significant")
+
+    def test_sample_of_the_reference_is_stable(self):
+        from ai.services import drift, training
+
+        frame, _ = training.clean_dataset(pd.read_csv(training.DATASET_PATH))
+        frame["budget_project"] = np.expm1(frame["budget_project"])
+        sample = frame.sample(800, random_state=0).to_dict("records")
+
+        ref = drift.reference()
+        rows = np.asarray([drift.feature_values(p) for p in sample])
+        live = {
+            feature: dict(drift.summarize(rows[:, i], ref[feature]["edges"]), edges=ref[feature]["edges"])
+            for i, feature in enumerate(drift.FEATURES)
+        }
+        scores = drift.drift_scores(live, ref)
+
+        self.assertEqual(sorted(scores), sorted(drift.FEATURES))
+        self.assertEqual({f: s["status"] for f, s in scores.items()}, {f: "stable" for f in drift.FEATURES})
+
+        # A constant reference (e.g. an empty CSV column) reads as drift for any live value
+        for feature in drift.FEATURES:
+            self.assertGreater(ref[feature]["max_value"], ref[feature]["min_value"], feature)
+
+    def test_timer_flushes_a_quiet_buffer(self):
+        from ai.services import drift
+
+        buffer = drift.DriftBuffer(flush_size=1000, flush_seconds=0.05)
+        with mock.patch.object(drift, "write") as write:
+            buffer.record({"budget_project": 250000})
+            deadline = time.monotonic() + 5
+            while not write.called and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+        write.assert_called_once()
+        self.assertEqual(len(write.call_args[0][0]), 1)
+        self.assertEqual(buffer.pending(), 0)
+
+    def test_reference_does_not_import_sklearn(self):
+        import os
+        import subprocess
+        import sys
+
+        from django.conf import settings
+
+        # Web workers build the reference on their first flush
+        code = (
+            "import sys, django; django.setup(); from ai.services import drift; drift.reference(); "
+            "print(any(name.split('.')[0] == 'sklearn' for name in sys.modules))"
+        )
+        out = subprocess.run(
+            [sys.executable, "-c", code], cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+            env=dict(os.environ, DJANGO_SETTINGS_MODULE="JadwaAI.settings"),
+        )
+        self.assertEqual(out.stdout.strip(), "False")
+
+class CounterfactualTest(SimpleTestCase):
+
+    def setUp(self):
+        from ai.services.counterfactual import find_counterfactuals
+
+        self.feasibility = import_feasibility()
+        self.find = find_counterfactuals
+        for patcher in (using_model(PIPELINE), using_cache()):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def infeasible_projects(self):
+        projects = make_projects(n=40, seed=4)
+        return [p for p in projects if not self.feasibility.predict_project(p)["label"]]
+
+    def test_changes_flip_the_decision(self):
+        found = 0
+        for project in self.infeasible_projects():
+            result = self.find(project)
+            self.assertFalse(result["feasible"])
+
+            for change in result["changes"]:
+                found += 1
+                changed = dict(project, **{change["feature"]: change["to"]})
+                prediction = self.feasibility.predict_project(changed)
+                self.assertEqual(prediction["label"], 1)
+                self.assertAlmostEqual(prediction["probability"], change["probability"], places=12)
+
+        self.assertGreater(found, 0)
+
+    def test_employee_change_is_the_smallest(self):
+        for project in self.infeasible_projects()[:5]:
+            change = next((c for c in self.find(project)["changes"] if c["feature"] == "num_saudi_employees"), None)
+            if change is None:
+                continue
+
+            current = project["num_saudi_employees"]
+            closer = [n for n in range(0, 101) if abs(n - current) < abs(change["to"] - current)]
+            labels = [p["label"] for p in self.feasibility.predict_projects(
+                [dict(project, num_saudi_employees=n) for n in closer]
+            )]
+            self.assertNotIn(1, labels)
+
+    def test_feasible_project_needs_no_change(self):
+        projects = make_projects(n=40, seed=4)
+        feasible = next(p for p in projects if self.feasibility.predict_project(p)["label"])
+
+        result = self.find(feasible)
+        self.assertTrue(result["feasible"])
+        self.assertEqual(result["changes"], [])
+
+
+class ContributionsTest(SimpleTestCase):
+
+    def setUp(self):
+        from ai.services.contributions import ContributionTable
+
+        self.feasibility = import_feasibility()
+        self.table = ContributionTable.from_model(PIPELINE, FEATURE_COLUMNS)
+        self.projects = make_projects()
+        self.x = self.table.forest.mapper.transform_many(self.projects)
+
+    def test_contributions_add_up_to_the_prediction(self):
+        raw, contributions = self.table.explain_matrix(self.x)
+
+        np.testing.assert_allclose(raw, PIPELINE[-1].predict_proba(self.x)[:, 1], rtol=0, atol=1e-6)
+        np.testing.assert_allclose(self.table.bias + contributions.sum(axis=1), raw, rtol=0, atol=1e-12)
+
+    def test_matches_path_walk_through_sklearn_trees(self):
+        output_columns = self.table.forest.mapper.output_columns()
+        expected = np.zeros((5, len(self.table.columns)))
+
+        for tree in PIPELINE[-1].estimators_:
+            t = tree.tree_
+            value = t.value[:, 0, 1] / t.value[:, 0, :].sum(axis=1)
+            paths = tree.decision_path(self.x[:5])
+            for row in range(5):
+                nodes = paths.indices[paths.indptr[row]:paths.indptr[row + 1]]
+                for parent, child in zip(nodes[:-1], nodes[1:]):
+                    column = self.table.columns.index(output_columns[t.feature[parent]])
+                    expected[row, column] += (value[child] - value[parent]) / len(PIPELINE[-1].estimators_)
+
+        _, contributions = self.table.explain_matrix(self.x[:5])
+        np.testing.assert_allclose(contributions, expected, rtol=0, atol=1e-6)
+
+    def test_explain_projects_includes_budget_adjustment(self):
+        with using_cache(), using_model(PIPELINE):
+            explained = self.feasibility.explain_projects(self.projects)
+            predicted = self.feasibility.predict_projects(self.projects)
+
+        for e, p in zip(explained, predicted):
+            total = e["bias"] + sum(e["values"].values()) + e["adjustment"]
+            self.assertAlmostEqual(total, p["probability"], places=4)
+
+    def test_drivers_reach_the_prompt(self):
+        from ai.services.recommendations import build_prompt
+
+        with using_cache(), using_model(PIPELINE):
+            contributions = self.feasibility.explain_project(self.projects[0])
+            prediction = self.feasibility.predict_project(self.projects[0])
+
+        with mock.patch("builtins.print"):
+            prompt = build_prompt(self.projects[0], prediction, lang="en", contributions=contributions)
+            prompt_ar = build_prompt(self.projects[0], prediction, lang="ar", contributions=contributions)
+        self.assertIn("points (", prompt)
+        self.assertIn("نقطة", prompt_ar)
+
+
+class UncertaintyTest(SimpleTestCase):
+
+    def setUp(self):
+        self.feasibility = import_feasibility()
+        self.projects = make_projects()
+
+    def test_spread_matches_the_individual_trees(self):
+        with using_cache(), using_model(PIPELINE):
+            predicted = self.feasibility.predict_projects(self.projects[:5])
+
+        x = PIPELINE[:-1].transform(self.feasibility._pandas_features(self.projects[:5], FEATURE_COLUMNS))
+        votes = np.column_stack([tree.predict_proba(x)[:, 1] for tree in PIPELINE[-1].estimators_])
+
+        for project, row, p in zip(self.projects, votes, predicted):
+            budgets = np.full(len(row), project["budget_project"])
+            adjusted = self.feasibility.adjust_probabilities(row, budgets)
+            feasible = p["probability"] >= p["threshold"]
+            u = p["uncertainty"]
+
+            self.assertEqual(u["trees"], len(PIPELINE[-1].estimators_))
+            self.assertAlmostEqual(u["std"], row.std(), places=4)
+            self.assertAlmostEqual(u["agreement"], ((adjusted >= p["threshold"]) == feasible).mean(), places=4)
+            self.assertLessEqual(u["low"], u["high"])
+
+    def test_threaded_votes_match_serial_votes(self):
+        x = PIPELINE[:-1].transform(self.feasibility._pandas_features(self.projects, FEATURE_COLUMNS))
+        forest = PIPELINE[-1]
+
+        serial = self.feasibility._forest_votes(forest, x, n_jobs=1)
+        np.testing.assert_array_equal(self.feasibility._forest_votes(forest, x, n_jobs=3), serial)
+        np.testing.assert_allclose(serial.mean(axis=1), forest.predict_proba(x)[:, 1])
+
+    def test_borderline_result_reaches_the_prompt(self):
+        from ai.services.recommendations import build_prompt
+
+        with using_cache(), using_model(PIPELINE):
+            prediction = self.feasibility.predict_project(self.projects[0])
+        prediction["uncertainty"] = dict(prediction["uncertainty"], agreement=0.55, low_confidence=True)
+
+        with mock.patch("builtins.print"):
+            prompt = build_prompt(self.projects[0], prediction, lang="en")
+            prompt_ar = build_prompt(self.projects[0], prediction, lang="ar")
+        self.assertIn("55% of", prompt)
+        self.assertIn("borderline result", prompt)
+        self.assertIn("النتيجة حدّية", prompt_ar)
+
+
+class InferenceBackendTest(SimpleTestCase):
+
+    def test_micro_batcher_coalesces_concurrent_requests(self):
+        import threading
+        from ai.services.inference_backend import MicroBatcher
+
+        seen = []
+        release = threading.Event()
+
+        def run_batch(project_dicts, explain, on_done, on_error):
+            seen.append(len(project_dicts))
+            release.wait(5)
+            on_done([{"id": d["id"], "contributions": {}} for d in project_dicts])
+
+        batcher = MicroBatcher(run_batch, window_ms=5, slots=1)
+        first = batcher.submit([{"id": 0}])
+        time.sleep(0.05)  # the first batch is now holding the only slot
+        futures = [batcher.submit([{"id": i}], explain=bool(i % 2)) for i in range(1, 11)]
+        release.set()
+
+        self.assertEqual(first.result(5), [{"id": 0}])
+        for i, future in enumerate(futures, start=1):
+            expected = {"id": i, "contributions": {}} if i % 2 else {"id": i}
+            self.assertEqual(future.result(5), [expected])
+        self.assertEqual(seen, [1, 10])
+
+    def test_micro_batcher_propagates_errors(self):
+        from ai.services.inference_backend import MicroBatcher
+
+        def run_batch(project_dicts, explain, on_done, on_error):
+            raise ValueError("boom")
+
+        future = MicroBatcher(run_batch, window_ms=1).submit([{}])
+        with self.assertRaises(ValueError):
+            future.result(5)
+
+    def test_process_pool_matches_in_process(self):
+        from ai.services.inference_backend import InProcessBackend, ProcessPoolBackend
+
+        projects = make_projects(n=20)
+        with using_cache(), using_model(PIPELINE):
+            expected = InProcessBackend().predict_projects(projects, explain=True)
+
+            # fork, so the worker inherits the patched test model
+            backend = ProcessPoolBackend(workers=1, start_method="fork")
+            self.addCleanup(backend.close)
+            got = backend.predict_projects(projects, explain=True)
+            version = backend.call("model_version")
+
+        self.assertEqual(got, expected)
+        self.assertEqual(version, "test")
+
+    def test_socket_server_matches_in_process(self):
+        import os
+        import tempfile
+        import threading
+        from ai.services.inference_backend import InProcessBackend, SocketBackend
+        from ai.services.inference_server import InferenceService, InferenceSocketServer
+
+        path = os.path.join(tempfile.mkdtemp(), "inference.sock")
+        projects = make_projects(n=30)
+        with using_cache(), using_model(PIPELINE):
+            expected = InProcessBackend().predict_projects(projects, explain=True)
+
+            server = InferenceSocketServer(path, InferenceService(window_ms=1))
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            self.addCleanup(server.server_close)
+            self.addCleanup(server.shutdown)
+
+            client = SocketBackend(path)
+            self.addCleanup(client.close)
+            got = client.predict_projects(projects, explain=True)
+            plain = client.predict_projects(projects[:1])[0]
+
+            axes = [{"feature": "budget_project", "n": 5}, {"feature": "num_saudi_employees", "n": 4}]
+            grid = client.call("what_if", project_dict=projects[0], axes=axes)
+            expected_grid = InProcessBackend().call("what_if", project_dict=projects[0], axes=axes)
+            with self.assertRaisesMessage(ValueError, "Unsupported axis: bogus"):
+                client.call("what_if", project_dict=projects[0], axes=[{"feature": "bogus"}])
+
+            health = client.health()
+            metrics = client.metrics()
+
+        self.assertEqual([r["label"] for r in got], [r["label"] for r in expected])
+        for g, e in zip(got, expected):
+            self.assertAlmostEqual(g["probability"], e["probability"], places=12)
+            self.assertEqual(g["contributions"], e["contributions"])
+            self.assertEqual(g["uncertainty"], e["uncertainty"])
+        self.assertNotIn("contributions", plain)
+        self.assertEqual(health["status"], "ok")
+        self.assertEqual(health["model_version"], "test")
+        self.assertEqual(grid, expected_grid)
+        self.assertEqual((metrics["requests"], metrics["rows"], metrics["calls"]), (2, 31, 1))
+        self.assertEqual(metrics["errors"], 1)
+
+    def test_protocol_round_trip(self):
+        from ai.services import inference_protocol as proto
+
+        projects = make_projects(n=8)
+        decoded = proto.unpack_projects(proto.pack_projects(projects), len(projects))
+        for original, d in zip(projects, decoded):
+            for field in proto.NUMERIC_FIELDS:
+                self.assertEqual(d.get(field), original.get(field))
+            self.assertEqual(d["region_project"], original["region_project"])
+
+        with self.assertRaises(proto.ProtocolError):
+            proto.unpack_header(b"XXXX" + bytes(8))
+
+
+class TrainingTest(SimpleTestCase):
+
+    def setUp(self):
+        import os
+        import tempfile
+        from ai.services import training
+
+        tmp = tempfile.mkdtemp()
+        x, y = make_training_frame(n=300)
+        pd.DataFrame({
+            "name_project": [f"p{i}" for i in range(len(y))],
+            "sectors": x["type_project"],
+            "region_project": x["region_project"],
+            "budget_project": np.expm1(x["budget_project"]),
+            "project_duration_days": x["project_duration_days"],
+            "عدد المنشآت": x["num_enterprises"],
+            "عدد العاملين السعوديين": x["num_saudi_employees"],
+            "economic_indicator": x["economic_indicator"],
+            "project_success": y,
+        }).to_csv(os.path.join(tmp, "dataset.csv"), index=False)
+
+        self.csv = os.path.join(tmp, "dataset.csv")
+        patcher = mock.patch.object(training, "CACHE_DIR", os.path.join(tmp, "cache"))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_encoded_matrix_is_cached_by_dataset_hash(self):
+        from ai.services import training
+
+        first = training.load_training_data(self.csv)
+        second = training.load_training_data(self.csv)
+        self.assertEqual((first["cached"], second["cached"]), (False, True))
+        np.testing.assert_array_equal(first["x"], second["x"])
+
+        with open(self.csv, "a") as f:
+            f.write("extra,Service,\"riyadh, riyadh\",1000,30,1,1,2,0\n")
+        self.assertFalse(training.load_training_data(self.csv)["cached"])
+
+    def test_trained_pipeline_serves_predictions(self):
+        from ai.services import training
+        from ai.services.compiled_forest import CompiledForest
+
+        data = training.load_training_data(self.csv)
+        grid, _ = training.search(data, {"n_estimators": [10], "max_depth": [4, 8]}, cv=3, n_jobs=1)
+        self.assertIn("cv_roc_auc", training.cv_metrics(grid))
+
+        pipeline = training.build_pipeline(data, grid.best_estimator_)
+        projects = make_projects(n=20)
+        with using_cache(), using_model(pipeline):
+            expected = import_feasibility().predict_projects(projects)
+
+        compiled = CompiledForest.from_pipeline(pipeline, training.FEATURE_COLUMNS)
+        with using_cache(), using_model(compiled):
+            got = import_feasibility().predict_projects(projects)
+
+        for e, g in zip(expected, got):
+            self.assertAlmostEqual(e["probability"], g["probability"], places=6)
+
+
+class ForestCompressionTest(SimpleTestCase):
+
+    def setUp(self):
+        from ai.services.compiled_forest import CompiledForest
+
+        self.compiled = CompiledForest.from_pipeline(PIPELINE, FEATURE_COLUMNS)
+        self.x = self.compiled.mapper.transform_many(make_projects(n=200))
+
+    def test_fewer_trees_is_the_mean_of_the_kept_trees(self):
+        from ai.services import forest_compression
+
+        variant = forest_compression.select_trees(self.compiled, 5)
+        np.testing.assert_allclose(
+            variant.predict_proba(self.x)[:, 1],
+            self.compiled.tree_votes(self.x)[:, :5].mean(axis=1),
+            rtol=0,
+            atol=1e-6,
+        )
+
+        distilled = forest_compression.select_trees(self.compiled, 5, x=self.x)
+        full = self.compiled.predict_proba(self.x)[:, 1]
+        self.assertLessEqual(
+            np.abs(distilled.predict_proba(self.x)[:, 1] - full).mean(),
+            np.abs(variant.predict_proba(self.x)[:, 1] - full).mean(),
+        )
+
+    def test_depth_cap_stops_at_the_depth_limit_ancestor(self):
+        from ai.services import forest_compression
+
+        capped = forest_compression.cap_depth(self.compiled, 3)
+        self.assertEqual(capped.max_depth, 3)
+        self.assertLess(len(capped.value), len(self.compiled.value))
+
+        # A node's value is the class-1 share at that node, so stopping at
+        # depth 3 gives what each tree's depth-3 ancestor holds
+        depths = forest_compression.node_depths(self.compiled)
+        leaves = self.compiled.apply(self.x[:20])
+        for row, nodes in enumerate(leaves):
+            for tree, node in enumerate(nodes):
+                root = self.compiled.roots[tree]
+                path = [root]
+                while path[-1] != node:
+                    current = path[-1]
+                    go_left = self.x[row, self.compiled.feature[current]] <= self.compiled.threshold[current]
+                    path.append(self.compiled.left[current] if go_left else self.compiled.right[current])
+                expected = self.compiled.value[[n for n in path if depths[n] <= 3][-1]]
+                self.assertAlmostEqual(capped.tree_votes(self.x[row:row + 1])[0, tree], expected)
+
+    def test_exact_leaf_merge_keeps_predictions(self):
+        from ai.services import feasibility, forest_compression
+
+        merged = forest_compression.merge_leaves(self.compiled, 0.0)
+        np.testing.assert_array_equal(merged.predict_proba(self.x), self.compiled.predict_proba(self.x))
+
+        variant = forest_compression.compress(self.compiled, n_trees=10, max_depth=5, merge_tolerance=0.05)
+        budgets = np.full(len(self.x), 250000.0)
+        metrics = forest_compression.evaluate(variant, self.compiled, self.x, np.arange(len(self.x)) % 2, budgets)
+        self.assertEqual(metrics["trees"], 10)
+        self.assertLessEqual(metrics["max_depth"], 5)
+
+        loaded = feasibility.make_loaded(variant, FEATURE_COLUMNS, "compact")
+        raw, contributions = loaded.explainer.explain_matrix(self.x)
+        np.testing.assert_allclose(raw, variant.predict_proba(self.x)[:, 1], atol=1e-5)
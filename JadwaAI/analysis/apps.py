@@ -1,6 +1,40 @@
+import os
+import sys
+
 from django.apps import AppConfig
 
 
+def _serving() -> bool:
+    """True in the process that will serve runserver's requests."""
+    if len(sys.argv) < 2 or sys.argv[1] != "runserver":
+        return False
+    # With the autoreloader, requests are served by the child it restarts
+    return os.environ.get("RUN_MAIN") == "true" or "--noreload" in sys.argv
+
+
+def warm_model(default="1"):
+    """
+    Load the model now instead of on the first request. JADWA_WARM_MODEL
+    forces it on (1) or off (0); `default` applies when it is unset.
+    """
+    if os.getenv("JADWA_WARM_MODEL", default) != "1":
+        return None
+
+    # Other backends score outside this process
+    from ai.services.inference_backend import BACKEND
+    if BACKEND != "inprocess":
+        return None
+
+    from ai.services.feasibility import warm_up
+    return warm_up()
+
+
 class AnalysisConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'analysis'
+
+    def ready(self):
+        # Only server processes warm up: runserver here, gunicorn in its
+        # hooks (gunicorn.conf.py). migrate, test, shell and the other
+        # management commands load the model only if they use it.
+        warm_model(default="1" if _serving() else "0")
@@ -0,0 +1,173 @@
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from ai.services import feasibility, prediction_cache
+from ai.services.analyzer import analyze_project
+from ai.services.memory import children_peak_rss_mb, format_mb, peak_rss_mb, rss_mb
+from ai.services.synthetic_projects import synthetic_projects
+
+
+def _summary(timings_ms, rows, wall_s) -> dict:
+    t = np.asarray(timings_ms)
+    return {
+        "calls": int(t.size),
+        "rows": int(rows),
+        "p50_ms": float(np.percentile(t, 50)),
+        "p95_ms": float(np.percentile(t, 95)),
+        "p99_ms": float(np.percentile(t, 99)),
+        "mean_ms": float(t.mean()),
+        "throughput_rows_s": rows / wall_s if wall_s else 0.0,
+    }
+
+
+def _timed(fn, items):
+    timings = []
+    start = time.perf_counter()
+    for item in items:
+        t0 = time.perf_counter()
+        fn(item)
+        timings.append((time.perf_counter() - t0) * 1000)
+    return timings, time.perf_counter() - start
+
+
+def _worker_init():
+    # The benchmark measures inference, not the cache
+    prediction_cache.cache = prediction_cache.PredictionCache(maxsize=0)
+    feasibility.get_loaded()
+
+
+def _worker_batch(projects):
+    t0 = time.perf_counter()
+    feasibility.predict_projects(projects)
+    return (time.perf_counter() - t0) * 1000
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=settings.BASE_DIR, stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+class Command(BaseCommand):
+    help = "Measure predict_project / analyze_project latency and throughput on synthetic projects."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--projects", type=int, default=2000, help="Synthetic projects to generate")
+        parser.add_argument("--single", type=int, default=500, help="Calls for the one-project benchmarks")
+        parser.add_argument("--batch-size", type=int, default=64)
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--with-cache", action="store_true", help="Leave the prediction cache enabled")
+        parser.add_argument("--output", help="JSON file for the results (default: bench_inference_<commit>.json)")
+        parser.add_argument("--compare", help="Earlier results JSON to compare against")
+
+    def handle(self, *args, **options):
+        if not options["with_cache"]:
+            prediction_cache.cache = prediction_cache.PredictionCache(maxsize=0)
+
+        projects = synthetic_projects(options["projects"], seed=options["seed"])
+        singles = [projects[i % len(projects)] for i in range(options["single"])]
+        batch_size = options["batch_size"]
+        batches = [projects[i:i + batch_size] for i in range(0, len(projects), batch_size)]
+
+        rss_before = rss_mb()
+        load_start = time.perf_counter()
+        loaded = feasibility.get_loaded()
+        load_ms = (time.perf_counter() - load_start) * 1000
+
+        # Warm-up: first calls pay for imports and lazy allocations
+        feasibility.predict_projects(projects[:batch_size])
+        analyze_project(projects[0], include_recommendations=False)
+
+        results = {}
+
+        timings, wall = _timed(feasibility.predict_project, singles)
+        results["single"] = _summary(timings, len(singles), wall)
+
+        timings, wall = _timed(lambda p: analyze_project(p, include_recommendations=False), singles)
+        results["analyze"] = _summary(timings, len(singles), wall)
+
+        timings, wall = _timed(feasibility.predict_projects, batches)
+        results["batch"] = _summary(timings, len(projects), wall)
+        results["batch"]["batch_size"] = batch_size
+
+        parent_peak = peak_rss_mb()
+
+        # fork shares the already loaded model with the workers
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("fork" if "fork" in methods else "spawn")
+        with ProcessPoolExecutor(options["workers"], mp_context=context, initializer=_worker_init) as pool:
+            list(pool.map(_worker_batch, batches[:options["workers"]]))
+            start = time.perf_counter()
+            timings = list(pool.map(_worker_batch, batches))
+            wall = time.perf_counter() - start
+        results["multiprocess"] = _summary(timings, len(projects), wall)
+        results["multiprocess"].update(batch_size=batch_size, workers=options["workers"])
+
+        report = {
+            "meta": {
+                "commit": _git_commit(),
+                "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                "model_version": loaded.version,
+                "model": type(loaded.model).__name__,
+                "feature_path": feasibility.FEATURE_PATH,
+                "cache": options["with_cache"],
+                "projects": len(projects),
+                "seed": options["seed"],
+                "python": platform.python_version(),
+                "numpy": np.__version__,
+                "cpu_count": os.cpu_count(),
+            },
+            "memory": {
+                "rss_before_load_mb": rss_before,
+                "load_ms": load_ms,
+                "peak_rss_mb": parent_peak,
+                "worker_peak_rss_mb": children_peak_rss_mb(),
+            },
+            "results": results,
+        }
+
+        output = options["output"] or f"bench_inference_{report['meta']['commit']}.json"
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+        previous = None
+        if options["compare"]:
+            with open(options["compare"], encoding="utf-8") as f:
+                previous = json.load(f)
+
+        self._print(report, previous)
+        self.stdout.write(f"Saved {output}")
+
+    def _print(self, report, previous=None):
+        meta, memory = report["meta"], report["memory"]
+        self.stdout.write(
+            f"Model {meta['model_version']} ({meta['model']}), commit {meta['commit']}, "
+            f"load {memory['load_ms']:.0f} ms, peak RSS {format_mb(memory['peak_rss_mb'])} MB "
+            f"(workers {format_mb(memory['worker_peak_rss_mb'])} MB)"
+        )
+
+        for name, r in report["results"].items():
+            line = (
+                f"{name:>12}: p50 {r['p50_ms']:8.3f} ms | p95 {r['p95_ms']:8.3f} ms | "
+                f"p99 {r['p99_ms']:8.3f} ms | {r['throughput_rows_s']:10.0f} rows/s"
+            )
+            old = (previous or {}).get("results", {}).get(name)
+            if old:
+                line += (
+                    f" | p50 x{r['p50_ms'] / old['p50_ms']:.2f}, "
+                    f"throughput x{r['throughput_rows_s'] / old['throughput_rows_s']:.2f} vs {previous['meta']['commit']}"
+                )
+            self.stdout.write(line)
@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from JADWA_AI import dataset_cache
+
+
+class Command(BaseCommand):
+    help = (
+        "Convert the reference dataset CSV into the columnar binary cache that the "
+        "similar-enterprise and economic-indicator lookups load instead of the CSV."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dataset", default=dataset_cache.DATASET_PATH)
+        parser.add_argument("--output", help="Cache directory (default: JADWA_DATASET_CACHE_DIR/<dataset name>)")
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        out_dir = options["output"] or dataset_cache.cache_dir(options["dataset"])
+        manifest = dataset_cache.build(options["dataset"], out_dir)
+        elapsed = time.perf_counter() - start
+
+        for column in manifest["columns"]:
+            detail = f"{len(column['strings'])} keys" if column["kind"] == "text" else "numeric"
+            self.stdout.write(f"{column['name']:<28} {detail}")
+        self.stdout.write(
+            f"{manifest['rows']} rows, {len(manifest['columns'])} columns in {elapsed:.2f} s -> {out_dir}"
+        )
@@ -0,0 +1,122 @@
+import itertools
+import json
+
+import numpy as np
+import pandas as pd
+from django.core.management.base import BaseCommand, CommandError
+
+from ai.services import feasibility, forest_compression, model_registry, training
+from ai.services.compiled_forest import CompiledForest
+
+
+class Command(BaseCommand):
+    help = (
+        "Build smaller variants of a model (fewer trees, capped depth, merged leaves), "
+        "measure them against it on the dataset and publish the fastest one within "
+        "an agreement bound."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--model-version", help="Source version (default: the active one, else legacy)")
+        parser.add_argument("--dataset", default=training.DATASET_PATH)
+        parser.add_argument("--trees", type=int, nargs="+", default=[25, 50, 100])
+        parser.add_argument("--depths", type=int, nargs="+", default=[0, 10, 14], help="0 = no cap")
+        parser.add_argument("--merge-tolerances", type=float, nargs="+", default=[0.0, 0.02])
+        parser.add_argument("--min-agreement", type=float, default=0.99,
+                            help="Share of dataset decisions that must match the source model")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--output", help="Write every variant's metrics to this JSON file")
+        parser.add_argument("--publish", metavar="VERSION", nargs="?", const="",
+                            help="Publish the chosen variant (default name: <source>-compact)")
+        parser.add_argument("--activate", action="store_true")
+
+    def handle(self, *args, **options):
+        source = options["model_version"] or model_registry.active_version() or feasibility.LEGACY_VERSION
+        try:
+            loaded = feasibility.load_model(None if source == feasibility.LEGACY_VERSION else source)
+        except (model_registry.RegistryError, OSError) as e:
+            raise CommandError(f"Cannot load model {source}: {e}")
+
+        reference = loaded.model
+        if not isinstance(reference, CompiledForest):
+            try:
+                reference = CompiledForest.from_pipeline(reference, loaded.feature_columns)
+            except NotImplementedError as e:
+                raise CommandError(f"Cannot compile this pipeline: {e}")
+
+        # Trees are picked on one half of the dataset and judged on the other
+        frame, y = training.clean_dataset(pd.read_csv(options["dataset"]))
+        frame["budget_project"] = np.expm1(frame["budget_project"])
+        x = reference.mapper.transform_many(frame.to_dict("records"))
+        budgets = frame["budget_project"].to_numpy(dtype=np.float64)
+
+        order = np.random.RandomState(options["seed"]).permutation(len(y))
+        fit, held_out = order[: len(y) // 2], order[len(y) // 2:]
+        x_eval, y_eval, b_eval = x[held_out], y[held_out], budgets[held_out]
+
+        baseline = forest_compression.evaluate(reference, reference, x_eval, y_eval, b_eval)
+        self._row("source", baseline)
+
+        results = []
+        for n_trees, depth, tolerance in itertools.product(
+            options["trees"], options["depths"], options["merge_tolerances"]
+        ):
+            params = {"n_trees": n_trees, "max_depth": depth or None, "merge_tolerance": tolerance}
+            variant = forest_compression.compress(reference, x=x[fit], **params)
+            metrics = forest_compression.evaluate(variant, reference, x_eval, y_eval, b_eval)
+            results.append({"params": params, "metrics": metrics, "forest": variant})
+            self._row(f"{n_trees}t d{depth or '-'} m{tolerance:g}", metrics)
+
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as f:
+                json.dump({
+                    "source": source,
+                    "source_metrics": baseline,
+                    "variants": [{"params": r["params"], "metrics": r["metrics"]} for r in results],
+                }, f, indent=2)
+
+        best = forest_compression.best_variant(results, options["min_agreement"])
+        if best is None:
+            self.stdout.write(f"No variant reaches {options['min_agreement']:.2%} agreement")
+            return
+
+        m = best["metrics"]
+        self.stdout.write(
+            f"Chosen: {best['params']} -> {m['agreement']:.2%} agreement, "
+            f"{m['single_p50_ms']:.2f} ms vs {baseline['single_p50_ms']:.2f} ms, "
+            f"{m['forest_kb'] + m['contributions_kb']:.0f} KB vs "
+            f"{baseline['forest_kb'] + baseline['contributions_kb']:.0f} KB"
+        )
+
+        if options["publish"] is None:
+            return
+
+        version = options["publish"] or f"{source}-compact"
+        metadata = {
+            "source_version": source,
+            "compression": best["params"],
+            "min_agreement": options["min_agreement"],
+            "metrics": m,
+            "source_metrics": baseline,
+        }
+        try:
+            model_registry.publish(version, self._features_file(loaded), compiled=best["forest"], metadata=metadata)
+            self.stdout.write(f"Published {version}")
+            if options["activate"]:
+                model_registry.activate(version)
+                self.stdout.write(f"Active model is now {version}")
+        except model_registry.RegistryError as e:
+            raise CommandError(str(e))
+
+    def _features_file(self, loaded):
+        if loaded.version == feasibility.LEGACY_VERSION:
+            return feasibility.FEATURES_PATH
+        return model_registry.artifact_paths(loaded.version)["features"]
+
+    def _row(self, name, m):
+        self.stdout.write(
+            f"{name:<18} trees {m['trees']:>4} nodes {m['nodes']:>7} depth {m['max_depth']:>3} | "
+            f"acc {m['accuracy']:.4f} auc {m['auc']:.4f} agree {m['agreement']:.4f} | "
+            f"{m['single_p50_ms']:.2f} ms/row, {m['batch_ms']:.1f} ms/{m['batch_rows']} | "
+            f"{m['forest_kb']:.0f} KB + {m['contributions_kb']:.0f} KB explain"
+        )
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+
+from ai.services import drift, training
+from analysis.models import DriftReport, FeatureStats
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the inputs of analysed projects with the training dataset (PSI per input) "
+        "and store a drift report for the admin dashboard. Meant to run periodically."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dataset", default=training.DATASET_PATH)
+        parser.add_argument("--reset", action="store_true",
+                            help="Clear the running statistics after the report, starting a new window")
+
+    def handle(self, *args, **options):
+        ref = drift.reference(options["dataset"])
+        live = {
+            s.feature: {"edges": s.edges, "counts": s.counts, "count": s.count, "mean": s.mean, "m2": s.m2}
+            for s in FeatureStats.objects.all()
+        }
+        scores = drift.drift_scores(live, ref)
+        samples = max((s["count"] for s in scores.values()), default=0)
+
+        report = DriftReport.objects.create(
+            scores=scores,
+            samples=samples,
+            dataset_sha256=training.dataset_hash(options["dataset"]),
+        )
+
+        for feature, s in scores.items():
+            self.stdout.write(
+                f"{feature:<24} PSI {s['psi']:>7.4f} {s['status']:<11} "
+                f"mean {s['mean']:>12.1f} vs {s['reference_mean']:>12.1f} (n={s['count']})"
+            )
+        self.stdout.write(f"Report {report.id}: {len(scores)} inputs over {samples} projects")
+
+        if options["reset"]:
+            FeatureStats.objects.all().delete()
+            self.stdout.write("Running statistics cleared")
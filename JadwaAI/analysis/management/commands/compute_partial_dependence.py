@@ -0,0 +1,46 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ai.services import feasibility, model_registry, partial_dependence, training
+
+
+class Command(BaseCommand):
+    help = (
+        "Compute the partial-dependence curves of a model version over the dataset "
+        "and store them for the result page's explanation panel."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--model-version", help="Registry version (default: the active one, else legacy)")
+        parser.add_argument("--dataset", default=training.DATASET_PATH)
+        parser.add_argument("--rows", type=int, default=500, help="Background rows sampled from the dataset")
+        parser.add_argument("--grid-points", type=int, default=40)
+        parser.add_argument("--workers", type=int, default=0, help="Compute features in N processes")
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        version = options["model_version"] or model_registry.active_version() or feasibility.LEGACY_VERSION
+        try:
+            loaded = feasibility.load_model(None if version == feasibility.LEGACY_VERSION else version)
+        except (model_registry.RegistryError, OSError) as e:
+            raise CommandError(f"Cannot load model {version}: {e}")
+
+        start = time.perf_counter()
+        rows = partial_dependence.background_rows(options["dataset"], options["rows"], options["seed"])
+        curves = partial_dependence.compute(loaded, rows, options["grid_points"], options["workers"])
+        elapsed = time.perf_counter() - start
+
+        for feature, c in curves.items():
+            self.stdout.write(
+                f"{feature:<24} {len(c['values']):>3} points, "
+                f"mean probability {c['mean'].min():.3f}..{c['mean'].max():.3f}"
+            )
+
+        path = partial_dependence.save(version, curves, {
+            "dataset_sha256": training.dataset_hash(options["dataset"]),
+            "rows": len(rows),
+            "grid_points": options["grid_points"],
+            "seconds": round(elapsed, 3),
+        })
+        self.stdout.write(f"Model {version}: {len(curves)} curves over {len(rows)} rows in {elapsed:.1f} s -> {path}")
@@ -0,0 +1,46 @@
+import signal
+import threading
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ai.services import feasibility
+from ai.services.inference_backend import BATCH_WINDOW_MS, MAX_BATCH, SOCKET_PATH
+from ai.services.inference_server import InferenceService, InferenceSocketServer
+
+
+class Command(BaseCommand):
+    help = (
+        "Serve predict_project / predict_projects over a Unix socket. Point web "
+        "workers at it with JADWA_INFERENCE_BACKEND=socket."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--socket", default=SOCKET_PATH, help="Socket path (JADWA_INFERENCE_SOCKET)")
+        parser.add_argument("--window-ms", type=float, default=BATCH_WINDOW_MS, help="Micro-batch window")
+        parser.add_argument("--max-batch", type=int, default=MAX_BATCH)
+
+    def handle(self, *args, **options):
+        try:
+            loaded = feasibility.get_loaded()
+        except Exception as e:
+            raise CommandError(f"No model could be loaded: {e}")
+
+        service = InferenceService(window_ms=options["window_ms"], max_batch=options["max_batch"])
+        try:
+            server = InferenceSocketServer(options["socket"], service)
+        except OSError as e:
+            raise CommandError(str(e))
+
+        def stop(signum, frame):
+            # shutdown() waits for serve_forever, so it can't run on this thread
+            threading.Thread(target=server.shutdown).start()
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+
+        self.stdout.write(f"Inference server listening on {options['socket']} (model {loaded.version})")
+        try:
+            server.serve_forever()
+        finally:
+            server.server_close()
+        self.stdout.write(f"Served {service.requests} requests ({service.rows} projects)")
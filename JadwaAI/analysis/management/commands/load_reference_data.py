@@ -0,0 +1,99 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from JADWA_AI import dataset_cache, reference_stream
+from JADWA_AI.fill_economic_indicator import calculate_update_economic_indicator
+from JADWA_AI.models import EnterpriseMean, RegionIndicator
+from JADWA_AI.num_similar_enterprises import enterprise_means
+
+
+class Command(BaseCommand):
+    help = (
+        "Load the dataset's region indicators and similar-enterprise means into the database, "
+        "so the lookups used when saving a project no longer read the dataset."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dataset", default=dataset_cache.DATASET_PATH)
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--stream", action="store_true",
+                            help="Read the dataset in chunks into running aggregates (constant memory) and save them")
+        parser.add_argument("--append", metavar="CSV",
+                            help="Fold new rows into the saved aggregates instead of recomputing the dataset")
+        parser.add_argument("--chunk-rows", type=int, default=reference_stream.CHUNK_ROWS)
+        parser.add_argument("--state", default=reference_stream.STATE_PATH, help="Saved aggregates file")
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        path = options["dataset"]
+
+        if options["append"]:
+            try:
+                aggregates = reference_stream.load(options["state"])
+            except FileNotFoundError:
+                raise CommandError(f"No saved aggregates at {options['state']}; run with --stream first")
+            try:
+                reference_stream.ingest(options["append"], aggregates, options["chunk_rows"])
+            except reference_stream.AlreadyIngested as e:
+                raise CommandError(f"Not appending: {e}")
+        elif options["stream"]:
+            aggregates = reference_stream.ingest(path, chunk_rows=options["chunk_rows"])
+        else:
+            aggregates = None
+
+        if aggregates is not None:
+            reference_stream.save(aggregates, options["state"])
+            sha256 = reference_stream.fingerprint(aggregates)
+            indicator_values = reference_stream.region_indicators(aggregates).items()
+            means = reference_stream.enterprise_means(aggregates)
+        else:
+            sha256 = dataset_cache.file_hash(path)
+            region_avg = calculate_update_economic_indicator(path)
+            indicator_values = zip(region_avg["region_project"], region_avg["economic_indicator"])
+            means = enterprise_means(dataset_cache.read_dataset(path))
+
+        indicators = [
+            RegionIndicator(region=region, economic_indicator=float(value), dataset_sha256=sha256)
+            for region, value in indicator_values
+        ]
+        enterprises = [
+            EnterpriseMean(scope="exact", sector=sector, region=region, mean=float(mean), dataset_sha256=sha256)
+            for (sector, region), mean in means["exact"].items()
+        ]
+        enterprises += [
+            EnterpriseMean(scope="sector", sector=sector, mean=float(mean), dataset_sha256=sha256)
+            for sector, mean in means["sector"].items()
+        ]
+        enterprises += [
+            EnterpriseMean(scope="region", region=region, mean=float(mean), dataset_sha256=sha256)
+            for region, mean in means["region"].items()
+        ]
+        enterprises.append(EnterpriseMean(scope="global", mean=float(means["global"]), dataset_sha256=sha256))
+
+        with transaction.atomic():
+            RegionIndicator.objects.bulk_create(
+                indicators,
+                batch_size=options["batch_size"],
+                update_conflicts=True,
+                unique_fields=["region"],
+                update_fields=["economic_indicator", "dataset_sha256", "updated_at"],
+            )
+            EnterpriseMean.objects.bulk_create(
+                enterprises,
+                batch_size=options["batch_size"],
+                update_conflicts=True,
+                unique_fields=["scope", "sector", "region"],
+                update_fields=["mean", "dataset_sha256", "updated_at"],
+            )
+            # Keys no longer in the dataset
+            stale = RegionIndicator.objects.exclude(dataset_sha256=sha256).delete()[0]
+            stale += EnterpriseMean.objects.exclude(dataset_sha256=sha256).delete()[0]
+
+        elapsed = time.perf_counter() - start
+        rows = f" from {aggregates['rows']} rows" if aggregates is not None else ""
+        self.stdout.write(
+            f"{len(indicators)} region indicators, {len(enterprises)} enterprise means{rows} "
+            f"({stale} stale rows removed) in {elapsed:.2f} s"
+        )
@@ -0,0 +1,68 @@
+import joblib
+from django.core.management.base import BaseCommand, CommandError
+
+from ai.services import model_registry
+from ai.services.compiled_forest import CompiledForest
+
+
+class Command(BaseCommand):
+    help = "List, publish, verify and activate versioned model artifacts."
+
+    def add_arguments(self, parser):
+        sub = parser.add_subparsers(dest="action", required=True)
+
+        sub.add_parser("list")
+
+        publish = sub.add_parser("publish")
+        publish.add_argument("version")
+        publish.add_argument("--model", required=True, help="Path to the fitted rf_pipeline.pkl")
+        publish.add_argument("--features", required=True, help="Path to feature_columns.pkl")
+        publish.add_argument("--compile", action="store_true", help="Also store the compiled forest")
+        publish.add_argument("--activate", action="store_true")
+
+        verify = sub.add_parser("verify")
+        verify.add_argument("version")
+
+        activate = sub.add_parser("activate")
+        activate.add_argument("version")
+
+    def handle(self, *args, **options):
+        try:
+            getattr(self, f"_{options['action']}")(options)
+        except model_registry.RegistryError as e:
+            raise CommandError(str(e))
+
+    def _list(self, options):
+        active = model_registry.active_version()
+        for manifest in model_registry.versions():
+            marker = "*" if manifest["version"] == active else " "
+            self.stdout.write(f"{marker} {manifest['version']}  {manifest['created_at']}  {manifest.get('metadata', {})}")
+
+    def _publish(self, options):
+        compiled = None
+        if options["compile"]:
+            try:
+                compiled = CompiledForest.from_pipeline(
+                    joblib.load(options["model"]), joblib.load(options["features"])
+                )
+            except NotImplementedError as e:
+                raise CommandError(f"Cannot compile this pipeline: {e}")
+
+        manifest = model_registry.publish(
+            options["version"],
+            features_path=options["features"],
+            pipeline_path=options["model"],
+            compiled=compiled,
+        )
+        self.stdout.write(f"Published {manifest['version']} ({len(manifest['files'])} files)")
+
+        if options["activate"]:
+            self._activate(options)
+
+    def _verify(self, options):
+        model_registry.verify(options["version"])
+        self.stdout.write(f"{options['version']}: checksums OK")
+
+    def _activate(self, options):
+        model_registry.activate(options["version"])
+        self.stdout.write(f"Active model is now {options['version']}")
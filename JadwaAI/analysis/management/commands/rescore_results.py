@@ -0,0 +1,171 @@
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from ai.services import feasibility, model_registry
+from analysis.models import AnalysisResult
+from analysis.views import build_project_data
+from JADWA_AI.models import Projects
+
+AR_LABELS = {True: "قابل للتنفيذ", False: "غير قابل للتنفيذ"}
+EN_LABELS = {True: "Feasible", False: "Not Feasible"}
+UPDATE_FIELDS = ["probability", "threshold", "label", "model_version", "contributions", "uncertainty"]
+
+_worker_loaded = None
+
+
+def _load(version):
+    return feasibility.load_model(None if version == feasibility.LEGACY_VERSION else version)
+
+
+def _worker_init(version):
+    global _worker_loaded
+    _worker_loaded = _load(version)
+
+
+def _worker_score(project_dicts, loaded=None):
+    return feasibility.score_projects(project_dicts, explain=True, loaded=loaded or _worker_loaded)
+
+
+def _label(old_label, feasible) -> str:
+    # Keep the language the result was created in
+    labels = AR_LABELS if old_label in AR_LABELS.values() else EN_LABELS
+    return labels[feasible]
+
+
+def _feasible(probability, threshold) -> bool:
+    return float(probability) >= float(threshold)
+
+
+def _save(results, batch_size):
+    with transaction.atomic():
+        AnalysisResult.objects.bulk_update(results, UPDATE_FIELDS, batch_size=batch_size)
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute probability, threshold, label, contributions and uncertainty of every "
+        "AnalysisResult with one model version, in resumable chunks."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--model-version", help="Registry version (default: the active one, else legacy)")
+        parser.add_argument("--chunk-size", type=int, default=1000)
+        parser.add_argument("--batch-size", type=int, default=500, help="Rows per UPDATE statement")
+        parser.add_argument("--workers", type=int, default=0, help="Score chunks in N processes")
+        parser.add_argument("--checkpoint", help="Progress file (default: rescore-<version>.json)")
+        parser.add_argument("--resume", action="store_true", help="Continue after the checkpoint's last id")
+        parser.add_argument("--dry-run", action="store_true", help="Count flips without writing")
+
+    def handle(self, *args, **options):
+        version = options["model_version"] or model_registry.active_version() or feasibility.LEGACY_VERSION
+        try:
+            loaded = _load(version)
+        except (model_registry.RegistryError, OSError) as e:
+            raise CommandError(f"Cannot load model {version}: {e}")
+
+        checkpoint_path = options["checkpoint"] or f"rescore-{version}.json"
+        state = {"model_version": version, "last_id": 0, "processed": 0, "updated": 0,
+                 "flipped_to_feasible": 0, "flipped_to_not_feasible": 0, "missing_project": 0}
+
+        if options["resume"] and os.path.exists(checkpoint_path):
+            with open(checkpoint_path, encoding="utf-8") as f:
+                saved = json.load(f)
+            if saved.get("model_version") != version:
+                raise CommandError(f"{checkpoint_path} is for model {saved.get('model_version')}, not {version}")
+            state.update(saved)
+            self.stdout.write(f"Resuming after id {state['last_id']}")
+
+        pool = None
+        if options["workers"] > 0:
+            pool = ProcessPoolExecutor(options["workers"], initializer=_worker_init, initargs=(version,))
+
+        start = time.perf_counter()
+        pending = deque()
+        try:
+            for chunk, project_dicts in self._chunks(state["last_id"], options["chunk_size"], state):
+                if pool is None:
+                    self._write(chunk, _worker_score(project_dicts, loaded), state, checkpoint_path, options)
+                    continue
+
+                # Keep a few chunks in flight; write them back in id order
+                pending.append((chunk, pool.submit(_worker_score, project_dicts)))
+                if len(pending) >= 2 * options["workers"]:
+                    chunk, future = pending.popleft()
+                    self._write(chunk, future.result(), state, checkpoint_path, options)
+
+            while pending:
+                chunk, future = pending.popleft()
+                self._write(chunk, future.result(), state, checkpoint_path, options)
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+
+        elapsed = time.perf_counter() - start
+        flipped = state["flipped_to_feasible"] + state["flipped_to_not_feasible"]
+        self.stdout.write(
+            f"Model {version}: {state['processed']} results, {flipped} decisions flipped "
+            f"({state['flipped_to_feasible']} to feasible, {state['flipped_to_not_feasible']} to not feasible), "
+            f"{state['missing_project']} without a project, {elapsed:.1f} s"
+            + (" (dry run)" if options["dry_run"] else "")
+        )
+
+    def _chunks(self, after_id, chunk_size, state):
+        """
+        ((results, last id, project ids), project dicts) per chunk, by
+        ascending id. Keyset pagination, so memory stays at a few chunks
+        however many rows exist.
+        """
+        fields = ("id", "project_id", "probability", "threshold", "label")
+        while True:
+            results = list(
+                AnalysisResult.objects.filter(id__gt=after_id).order_by("id").only(*fields)[:chunk_size]
+            )
+            if not results:
+                return
+            after_id = results[-1].id
+
+            projects = Projects.objects.in_bulk({r.project_id for r in results})
+            scorable = [r for r in results if r.project_id in projects]
+            state["missing_project"] += len(results) - len(scorable)
+            if not scorable:
+                continue
+
+            # Several results of one project are scored once
+            dicts = {pid: build_project_data(projects[pid]) for pid in dict.fromkeys(r.project_id for r in scorable)}
+            order = list(dicts)
+            yield (scorable, results[-1].id, order), [dicts[pid] for pid in order]
+
+    def _write(self, chunk, scored, state, checkpoint_path, options):
+        results, last_id, order = chunk
+        by_project = dict(zip(order, scored))
+
+        for r in results:
+            new = by_project[r.project_id]
+            was, now = _feasible(r.probability, r.threshold), _feasible(new["probability"], new["threshold"])
+            if was != now:
+                state["flipped_to_feasible" if now else "flipped_to_not_feasible"] += 1
+
+            r.probability = new["probability"]
+            r.threshold = new["threshold"]
+            r.label = _label(r.label, now)
+            r.model_version = new["model_version"]
+            r.contributions = new.get("contributions") or {}
+            r.uncertainty = new.get("uncertainty") or {}
+
+        if not options["dry_run"]:
+            _save(results, options["batch_size"])
+            state["updated"] += len(results)
+
+        state["processed"] += len(results)
+        state["last_id"] = last_id
+        if not options["dry_run"]:
+            tmp = checkpoint_path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(state, f)
+            os.replace(tmp, checkpoint_path)
@@ -0,0 +1,100 @@
+import json
+import os
+import tempfile
+import time
+
+import joblib
+from django.core.management.base import BaseCommand, CommandError
+
+from ai.services import model_registry, training
+from ai.services.compiled_forest import CompiledForest
+
+
+def _int_or_none(value):
+    return None if value.lower() == "none" else int(value)
+
+
+class Command(BaseCommand):
+    help = (
+        "Train the feasibility forest from the dataset CSV with a cross-validated "
+        "grid search and publish it to the model registry."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dataset", default=training.DATASET_PATH)
+        parser.add_argument("--model-version", help="Registry version (default: rf-<timestamp>)")
+        parser.add_argument("--cv", type=int, default=5, help="Cross-validation folds")
+        parser.add_argument("--n-jobs", type=int, default=-1, help="Parallel fits (-1 = all cores)")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--n-estimators", type=int, nargs="+")
+        parser.add_argument("--max-depth", type=_int_or_none, nargs="+", help="Integers or 'none'")
+        parser.add_argument("--min-samples-leaf", type=int, nargs="+")
+        parser.add_argument("--no-cache", action="store_true", help="Re-encode the dataset even if cached")
+        parser.add_argument("--compile", action="store_true", help="Also publish the compiled forest")
+        parser.add_argument("--activate", action="store_true")
+
+    def handle(self, *args, **options):
+        version = options["model_version"] or time.strftime("rf-%Y%m%d-%H%M%S")
+        if os.path.exists(model_registry.version_dir(version)):
+            raise CommandError(f"Version already exists: {version}")
+
+        param_grid = dict(training.PARAM_GRID)
+        for name in ("n_estimators", "max_depth", "min_samples_leaf"):
+            if options[name]:
+                param_grid[name] = options[name]
+
+        t0 = time.perf_counter()
+        data = training.load_training_data(options["dataset"], use_cache=not options["no_cache"])
+        prepare_s = time.perf_counter() - t0
+        self.stdout.write(
+            f"Dataset {data['hash'][:12]}: {data['rows']} rows x {data['x'].shape[1]} columns "
+            f"({'cached' if data['cached'] else 'encoded'} in {prepare_s:.2f} s)"
+        )
+
+        grid, search_s = training.search(data, param_grid, cv=options["cv"], n_jobs=options["n_jobs"], seed=options["seed"])
+        metrics = training.cv_metrics(grid)
+        self.stdout.write(
+            f"Searched {len(grid.cv_results_['params'])} candidates x {options['cv']} folds in {search_s:.1f} s; "
+            f"best {grid.best_params_} roc_auc {metrics['cv_roc_auc']:.4f}"
+        )
+
+        pipeline = training.build_pipeline(data, grid.best_estimator_)
+        latency = training.inference_latency(pipeline)
+
+        metadata = {
+            "trained_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "dataset_sha256": data["hash"],
+            "rows": data["rows"],
+            "params": grid.best_params_,
+            "metrics": metrics,
+            "training": {
+                "prepare_s": round(prepare_s, 3),
+                "search_s": round(search_s, 3),
+                "refit_s": round(grid.refit_time_, 3),
+                "candidates": len(grid.cv_results_["params"]),
+                "folds": options["cv"],
+                "n_jobs": options["n_jobs"],
+            },
+            "inference": latency,
+        }
+
+        compiled = None
+        if options["compile"]:
+            compiled = CompiledForest.from_pipeline(pipeline, training.FEATURE_COLUMNS)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            model_path = os.path.join(tmp, model_registry.PIPELINE_FILE)
+            features_path = os.path.join(tmp, model_registry.FEATURES_FILE)
+            joblib.dump(pipeline, model_path)
+            joblib.dump(training.FEATURE_COLUMNS, features_path)
+            try:
+                model_registry.publish(version, features_path, model_path, compiled=compiled, metadata=metadata)
+            except model_registry.RegistryError as e:
+                raise CommandError(str(e))
+
+        self.stdout.write(json.dumps(metadata, ensure_ascii=False, indent=2))
+        self.stdout.write(f"Published {version}")
+
+        if options["activate"]:
+            model_registry.activate(version)
+            self.stdout.write(f"Active model is now {version}")
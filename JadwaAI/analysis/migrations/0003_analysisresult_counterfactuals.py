@@ -0,0 +1,18 @@
+# Generated by Django 5.2.10 on 2026-10-18 07:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analysis', '0002_analysisresult_model_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='analysisresult',
+            name='counterfactuals',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
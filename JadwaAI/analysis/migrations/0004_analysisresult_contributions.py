@@ -0,0 +1,18 @@
+# Generated by Django 5.2.10 on 2026-10-18 07:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analysis', '0003_analysisresult_counterfactuals'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='analysisresult',
+            name='contributions',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.10 on 2026-10-18 08:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analysis', '0004_analysisresult_contributions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='analysisresult',
+            name='uncertainty',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
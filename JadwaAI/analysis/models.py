@@ -13,6 +13,17 @@ class AnalysisResult(models.Model):
 
     label = models.CharField(max_length=50)
 
+    model_version = models.CharField(max_length=64, blank=True, default="")
+
+    # explain_project(...): per-input share of the probability
+    contributions = models.JSONField(blank=True, default=dict)
+
+    # Spread of the per-tree votes: std, low/high band, tree agreement
+    uncertainty = models.JSONField(blank=True, default=dict)
+
+    # {model_version: find_counterfactuals(...)} so a new model recomputes
+    counterfactuals = models.JSONField(blank=True, default=dict)
+
     recommendations_ar = models.TextField(blank=True, default="")
 
     recommendations_en = models.TextField(blank=True, default="")
@@ -33,4 +44,43 @@ class AnalysisResult(models.Model):
         ordering = ["-created_at"]
 
     def __str__(self):
-        return f"{self.user.username} - {self.project_name} - {self.label}"
\ No newline at end of file
+        return f"{self.user.username} - {self.project_name} - {self.label}"
+
+class FeatureStats(models.Model):
+    """
+    Running distribution of one model input over analysed projects:
+    histogram counts on the training data's bin edges plus count, mean and
+    sum of squared deviations (merged batch by batch, constant size).
+    """
+    feature = models.CharField(max_length=64, unique=True)
+
+    edges = models.JSONField(blank=True, default=list)
+    counts = models.JSONField(blank=True, default=list)
+
+    count = models.IntegerField(default=0)
+    mean = models.FloatField(default=0.0)
+    m2 = models.FloatField(default=0.0)
+    min_value = models.FloatField(null=True, blank=True)
+    max_value = models.FloatField(null=True, blank=True)
+
+    started_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.feature} ({self.count})"
+
+
+class DriftReport(models.Model):
+    # {feature: {"psi", "status", "count", "mean", "reference_mean", ...}}
+    scores = models.JSONField(blank=True, default=dict)
+
+    samples = models.IntegerField(default=0)
+    dataset_sha256 = models.CharField(max_length=64, blank=True, default="")
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"Drift report {self.created_at:%Y-%m-%d %H:%M} ({self.samples} projects)"
@@ -1,3 +1,219 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
 from django.test import TestCase
 
-# Create your tests here.
+from ai.tests import FEATURE_COLUMNS, PIPELINE, using_cache, using_model
+from JADWA_AI.models import Projects
+
+from .models import AnalysisResult, DriftReport, FeatureStats
+from .views import build_project_data, get_counterfactuals
+
+User = get_user_model()
+
+
+class CounterfactualCacheTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="owner", email="owner@test.com", password="12345678")
+        self.project = Projects.objects.create(
+            user=self.user,
+            project_name="Cafe",
+            Project_type="Service",
+            project_region="riyadh",
+            project_city="riyadh",
+            project_budget=50000,
+            project_duration=6,
+            number_of_employees=2,
+            description="test",
+        )
+        self.result = AnalysisResult.objects.create(
+            user=self.user, project_id=self.project.id, probability=0.1, threshold=0.75, label="Not Feasible"
+        )
+
+    def test_search_runs_once_per_model_version(self):
+        with using_cache(), using_model(PIPELINE, version="v1"), \
+                mock.patch("ai.services.counterfactual.find_counterfactuals", return_value={"changes": []}) as find:
+            get_counterfactuals(self.result)
+            get_counterfactuals(AnalysisResult.objects.get(id=self.result.id))
+            self.assertEqual(find.call_count, 1)
+
+            with using_model(PIPELINE, version="v2"):
+                get_counterfactuals(AnalysisResult.objects.get(id=self.result.id))
+            self.assertEqual(find.call_count, 2)
+
+        self.assertEqual(set(AnalysisResult.objects.get(id=self.result.id).counterfactuals), {"v1", "v2"})
+
+    def test_feasible_result_is_skipped(self):
+        self.result.probability = 0.9
+        self.assertIsNone(get_counterfactuals(self.result))
+
+
+class PlacementInputsTest(TestCase):
+
+    def test_cells_get_the_inputs_a_saved_project_gets(self):
+        from ai.services.placement import cell_inputs
+
+        user = User.objects.create_user(username="owner", email="owner@test.com", password="12345678")
+        for region, city in (("riyadh", "kharj"), ("eastern", "dammam"), ("najran", "najran"), ("bahah", "bahah")):
+            project = Projects.objects.create(
+                user=user, project_name="Cafe", Project_type="Product", project_region=region, project_city=city,
+                project_budget=50000, project_duration=6, number_of_employees=2, description="test",
+            )
+            saved = build_project_data(Projects.objects.get(id=project.id))
+            cell = cell_inputs(saved, region, city, "Product")
+
+            self.assertEqual(cell["economic_indicator"], saved["economic_indicator"])
+            self.assertEqual(cell["num_of_similar_enterprises"], saved["num_of_similar_enterprises"])
+            self.assertEqual(cell["region_project"], saved["region_project"])
+
+
+class PartialDependenceViewTest(TestCase):
+
+    def test_only_monitored_inputs_are_served(self):
+        from django.urls import reverse
+
+        from ai.services import feasibility, partial_dependence, training
+
+        user = User.objects.create_user(username="owner", email="owner@test.com", password="12345678", is_active=True)
+        project = Projects.objects.create(
+            user=user, project_name="Cafe", Project_type="Service", project_region="riyadh",
+            project_city="riyadh", project_budget=50000, project_duration=6, number_of_employees=2,
+        )
+        result = AnalysisResult.objects.create(
+            user=user, project_id=project.id, probability=0.1, threshold=0.75, label="Not Feasible"
+        )
+
+        loaded = feasibility.make_loaded(PIPELINE, FEATURE_COLUMNS, "test")
+        rows = partial_dependence.background_rows(training.DATASET_PATH, 20)
+        with tempfile.TemporaryDirectory() as tmp, mock.patch.object(partial_dependence, "CURVES_DIR", tmp):
+            # Curves stored before num_enterprises was dropped
+            curves = partial_dependence.compute(
+                loaded, rows, grid_points=5, features=partial_dependence.FEATURES + ["num_enterprises"]
+            )
+            partial_dependence.save("test", curves)
+            self.assertIn("num_enterprises", partial_dependence.load_curves("test")["curves"])
+
+            self.client.force_login(user)
+            with using_cache(), using_model(PIPELINE, version="test"):
+                response = self.client.get(
+                    reverse("partial_dependence", args=[result.id]), secure=True, HTTP_HOST="localhost"
+                )
+
+        data = response.json()
+        self.assertEqual(set(data["curves"]), set(partial_dependence.FEATURES))
+        self.assertEqual(set(data["current"]), set(partial_dependence.FEATURES))
+        self.assertNotIn("num_enterprises", partial_dependence.FEATURES)
+
+
+class DriftMonitoringTest(TestCase):
+
+    def test_buffered_inputs_reach_the_drift_report(self):
+        from ai.services import drift, training
+        from ai.services.partial_dependence import background_rows
+
+        rows = background_rows(training.DATASET_PATH, n_rows=300, seed=1)
+        buffer = drift.DriftBuffer(flush_size=1000)
+        for row in rows[:200]:
+            buffer.record(row)
+        buffer.flush()
+        for row in rows[200:]:
+            buffer.record(row)
+        self.assertEqual(buffer.pending(), 100)
+        buffer.flush()
+
+        stats = FeatureStats.objects.get(feature="budget_project")
+        self.assertEqual(stats.count, 300)
+        self.assertEqual(sum(stats.counts), 300)
+        self.assertAlmostEqual(stats.mean, np.mean([r["budget_project"] for r in rows]), delta=1e-6 * stats.mean)
+
+        call_command("compute_drift", stdout=StringIO())
+        scores = DriftReport.objects.first().scores
+        self.assertEqual(scores["budget_project"]["status"], "stable")
+
+        for _ in range(300):
+            buffer.record(dict(rows[0], budget_project=1e12))
+        buffer.flush()
+        call_command("compute_drift", "--reset", stdout=StringIO())
+        self.assertEqual(DriftReport.objects.first().scores["budget_project"]["status"], "significant")
+        self.assertFalse(FeatureStats.objects.exists())
+
+
+class RescoreResultsTest(TestCase):
+
+    def setUp(self):
+        from ai.services import feasibility
+
+        self.user = User.objects.create_user(username="owner", email="owner@test.com", password="12345678")
+        self.results = []
+        for i, budget in enumerate([20000, 150000, 900000, 5000000, 80000]):
+            project = Projects.objects.create(
+                user=self.user,
+                project_name=f"P{i}",
+                Project_type="Service",
+                project_region="riyadh",
+                project_city="riyadh",
+                project_budget=budget,
+                project_duration=12,
+                number_of_employees=i * 3,
+                description="test",
+            )
+            # Every stored decision says "feasible" with a stale model
+            self.results.append(AnalysisResult.objects.create(
+                user=self.user, project_id=project.id, probability=0.99, threshold=0.5,
+                label="قابل للتنفيذ" if i % 2 else "Feasible", model_version="v1",
+            ))
+        AnalysisResult.objects.create(user=self.user, project_id=99999, probability=0.99, threshold=0.5, label="Feasible")
+
+        self.loaded = feasibility.make_loaded(PIPELINE, FEATURE_COLUMNS, "v2")
+        self.checkpoint = os.path.join(tempfile.mkdtemp(), "rescore.json")
+
+    def rescore(self, *args):
+        out = StringIO()
+        with using_cache(), mock.patch("analysis.management.commands.rescore_results._load", return_value=self.loaded):
+            call_command("rescore_results", "--model-version", "v2", "--chunk-size", "2",
+                         "--checkpoint", self.checkpoint, *args, stdout=out)
+        return out.getvalue()
+
+    def expected(self, result):
+        from ai.services import feasibility
+        project = Projects.objects.get(id=result.project_id)
+        return feasibility.score_projects([build_project_data(project)], explain=True, loaded=self.loaded)[0]
+
+    def test_results_match_predict_and_flips_are_counted(self):
+        output = self.rescore()
+
+        flipped = 0
+        for old in self.results:
+            new = AnalysisResult.objects.get(id=old.id)
+            expected = self.expected(old)
+            self.assertAlmostEqual(new.probability, expected["probability"])
+            self.assertEqual(new.threshold, expected["threshold"])
+            self.assertEqual(new.model_version, "v2")
+            self.assertEqual(new.contributions, expected["contributions"])
+            self.assertEqual(new.uncertainty, expected["uncertainty"])
+            feasible = expected["probability"] >= expected["threshold"]
+            labels = ("Not Feasible", "Feasible") if old.label == "Feasible" else ("غير قابل للتنفيذ", "قابل للتنفيذ")
+            self.assertEqual(new.label, labels[feasible])
+            flipped += not feasible
+
+        self.assertGreater(flipped, 0)
+        self.assertIn(f"5 results, {flipped} decisions flipped", output)
+        self.assertIn("1 without a project", output)
+        with open(self.checkpoint) as f:
+            self.assertEqual(json.load(f)["updated"], 5)
+
+    def test_resume_skips_finished_rows(self):
+        with open(self.checkpoint, "w") as f:
+            json.dump({"model_version": "v2", "last_id": self.results[1].id, "processed": 2}, f)
+
+        self.rescore("--resume")
+
+        versions = [AnalysisResult.objects.get(id=r.id).model_version for r in self.results]
+        self.assertEqual(versions, ["v1", "v1", "v2", "v2", "v2"])
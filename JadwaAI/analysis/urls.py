@@ -9,4 +9,8 @@ urlpatterns = [
     path("recommend/<int:result_id>/", views.generate_recs, name="generate_recs"),
     path("translate-recs/<int:result_id>/", views.translate_recs, name="translate_recs"),
     path("result/<int:result_id>/pdf/", views.analysis_pdf, name="analysis_pdf"),
+    path("result/<int:result_id>/what-if/", views.what_if, name="what_if"),
+    path("result/<int:result_id>/monte-carlo/", views.monte_carlo, name="monte_carlo"),
+    path("result/<int:result_id>/placements/", views.placements, name="placements"),
+    path("result/<int:result_id>/partial-dependence/", views.partial_dependence, name="partial_dependence"),
 ]
@@ -113,6 +113,118 @@ def feasibility_label_by_lang(result: AnalysisResult, lang: str) -> str:
     return "Feasible" if ok else "Not Feasible"
 
 
+def get_counterfactuals(result: AnalysisResult):
+    """
+    Smallest single-input changes that would make a "Not Feasible" result
+    feasible, cached on the result per model version. None for feasible
+    results or when the model is unavailable.
+    """
+    if is_feasible_result(result):
+        return None
+
+    from ai.services import inference_backend
+
+    try:
+        version = inference_backend.call("model_version")
+        cached = (result.counterfactuals or {}).get(version)
+        if cached is not None:
+            return cached
+
+        project = Projects.objects.filter(id=result.project_id).first()
+        if project is None:
+            return None
+
+        cached = inference_backend.call("counterfactuals", project_dict=build_project_data(project))
+    except Exception as e:
+        print("Counterfactual search failed:", e)
+        return None
+
+    result.counterfactuals = {**(result.counterfactuals or {}), version: cached}
+    result.save(update_fields=["counterfactuals"])
+    return cached
+
+
+def driver_rows(result: AnalysisResult, lang: str) -> list:
+    from ai.services.recommendations import FEATURE_LABELS, top_drivers
+
+    labels = FEATURE_LABELS["ar" if str(lang).startswith("ar") else "en"]
+    drivers = top_drivers(result.contributions)
+    largest = max((abs(points) for _, points in drivers), default=0) or 1
+
+    return [
+        {
+            "label": labels.get(feature, feature),
+            "points": points,
+            "positive": points > 0,
+            "width": round(abs(points) / largest * 100),
+        }
+        for feature, points in drivers
+    ]
+
+
+def confidence_band(result: AnalysisResult):
+    """Tree-vote band of a result for the page and PDF, None for older results."""
+    u = result.uncertainty or {}
+    if not u.get("trees"):
+        return None
+
+    return {
+        "low": round(u["low"] * 100),
+        "high": round(u["high"] * 100),
+        "width": max(round((u["high"] - u["low"]) * 100), 1),
+        "probability": round(result.probability * 100),
+        "threshold": round(result.threshold * 100),
+        "agreement": round(u["agreement"] * 100),
+        "trees": u["trees"],
+        "low_confidence": u.get("low_confidence", False),
+    }
+
+
+def confidence_line(band, lang: str) -> str:
+    if not band:
+        return ""
+    if str(lang).startswith("ar"):
+        line = (
+            f"{band['agreement']}% من {band['trees']} شجرة تتفق مع القرار، "
+            f"ونطاق تقديراتها {band['low']}%–{band['high']}%"
+        )
+        return line + (" (نتيجة حدّية)" if band["low_confidence"] else "")
+
+    line = (
+        f"{band['agreement']}% of {band['trees']} trees agree with the decision; "
+        f"their estimates range {band['low']}%–{band['high']}%"
+    )
+    return line + (" (borderline result)" if band["low_confidence"] else "")
+
+
+def counterfactual_lines(counterfactuals, lang: str) -> list:
+    is_ar = str(lang).startswith("ar")
+    lines = []
+
+    for c in (counterfactuals or {}).get("changes", []):
+        percent = f"{c['probability'] * 100:.1f}%"
+
+        if c["feature"] == "budget_project":
+            if is_ar:
+                line = f"الميزانية: {c['from']:,.0f} ← {c['to']:,.0f} ريال (الاحتمالية {percent})"
+            else:
+                line = f"Budget: {c['from']:,.0f} → {c['to']:,.0f} SAR (probability {percent})"
+        elif c["feature"] == "project_duration_days":
+            if is_ar:
+                line = f"مدة المشروع: {c['from'] / 30:.0f} ← {c['to'] / 30:.0f} شهر (الاحتمالية {percent})"
+            else:
+                line = f"Duration: {c['from'] / 30:.0f} → {c['to'] / 30:.0f} months (probability {percent})"
+        else:
+            if is_ar:
+                line = f"عدد الموظفين السعوديين: {c['from']:.0f} ← {c['to']:.0f} (الاحتمالية {percent})"
+            else:
+                line = f"Saudi employees: {c['from']:.0f} → {c['to']:.0f} (probability {percent})"
+
+        lines.append(line)
+
+    return lines
+
+
 def normalize_recommendations_text(result: AnalysisResult, lang: str, recs_text: str) -> str:
     text = (recs_text or "").strip()
     prob = float(getattr(result, "probability", 0) or 0)
@@ -189,14 +301,6 @@ def build_project_data(project: Projects) -> dict:
 }
 
     econ_value = getattr(project, "economic_indicator", 2)
-    print("project_name:", project.project_name)
-    print("type:", project.Project_type)
-    print("region:", project.project_region)
-    print("city:", project.project_city)
-    print("budget:", project.project_budget)
-    print("duration:", project.project_duration)
-    print("employees:", project.number_of_employees)
-    print("description:", project.description)
     return {
         "type_project": getattr(project, "Project_type", "Service"),
         "region_project": location_for_ml,
@@ -213,6 +317,7 @@ def build_project_data(project: Projects) -> dict:
 
 @login_required
 def run_analysis(request, project_id):
+    from ai.services import drift
     from ai.services.analyzer import analyze_project
 
     project = get_object_or_404(Projects, id=project_id)
@@ -232,12 +337,17 @@ def run_analysis(request, project_id):
         probability=float(out.get("probability", 0) or 0),
         threshold=float(out.get("threshold", 0.5) or 0.5),
         label=str(out.get("label", "") or ""),
+        model_version=str(out.get("model_version", "") or ""),
+        contributions=out.get("contributions") or {},
+        uncertainty=out.get("uncertainty") or {},
         recommendations_ar="",
         recommendations_en="",
         recommendations_status_ar="pending",
         recommendations_status_en="pending",
     )
 
+    drift.record(project_data)
+
     return redirect("analysis_result", result_id=saved_result.id)
 
 
@@ -280,11 +390,17 @@ def analysis_result(request, result_id):
         else:
             improvement_direction = "same"
 
+    counterfactuals = get_counterfactuals(result)
+
     return render(
         request,
         "analysis/result.html",
         {
             "result": result,
+            "drivers": driver_rows(result, lang),
+            "confidence": confidence_band(result),
+            "counterfactuals": counterfactuals,
+            "counterfactual_lines": counterfactual_lines(counterfactuals, lang),
             "feasibility_percent": feasibility_percent,
             "status_text": status_text,
             "recs_text": recs_text,
@@ -434,6 +550,132 @@ def recs_loading(request, result_id):
     )
 
 
+def _float_param(request, name):
+    value = request.GET.get(name)
+    return None if value in (None, "") else float(value)
+
+
+@login_required
+def what_if(request, result_id):
+    """
+    Probability grid for the result's project with one or two inputs swept:
+    ?x=budget_project&y=num_saudi_employees&nx=50&ny=50 (x_min/x_max/y_min/y_max optional).
+    """
+    from ai.services import inference_backend
+
+    result = get_object_or_404(AnalysisResult, id=result_id, user=request.user)
+    project = get_object_or_404(Projects, id=result.project_id)
+    project_data = build_project_data(project)
+
+    try:
+        axes = []
+        for axis in ("x", "y"):
+            feature = request.GET.get(axis) or ("budget_project" if axis == "x" else "")
+            if not feature:
+                continue
+            axes.append({
+                "feature": feature,
+                "n": int(request.GET.get(f"n{axis}", 50)),
+                "lo": _float_param(request, f"{axis}_min"),
+                "hi": _float_param(request, f"{axis}_max"),
+            })
+
+        grid = inference_backend.call("what_if", project_dict=project_data, axes=axes)
+    except (KeyError, ValueError) as e:
+        return JsonResponse({"ok": False, "error": str(e)}, status=400)
+
+    grid["ok"] = True
+    grid["current"] = {
+        "budget_project": project_data["budget_project"],
+        "project_duration_days": project_data["project_duration_days"],
+        "num_saudi_employees": project_data["num_saudi_employees"],
+        "economic_indicator": project_data["economic_indicator"],
+    }
+    return JsonResponse(grid)
+
+
+@login_required
+def monte_carlo(request, result_id):
+    """
+    Probability distribution of the result's project when budget, duration
+    and employees are only known within ranges:
+    ?budget_project_min=..&budget_project_max=..&project_duration_days_min=..&n=1000
+    Without any range, ±20% budget and ±25% duration are used.
+    """
+    from ai.services import inference_backend
+
+    result = get_object_or_404(AnalysisResult, id=result_id, user=request.user)
+    project = get_object_or_404(Projects, id=result.project_id)
+    project_data = build_project_data(project)
+
+    try:
+        # <feature>_min / <feature>_max -> {feature: [lo, hi]}
+        bounds = {}
+        for name in request.GET:
+            feature, _, end = name.rpartition("_")
+            if feature and end in ("min", "max"):
+                bounds.setdefault(feature, [None, None])[end == "max"] = _float_param(request, name)
+
+        summary = inference_backend.call(
+            "monte_carlo",
+            project_dict=project_data,
+            bounds=bounds,
+            n=int(request.GET.get("n", 1000)),
+            seed=int(request.GET.get("seed", 0)),
+        )
+    except ValueError as e:
+        return JsonResponse({"ok": False, "error": str(e)}, status=400)
+
+    summary["ok"] = True
+    return JsonResponse(summary)
+
+
+@login_required
+def placements(request, result_id):
+    """The result's project scored in every region x project type, best first."""
+    from ai.services import inference_backend
+
+    result = get_object_or_404(AnalysisResult, id=result_id, user=request.user)
+    project = get_object_or_404(Projects, id=result.project_id)
+
+    ranked = inference_backend.call("placements", project_dict=build_project_data(project), city=project.project_city)
+
+    regions = dict(Projects.REGION_CHOICES)
+    cities = dict(Projects.CITY_CHOICES)
+    types = dict(Projects.PROJECT_TYPE_CHOICES)
+    for cell in ranked["placements"]:
+        cell["region_label"] = str(regions.get(cell["region"], cell["region"]))
+        cell["city_label"] = str(cities.get(cell["city"], cell["city"]))
+        cell["type_label"] = str(types.get(cell["type"], cell["type"]))
+        cell["current"] = cell["region"] == project.project_region and cell["type"] == project.Project_type
+
+    ranked["ok"] = True
+    return JsonResponse(ranked)
+
+
+@login_required
+def partial_dependence(request, result_id):
+    """Precomputed partial-dependence curves of the serving model, with the project's own inputs."""
+    from ai.services import inference_backend
+
+    result = get_object_or_404(AnalysisResult, id=result_id, user=request.user)
+    project = get_object_or_404(Projects, id=result.project_id)
+
+    served = inference_backend.call("partial_dependence")
+    version, curves = served["model_version"], served["curves"]
+    if curves is None:
+        return JsonResponse({"ok": False, "error": f"No curves computed for model {version}"}, status=404)
+
+    project_data = build_project_data(project)
+    return JsonResponse({
+        "ok": True,
+        "model_version": version,
+        "curves": curves,
+        "current": {feature: float(project_data.get(feature) or 0) for feature in curves},
+        "threshold": result.threshold,
+    })
+
+
 @login_required
 def analysis_pdf(request, result_id):
     ensure_arabic_font()
@@ -1100,6 +1342,45 @@ def analysis_pdf(request, result_id):
         else:
             p.drawString(text_left, (text_box_top - text_box_h) + 0.35 * cm, more_text)
 
+    cf_lines = counterfactual_lines(get_counterfactuals(result), lang)
+    conf_line = confidence_line(confidence_band(result), lang)
+    if cf_lines or conf_line:
+        cf_top = cards_top_y - proj_h - gap
+        cf_h = 0.7 * cm + 0.5 * cm * len(cf_lines[:3])
+        if cf_lines:
+            cf_h += 0.6 * cm
+        if conf_line:
+            cf_h += 0.7 * cm
+        card(left, cf_top, right - left, cf_h)
+
+        cf_y = cf_top - 0.72 * cm
+        if conf_line:
+            line_text(
+                left + 0.5 * cm,
+                right - 0.5 * cm,
+                cf_y,
+                f"{_('Model confidence')}: {conf_line}",
+                size=9.8,
+                color=DANGER if result.uncertainty.get("low_confidence") else MUTED,
+            )
+            cf_y -= 0.7 * cm
+
+        if cf_lines:
+            line_text(
+                left + 0.5 * cm,
+                right - 0.5 * cm,
+                cf_y,
+                _("What would make it feasible?"),
+                size=11.5,
+                color=TEXT,
+                bold=True,
+            )
+            cf_y -= 0.58 * cm
+
+        for line in cf_lines[:3]:
+            line_text(left + 0.5 * cm, right - 0.5 * cm, cf_y, f"• {line}", size=9.8, color=MUTED)
+            cf_y -= 0.5 * cm
+
     draw_footer()
 
     while idx < len(all_lines):
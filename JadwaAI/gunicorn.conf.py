@@ -0,0 +1,31 @@
+import gc
+import os
+
+# Import the Django app and warm the model once in the master (when_ready);
+# workers are forked afterwards and share those pages.
+preload_app = os.getenv("JADWA_PRELOAD_APP", "1") == "1"
+
+
+def when_ready(server):
+    if preload_app:
+        from analysis.apps import warm_model
+        warm_model()
+
+
+def post_worker_init(worker):
+    # Without preloading each worker imports the app, and loads its own model
+    if not preload_app:
+        from analysis.apps import warm_model
+        warm_model()
+
+
+def pre_fork(server, worker):
+    # Move everything loaded so far into the permanent generation, so the
+    # garbage collector in the workers doesn't touch (and copy) those pages.
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    from ai.services.memory import format_mb, pss_mb, rss_mb
+
+    server.log.info("Worker %s forked: RSS %s MB, PSS %s MB", worker.pid, format_mb(rss_mb()), format_mb(pss_mb()))